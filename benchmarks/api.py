@@ -0,0 +1,225 @@
+"""
+Time the key API endpoints at several data sizes.
+
+    python -m benchmarks.api --sizes small medium
+    python -m benchmarks.api --compare benchmarks/results/api-<commit>.json
+
+Each size is generated with ``generate_load_data`` in a throwaway test
+database, then every endpoint is called ``--repeat`` times through the
+Django test client as an authenticated user. Results (timings in ms and
+queries per request) are written as JSON to ``--output``, by default
+``benchmarks/results/api-<commit>.json``, so runs on two commits can be
+compared with ``--compare``.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+from benchmarks.utils import measure, setup_django, test_database
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+SIZES = {
+    "small": {"stations": 20, "routes": 40, "trains": 10, "days": 7},
+    "medium": {"stations": 100, "routes": 300, "trains": 50, "days": 30},
+    "large": {"stations": 300, "routes": 1000, "trains": 200, "days": 60},
+}
+ORDER_SIZES = (1, 10, 50)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def free_seats(trip, count):
+    """
+    ``count`` unsold (cargo, seat) pairs of ``trip``.
+    """
+    taken = set(trip.tickets.values_list("cargo", "seat"))
+    seats = (
+        (cargo, seat)
+        for cargo in range(1, trip.train.cargo_num + 1)
+        for seat in range(1, trip.train.places_in_cargo + 1)
+        if (cargo, seat) not in taken
+    )
+    return [next(seats) for _ in range(count)]
+
+
+def endpoint_cases():
+    """
+    (name, method, url, payload) for every benchmarked request.
+    """
+    from train_station.models import Route, Trip
+
+    trip = (
+        Trip.objects.select_related("route__source", "train")
+        .order_by("departure_time")
+        .first()
+    )
+    route = Route.objects.order_by("id").first()
+    cases = [
+        (
+            "trip_list_filtered",
+            "get",
+            "/train-station/trips/",
+            {
+                "source_station": trip.route.source.name,
+                "departure_time": trip.departure_time.date().isoformat(),
+            },
+        ),
+        ("trip_list", "get", "/train-station/trips/", {"page": 2}),
+        ("trip_detail", "get", f"/train-station/trips/{trip.id}/", None),
+        ("order_list", "get", "/train-station/orders/", None),
+        (
+            "route_list",
+            "get",
+            "/train-station/routes/",
+            {"source": route.source.name},
+        ),
+    ]
+
+    trip = max(
+        Trip.objects.select_related("train")[:20],
+        key=lambda trip: trip.train.capacity - trip.tickets.count(),
+    )
+    seats = free_seats(trip, max(ORDER_SIZES))
+    for size in ORDER_SIZES:
+        tickets = [
+            {"trip": trip.id, "cargo": cargo, "seat": seat}
+            for cargo, seat in seats[:size]
+        ]
+        cases.append(
+            (
+                f"order_create_{size}",
+                "post",
+                "/train-station/orders/",
+                {"tickets": tickets},
+            )
+        )
+    return cases
+
+
+def run_size(params, repeat):
+    from django.contrib.auth import get_user_model
+    from django.db import connection, transaction
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+    from rest_framework.throttling import SimpleRateThrottle
+
+    from train_station.load_data import generate_load_data
+
+    started = time.perf_counter()
+    counts = generate_load_data(**params, seed=0).counts
+    result = {
+        "data": counts,
+        "generate_s": round(time.perf_counter() - started, 2),
+        "endpoints": {},
+    }
+
+    # The benchmark runs far above the throttle rates; switch throttling
+    # off so only the endpoints themselves are measured.
+    SimpleRateThrottle.THROTTLE_RATES.update(
+        {"anon": None, "user": None, "orders": None, "trips": None}
+    )
+    client = APIClient()
+    client.force_authenticate(
+        get_user_model().objects.filter(email__endswith="@load.test").first()
+    )
+
+    for name, method, url, payload in endpoint_cases():
+        def call():
+            # Writes are rolled back so every call sees the same data.
+            with transaction.atomic():
+                response = getattr(client, method)(url, payload, format="json")
+                transaction.set_rollback(True)
+            assert response.status_code < 400, (name, response.content[:500])
+
+        with CaptureQueriesContext(connection) as queries:
+            call()
+        # Each request resets the query log, count before measuring.
+        query_count = len(queries)
+        timings = measure(call, repeat=repeat, warmup=2)
+        result["endpoints"][name] = {
+            **{key: round(value, 3) for key, value in timings.items()},
+            "queries": query_count,
+        }
+    return result
+
+
+def compare(current, previous):
+    """
+    Print median timings of two result files side by side.
+    """
+    print(
+        f"{'endpoint':<28}{previous['commit']:>12}"
+        f"{current['commit']:>12}{'change':>10}"
+    )
+    for size, size_result in current["sizes"].items():
+        old_size = previous["sizes"].get(size)
+        if old_size is None:
+            continue
+        print(size)
+        for name, stats in size_result["endpoints"].items():
+            old = old_size["endpoints"].get(name)
+            if old is None:
+                continue
+            change = (stats["median_ms"] / old["median_ms"] - 1) * 100
+            print(
+                f"  {name:<26}{old['median_ms']:>12.2f}"
+                f"{stats['median_ms']:>12.2f}{change:>+9.1f}%"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--sizes", nargs="+", choices=SIZES, default=["small", "medium"]
+    )
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        help="Earlier result file to compare the medians against.",
+    )
+    options = parser.parse_args()
+
+    setup_django()
+    import django
+    from django.db import connection
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "repeat": options.repeat,
+        "sizes": {},
+    }
+    for size in options.sizes:
+        with test_database():
+            results["sizes"][size] = run_size(SIZES[size], options.repeat)
+
+    output = options.output or RESULTS_DIR / f"api-{results['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+    if options.compare:
+        compare(results, json.loads(options.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Per-request JWT authentication overhead.
+
+    python -m benchmarks.auth_overhead --repeat 2000
+
+Compares simplejwt's ``JWTAuthentication`` (one user query per request)
+with ``CachedJWTAuthentication`` in cached and stateless mode.
+"""
+
+import argparse
+import json
+
+from benchmarks.utils import measure, setup_django, test_database
+
+
+def run(repeat):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext, override_settings
+    from rest_framework.test import APIRequestFactory
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    from user.authentication import CachedJWTAuthentication, user_cache
+    from user.serializers import TokenObtainPairWithClaimsSerializer
+
+    user = get_user_model().objects.create_user(
+        email="bench@mail.tt", password="benchpassword"
+    )
+    token = TokenObtainPairWithClaimsSerializer.get_token(user).access_token
+    request = APIRequestFactory().get(
+        "/", HTTP_AUTHORIZATION=f"Bearer {token}"
+    )
+
+    variants = {
+        "jwt": (JWTAuthentication(), False),
+        "cached_jwt": (CachedJWTAuthentication(), False),
+        "stateless_jwt": (CachedJWTAuthentication(), True),
+    }
+    results = {}
+    for name, (authentication, stateless) in variants.items():
+        user_cache.clear()
+        with override_settings(
+            AUTH_USER_CACHE={**settings.AUTH_USER_CACHE, "STATELESS": stateless}
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                timings = measure(
+                    lambda: authentication.authenticate(request), repeat
+                )
+        results[name] = {
+            **timings,
+            "queries_per_call": len(queries) / (repeat + 10),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=1000)
+    options = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        print(json.dumps(run(options.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+The calls behind the trip detail screen, one by one and as a batch.
+
+    python -m benchmarks.batch --repeat 200
+
+Creates a load data network, then times the trip, its route, the
+trains, the crews and the user's orders fetched with five requests
+against one ``POST /batch/`` of the same calls. Requests carry a real
+JWT and pass the throttles (with rates too high to reject), so the
+per-request authentication and throttling cost is part of the timing.
+"""
+
+import argparse
+import json
+
+from benchmarks.utils import measure, setup_django, test_database
+
+
+def screen_paths(trip):
+    return [
+        f"/train-station/trips/{trip.id}/",
+        f"/train-station/routes/?source={trip.route.source.name}",
+        "/train-station/trains/",
+        "/train-station/crews/",
+        "/train-station/orders/",
+    ]
+
+
+def run(repeat, params, workers):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test.utils import override_settings
+    from rest_framework.test import APIClient
+    from rest_framework.throttling import SimpleRateThrottle
+
+    from train_station.batch import get_pool
+    from train_station.fares import fare_table
+    from train_station.load_data import generate_load_data
+    from train_station.models import Trip
+    from user.serializers import TokenObtainPairWithClaimsSerializer
+
+    counts = generate_load_data(**params, seed=0).counts
+    SimpleRateThrottle.THROTTLE_RATES.update(
+        {scope: "1000000/min" for scope in ("anon", "user", "orders", "trips")}
+    )
+    user = get_user_model().objects.filter(email__endswith="@load.test").first()
+    token = TokenObtainPairWithClaimsSerializer.get_token(user).access_token
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    fare_table.load()
+
+    trip = Trip.objects.select_related("route__source").order_by("id").first()
+    paths = screen_paths(trip)
+    payload = {"operations": [{"method": "GET", "path": path} for path in paths]}
+
+    def separate():
+        for path in paths:
+            response = client.get(path)
+            assert response.status_code == 200, response.content[:500]
+
+    def batch():
+        response = client.post("/train-station/batch/", payload, format="json")
+        assert response.status_code == 200, response.content[:500]
+        assert all(result["status"] == 200 for result in response.data["results"])
+
+    results = {"data": counts, "calls": len(paths)}
+    results["separate"] = measure(separate, repeat)
+    for threads in workers:
+        get_pool.cache_clear()
+        with override_settings(BATCH={**settings.BATCH, "MAX_WORKERS": threads}):
+            results[f"batch_{threads}_workers"] = measure(batch, repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    options = parser.parse_args()
+
+    setup_django()
+    params = {"stations": 50, "routes": 100, "trains": 20, "days": 3}
+    with test_database():
+        print(json.dumps(run(options.repeat, params, options.workers), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Order creation with ticket pricing, and fare table rebuilds.
+
+    python -m benchmarks.fares --repeat 200
+
+Creates a load data network with fare rules for every train type, then
+times ``POST /orders/`` of 10 tickets with the fare table built (the
+normal case) and rebuilt on every request (the cost pricing would have
+without the in-memory table), and a full table build against the
+incremental update after a route or fare rule change.
+"""
+
+import argparse
+import json
+from decimal import Decimal
+
+from benchmarks.utils import measure, setup_django, test_database
+
+ORDER_SIZE = 10
+
+
+def order_payload():
+    from train_station.models import Trip
+
+    trip = Trip.objects.select_related("train").order_by("departure_time").first()
+    taken = set(trip.tickets.values_list("cargo", "seat"))
+    seats = [
+        (cargo, seat)
+        for cargo in range(1, trip.train.cargo_num + 1)
+        for seat in range(1, trip.train.places_in_cargo + 1)
+        if (cargo, seat) not in taken
+    ]
+    return {
+        "tickets": [
+            {"trip": trip.id, "cargo": cargo, "seat": seat}
+            for cargo, seat in seats[:ORDER_SIZE]
+        ]
+    }
+
+
+def run(repeat, params):
+    from django.contrib.auth import get_user_model
+    from django.db import connection, transaction
+    from rest_framework.test import APIClient
+    from rest_framework.throttling import SimpleRateThrottle
+
+    from train_station.fares import fare_table
+    from train_station.load_data import generate_load_data
+    from train_station.models import FareRule, Route, Train, TrainType
+
+    counts = generate_load_data(**params, seed=0).counts
+    Train.objects.update(first_class_cargos=1)
+    FareRule.objects.bulk_create(
+        FareRule(
+            train_type=train_type,
+            seat_class=seat_class,
+            base_fare=Decimal(base_fare),
+            per_km=Decimal(per_km),
+        )
+        for train_type in TrainType.objects.all()
+        for seat_class, base_fare, per_km in (
+            (FareRule.FIRST, "12.00", "0.25"),
+            (FareRule.SECOND, "6.00", "0.12"),
+        )
+    )
+
+    SimpleRateThrottle.THROTTLE_RATES.update(
+        {"anon": None, "user": None, "orders": None, "trips": None}
+    )
+    client = APIClient()
+    client.force_authenticate(
+        get_user_model().objects.filter(email__endswith="@load.test").first()
+    )
+    payload = order_payload()
+
+    def create_order(rebuild):
+        if rebuild:
+            fare_table.clear()
+        with transaction.atomic():
+            response = client.post("/train-station/orders/", payload, format="json")
+            transaction.set_rollback(True)
+        assert response.status_code == 201, response.content[:500]
+
+    def count_query(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    results = {"data": counts, "fare_rules": FareRule.objects.count()}
+    for name, rebuild in (("order_create", False), ("order_create_cold", True)):
+        fare_table.load()
+        # The request resets connection.queries, so count with a wrapper.
+        queries = []
+        with connection.execute_wrapper(count_query):
+            create_order(rebuild)
+        results[name] = {
+            **measure(lambda: create_order(rebuild), repeat, warmup=2),
+            "queries": len(queries),
+        }
+
+    route = Route.objects.first()
+    rule = FareRule.objects.first()
+    rule_values = (rule.base_fare, rule.per_km)
+    results["table_build"] = measure(fare_table.load, repeat=20, warmup=1)
+    results["route_update"] = measure(
+        lambda: fare_table.update_route(route.id, route.distance), repeat
+    )
+    results["rule_update"] = measure(
+        lambda: fare_table.update_rule(
+            rule.train_type_id, rule.seat_class, rule_values
+        ),
+        repeat,
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--routes", type=int, default=1000)
+    parser.add_argument("--trains", type=int, default=50)
+    options = parser.parse_args()
+
+    setup_django()
+    params = {
+        "stations": 300,
+        "routes": options.routes,
+        "trains": options.trains,
+        "days": 2,
+    }
+    with test_database():
+        print(json.dumps(run(options.repeat, params), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Serving the OpenAPI schema: live generation against the build artifact.
+
+    python -m benchmarks.schema --repeat 200
+
+Times ``/api/doc/`` with ``DEBUG`` (schema generated per request) and
+without (artifact written by ``build_schema``), the latter both as a full
+gzip response and as a 304 revalidation.
+"""
+
+import argparse
+import json
+import tempfile
+
+from benchmarks.utils import measure, setup_django, test_database
+
+
+def run(repeat):
+    from django.test import Client
+    from django.test.utils import override_settings
+    from rest_framework.throttling import SimpleRateThrottle
+
+    from core.schema import load_artifact, write_schema_artifacts
+
+    SimpleRateThrottle.THROTTLE_RATES.update({"anon": None, "user": None})
+    client = Client()
+    results = {}
+
+    def case(name, repeat, **headers):
+        response = client.get("/api/doc/", headers=headers)
+        timings = measure(
+            lambda: client.get("/api/doc/", headers=headers), repeat, warmup=3
+        )
+        results[name] = {
+            **timings,
+            "status": response.status_code,
+            "bytes": len(response.content),
+        }
+        return response
+
+    with override_settings(DEBUG=True):
+        case("live", max(repeat // 10, 5))
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_schema_artifacts(directory)
+        load_artifact.cache_clear()
+        with override_settings(DEBUG=False, SCHEMA_ARTIFACT_DIR=directory):
+            case("artifact", repeat)
+            response = case("artifact_gzip", repeat, accept_encoding="gzip")
+            case(
+                "artifact_304",
+                repeat,
+                accept_encoding="gzip",
+                if_none_match=response["ETag"],
+            )
+        load_artifact.cache_clear()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    options = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        print(json.dumps(run(options.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Trip detail payload size and latency by seat map encoding.
+
+    python -m benchmarks.seat_maps --repeat 200
+
+Creates a 1000 seat train (20 cargos of 50) and trips with 10%, 50%
+and 100% of the seats sold, then fetches ``GET /trips/<id>/`` with the
+default list of sold seats and with ``?seat_map=bitmap`` and
+``?seat_map=ranges``. The half sold trip has random seats sold, the
+worst case for ranges.
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.utils import measure, setup_django, test_database
+
+CARGOS = 20
+PLACES = 50
+LOADS = (0.1, 0.5, 1.0)
+
+
+def create_trips():
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from train_station.models import (
+        Order,
+        Route,
+        Station,
+        Ticket,
+        Train,
+        TrainType,
+        Trip,
+    )
+
+    user = get_user_model().objects.create_user(
+        email="bench@mail.tt", password="benchpassword"
+    )
+    source = Station.objects.create(name="Kyiv", latitude=50.4, longitude=30.5)
+    destination = Station.objects.create(name="Lviv", latitude=49.8, longitude=24.0)
+    route = Route.objects.create(source=source, destination=destination, distance=540)
+    train = Train.objects.create(
+        name="Bench",
+        cargo_num=CARGOS,
+        places_in_cargo=PLACES,
+        train_type=TrainType.objects.create(name="Bench"),
+    )
+    seats = [
+        (cargo, seat)
+        for cargo in range(1, CARGOS + 1)
+        for seat in range(1, PLACES + 1)
+    ]
+    departure = timezone.make_aware(datetime(2030, 1, 1, 8))
+    trips = {}
+    rng = random.Random(0)
+    for day, load in enumerate(LOADS):
+        trip = Trip.objects.create(
+            route=route,
+            train=train,
+            departure_time=departure + timedelta(days=day),
+            arrival_time=departure + timedelta(days=day, hours=5),
+        )
+        order = Order.objects.create(user=user)
+        Ticket.objects.bulk_create(
+            Ticket(trip=trip, order=order, cargo=cargo, seat=seat)
+            for cargo, seat in rng.sample(seats, int(len(seats) * load))
+        )
+        trips[f"{int(load * 100)}%"] = trip
+    return user, trips
+
+
+def run(repeat):
+    from rest_framework.test import APIClient
+    from rest_framework.throttling import SimpleRateThrottle
+
+    from train_station.fares import fare_table
+
+    SimpleRateThrottle.THROTTLE_RATES.update(
+        {"anon": None, "user": None, "orders": None, "trips": None}
+    )
+    user, trips = create_trips()
+    client = APIClient()
+    client.force_authenticate(user)
+    fare_table.load()
+
+    results = {}
+    for load, trip in trips.items():
+        url = f"/train-station/trips/{trip.id}/"
+        for seat_map in ("list", "bitmap", "ranges"):
+
+            def fetch():
+                response = client.get(url, {"seat_map": seat_map})
+                assert response.status_code == 200, response.content[:500]
+                return response
+
+            results[f"{load} {seat_map}"] = {
+                **measure(fetch, repeat),
+                "bytes": len(fetch().content),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=100)
+    options = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        print(json.dumps(run(options.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Compare sync (WSGI) and async (ASGI) workers under concurrent slow clients.
+
+Start the server under test, e.g.
+
+    gunicorn core.wsgi -w 4 -b 127.0.0.1:8001
+    uvicorn core.asgi:application --workers 4 --port 8002
+
+then point the benchmark at a read endpoint of each one:
+
+    python benchmarks/slow_clients.py \\
+        --url http://127.0.0.1:8001/train-station/trips/ --token <access>
+    python benchmarks/slow_clients.py \\
+        --url http://127.0.0.1:8002/train-station/async/trips/ --token <access>
+
+Slow clients open a connection and trickle their request headers over
+``--slow-seconds``, like kiosks and mobile clients on bad networks.
+While they are connected, fast clients measure the latency of normal
+requests. Results are printed as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+def build_request(url, token):
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    lines = [
+        f"GET {path} HTTP/1.1",
+        f"Host: {parts.netloc}",
+        "Accept: application/json",
+        "Connection: close",
+    ]
+    if token:
+        lines.append(f"Authorization: Bearer {token}")
+    return parts.hostname, parts.port or 80, lines
+
+
+async def read_status(reader):
+    status_line = await reader.readline()
+    await reader.read()
+    try:
+        return int(status_line.split()[1])
+    except (IndexError, ValueError):
+        return 0
+
+
+async def slow_client(host, port, lines, duration):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        return 0
+    delay = duration / len(lines)
+    try:
+        for line in lines:
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+            await asyncio.sleep(delay)
+        writer.write(b"\r\n")
+        await writer.drain()
+        return await read_status(reader)
+    except (OSError, asyncio.IncompleteReadError):
+        return 0
+    finally:
+        writer.close()
+
+
+async def fast_client(host, port, lines, timeout):
+    started = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), timeout
+        )
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+        await writer.drain()
+        status = await asyncio.wait_for(read_status(reader), timeout)
+        writer.close()
+    except (OSError, asyncio.TimeoutError):
+        status = 0
+    return status, time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run(options):
+    host, port, lines = build_request(options.url, options.token)
+    slow = [
+        asyncio.create_task(
+            slow_client(host, port, lines, options.slow_seconds)
+        )
+        for _ in range(options.slow_clients)
+    ]
+    await asyncio.sleep(options.warmup)
+
+    started = time.perf_counter()
+    fast = await asyncio.gather(
+        *(
+            fast_client(host, port, lines, options.timeout)
+            for _ in range(options.fast_requests)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    slow_statuses = await asyncio.gather(*slow)
+
+    latencies = [latency for status, latency in fast if status == 200]
+    return {
+        "url": options.url,
+        "slow_clients": options.slow_clients,
+        "slow_seconds": options.slow_seconds,
+        "fast_requests": options.fast_requests,
+        "fast_ok": len(latencies),
+        "fast_failed": len(fast) - len(latencies),
+        "fast_rps": len(latencies) / elapsed if elapsed else None,
+        "fast_latency_p50_ms": (
+            statistics.median(latencies) * 1000 if latencies else None
+        ),
+        "fast_latency_p95_ms": (
+            percentile(latencies, 0.95) * 1000 if latencies else None
+        ),
+        "slow_ok": sum(1 for status in slow_statuses if status == 200),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--token", help="JWT access token")
+    parser.add_argument("--slow-clients", type=int, default=50)
+    parser.add_argument("--slow-seconds", type=float, default=10.0)
+    parser.add_argument("--fast-requests", type=int, default=100)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    options = parser.parse_args()
+    print(json.dumps(asyncio.run(run(options)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Cold start of a worker: time to the first response per settings module.
+
+    python -m benchmarks.startup --repeat 10
+
+For each settings module, fresh interpreters are started ``--repeat``
+times to measure ``manage.py check`` end to end and, for the WSGI
+application, the ``core.wsgi`` import and the first request to
+``--url`` (an unauthenticated API request by default, so no database is
+needed). Medians are printed in ms.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SETTINGS_MODULES = ("core.settings", "core.settings_production")
+
+WSGI_CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from core.wsgi import application
+imported = time.perf_counter()
+statuses = []
+body = application(
+    {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": sys.argv[1],
+        "QUERY_STRING": "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "HTTP_HOST": "localhost",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": sys.stdin.buffer,
+        "wsgi.errors": sys.stderr,
+    },
+    lambda status, headers, exc_info=None: statuses.append(status),
+)
+b"".join(body)
+responded = time.perf_counter()
+print(json.dumps({
+    "status": statuses[0],
+    "import_ms": (imported - started) * 1000,
+    "first_response_ms": (responded - imported) * 1000,
+    "modules": len(sys.modules),
+}))
+"""
+
+
+def run_process(args, settings_module):
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": settings_module,
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmark"),
+        "REQUEST_STATS_LOG_LEVEL": "WARNING",
+    }
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *args],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        stdin=subprocess.DEVNULL,
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    if result.returncode:
+        raise RuntimeError(result.stderr)
+    return elapsed, result.stdout
+
+
+def run(settings_module, repeat, url):
+    manage, wsgi, samples = [], [], []
+    for _ in range(repeat):
+        manage.append(run_process(["manage.py", "check"], settings_module)[0])
+        elapsed, output = run_process(["-c", WSGI_CHILD, url], settings_module)
+        wsgi.append(elapsed)
+        samples.append(json.loads(output.splitlines()[-1]))
+    return {
+        "manage_check_ms": statistics.median(manage),
+        "wsgi_process_ms": statistics.median(wsgi),
+        "wsgi_import_ms": statistics.median(s["import_ms"] for s in samples),
+        "first_response_ms": statistics.median(s["first_response_ms"] for s in samples),
+        "status": samples[0]["status"],
+        "modules": samples[0]["modules"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--url", default="/train-station/trips/")
+    parser.add_argument(
+        "--settings", nargs="+", default=SETTINGS_MODULES, metavar="MODULE"
+    )
+    options = parser.parse_args()
+
+    results = {
+        settings_module: {
+            key: round(value, 1) if isinstance(value, float) else value
+            for key, value in run(settings_module, options.repeat, options.url).items()
+        }
+        for settings_module in options.settings
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Repeated trip searches with and without the search cache.
+
+    python -m benchmarks.trip_search --repeat 500
+
+Creates a load data network and times one station search
+(``GET /trips/?source_station=&destination_station=``) served from
+``trip_search_cache``, with the tickets taken of the listed trips
+reloaded (as after sales in other workers), and with the cache cleared
+before every call.
+"""
+
+import argparse
+import json
+
+from benchmarks.utils import measure, setup_django, test_database
+
+
+def run(repeat, params):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import override_settings
+    from rest_framework.test import APIClient
+    from rest_framework.throttling import SimpleRateThrottle
+
+    from train_station.fares import fare_table
+    from train_station.load_data import generate_load_data
+    from train_station.models import Trip
+    from train_station.trip_search import trip_search_cache
+
+    counts = generate_load_data(**params, seed=0).counts
+    SimpleRateThrottle.THROTTLE_RATES.update(
+        {"anon": None, "user": None, "orders": None, "trips": None}
+    )
+    client = APIClient()
+    client.force_authenticate(
+        get_user_model().objects.filter(email__endswith="@load.test").first()
+    )
+    fare_table.load()
+
+    trip = Trip.objects.select_related("route__source", "route__destination").first()
+    search = {
+        "source_station": trip.route.source.name,
+        "destination_station": trip.route.destination.name[:3],
+    }
+
+    def fetch():
+        response = client.get("/train-station/trips/", search)
+        assert response.status_code == 200, response.content[:500]
+
+    def overlay_reload():
+        # Every count expired, as after sales in other workers.
+        with override_settings(
+            TRIP_SEARCH_CACHE={**settings.TRIP_SEARCH_CACHE, "OVERLAY_TIMEOUT": 0}
+        ):
+            fetch()
+
+    def uncached():
+        trip_search_cache.clear()
+        fetch()
+
+    def count_query(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    results = {"data": counts}
+    for name, func in (
+        ("cached", fetch),
+        ("overlay_reload", overlay_reload),
+        ("uncached", uncached),
+    ):
+        fetch()
+        # The request resets connection.queries, so count with a wrapper.
+        queries = []
+        with connection.execute_wrapper(count_query):
+            func()
+        results[name] = {**measure(func, repeat), "queries": len(queries)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    options = parser.parse_args()
+
+    setup_django()
+    params = {"stations": 100, "routes": 300, "trains": 50, "days": 30}
+    with test_database():
+        print(json.dumps(run(options.repeat, params), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+
+_read_database = ContextVar("read_database", default=None)
+_replica_lag = {}
+
+PIN_KEY = "replica:pin:{}"
+
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+def set_read_database(alias):
+    """
+    Route reads of the current request (or task) to ``alias``,
+    ``None`` sends them back to the primary.
+    """
+    _read_database.set(alias)
+
+
+def get_read_database():
+    return _read_database.get()
+
+
+def measure_lag(alias):
+    """
+    Replication lag of a replica in seconds, ``inf`` if it is unreachable.
+    """
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_LAG_SQL)
+            return float(cursor.fetchone()[0] or 0)
+    except DatabaseError:
+        return float("inf")
+
+
+def replica_lag(alias):
+    """
+    Cached replication lag, refreshed every ``REPLICA_LAG_CHECK_INTERVAL``.
+    """
+    checked_at, lag = _replica_lag.get(alias, (None, None))
+    now = time.monotonic()
+    if checked_at is None or now - checked_at > settings.REPLICA_LAG_CHECK_INTERVAL:
+        lag = measure_lag(alias)
+        _replica_lag[alias] = (now, lag)
+    return lag
+
+
+def choose_replica():
+    """
+    Pick a replica whose lag is within ``REPLICA_MAX_LAG``,
+    or ``None`` when reads must go to the primary.
+    """
+    healthy = [
+        alias for alias in settings.REPLICA_DATABASES
+        if replica_lag(alias) <= settings.REPLICA_MAX_LAG
+    ]
+    return random.choice(healthy) if healthy else None
+
+
+def pin_to_primary(user):
+    """
+    Keep a user's reads on the primary for ``REPLICA_MAX_LAG`` seconds
+    after a write, so they read their own writes.
+    """
+    if settings.REPLICA_DATABASES and user and user.is_authenticated:
+        caches[settings.REPLICA_PIN_CACHE].set(
+            PIN_KEY.format(user.pk), True, settings.REPLICA_MAX_LAG
+        )
+
+
+def is_pinned_to_primary(user):
+    if not (settings.REPLICA_DATABASES and user and user.is_authenticated):
+        return False
+    return bool(caches[settings.REPLICA_PIN_CACHE].get(PIN_KEY.format(user.pk)))
+
+
+class PrimaryReplicaRouter:
+    """
+    Send reads to the replica selected for the current request and
+    every write to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
@@ -0,0 +1,87 @@
+"""
+Prometheus metrics.
+
+With several worker processes, set ``PROMETHEUS_MULTIPROC_DIR`` to an
+empty directory shared by the workers (and wiped on restart): every
+worker then writes its samples to files there and ``/metrics`` sums them
+across workers, whichever worker serves the scrape.
+"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by endpoint (view and action).",
+    ["method", "endpoint", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests being served.",
+    multiprocess_mode="livesum",
+)
+DB_QUERIES = Counter(
+    "db_queries_total",
+    "SQL queries issued by endpoint.",
+    ["endpoint"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Total SQL time per request by endpoint.",
+    ["endpoint"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result (hit or miss); "
+    "the hit ratio is hits / all lookups.",
+    ["cache", "result"],
+)
+BOOKING_CONFLICTS = Counter(
+    "booking_conflicts_total",
+    "Tickets rejected because the seat was already taken.",
+)
+THROTTLE_REJECTIONS = Counter(
+    "throttle_rejections_total",
+    "Requests rejected by a throttle, by throttle scope.",
+    ["scope"],
+)
+
+
+def observe_request(stats):
+    """
+    Record the ``core.middleware.RequestStats`` of a finished request.
+    """
+    REQUEST_LATENCY.labels(stats.method, stats.endpoint, stats.status).observe(
+        stats.total_time
+    )
+    DB_QUERIES.labels(stats.endpoint).inc(stats.queries)
+    DB_QUERY_DURATION.labels(stats.endpoint).observe(stats.db_time)
+
+
+def record_cache_lookup(cache, hit):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def render_metrics():
+    """
+    The exposition text and its content type, summed over all workers in
+    multiprocess mode.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
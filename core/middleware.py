@@ -0,0 +1,257 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.backends.signals import connection_created
+
+from core.metrics import REQUESTS_IN_PROGRESS, observe_request
+from core.slow_queries import record_slow_query
+
+logger = logging.getLogger(__name__)
+
+_query_hooks = ContextVar("query_hooks", default=())
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    ``execute_wrapper`` of every connection running the query hooks of
+    the current request, outermost first. The hooks live in a context
+    variable, which ``sync_to_async`` copies into the thread running
+    the ORM calls of async views.
+    """
+    for hook in reversed(_query_hooks.get()):
+        execute = partial(hook, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_hook(sender=None, connection=None, **kwargs):
+    # First in the list, so that ``execute_wrapper()`` blocks entered
+    # before the connection was opened still pop their own wrapper.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def install_query_hooks():
+    """
+    Hook the connections of this thread and every connection opened
+    from now on, in any thread.
+    """
+    connection_created.connect(
+        install_query_hook, dispatch_uid="core.middleware.install_query_hook"
+    )
+    for connection in connections.all():
+        install_query_hook(connection=connection)
+
+
+@contextmanager
+def query_hook(hook):
+    """
+    Run ``hook`` (an ``execute_wrapper`` callable) around the queries of
+    the current request, whichever thread runs them.
+    """
+    token = _query_hooks.set((*_query_hooks.get(), hook))
+    try:
+        yield
+    finally:
+        _query_hooks.reset(token)
+
+
+class RequestStats:
+    """
+    SQL and timing figures of one request.
+    """
+
+    def __init__(self, request):
+        self.method = request.method
+        self.path = request.path
+        self.endpoint = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.total_time = 0.0
+        self.status = None
+        self.size = None
+        self.slow_queries = []
+        self._slow_threshold = settings.SLOW_QUERY_LOG["THRESHOLD_MS"] / 1000
+        self._render_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        ``connection.execute_wrapper`` hook counting queries and DB time.
+        """
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.db_time += duration
+            self.queries += 1
+            if duration >= self._slow_threshold and not many:
+                self.slow_queries.append(
+                    (context["connection"], sql, params, duration)
+                )
+
+    def as_dict(self):
+        return {
+            "endpoint": self.endpoint,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "queries": self.queries,
+            "db_ms": round(self.db_time * 1000, 2),
+            "serialize_ms": round(self.serialize_time * 1000, 2),
+            "total_ms": round(self.total_time * 1000, 2),
+            "size": self.size,
+        }
+
+
+class RequestStatsAggregator:
+    """
+    Per-endpoint totals of ``RequestStats`` kept in process memory.
+    """
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def add(self, stats):
+        with self._lock:
+            totals = self._endpoints.setdefault(
+                stats.endpoint,
+                {
+                    "requests": 0,
+                    "errors": 0,
+                    "queries": 0,
+                    "max_queries": 0,
+                    "db_time": 0.0,
+                    "serialize_time": 0.0,
+                    "total_time": 0.0,
+                    "bytes": 0,
+                },
+            )
+            totals["requests"] += 1
+            totals["errors"] += stats.status >= 500
+            totals["queries"] += stats.queries
+            totals["max_queries"] = max(totals["max_queries"], stats.queries)
+            totals["db_time"] += stats.db_time
+            totals["serialize_time"] += stats.serialize_time
+            totals["total_time"] += stats.total_time
+            totals["bytes"] += stats.size or 0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: dict(totals)
+                for endpoint, totals in self._endpoints.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+request_stats = RequestStatsAggregator()
+
+
+def get_endpoint_name(view_func):
+    """
+    ``"TripViewSet.list"`` for viewset actions, the view name otherwise.
+    """
+    view_class = getattr(view_func, "cls", None) or getattr(
+        view_func, "view_class", None
+    )
+    if view_class is None:
+        return f"{view_func.__module__}.{view_func.__name__}"
+    return view_class.__name__
+
+
+class RequestStatsMiddleware:
+    """
+    Record the query count, DB time, serialization (response rendering)
+    time and response size of every request, log them as one JSON line
+    on the ``core.middleware`` logger and add them to ``request_stats``
+    and the Prometheus metrics. Queries slower than
+    ``SLOW_QUERY_LOG["THRESHOLD_MS"]`` go to ``core.slow_queries``.
+    Under ASGI it runs in the event loop, without a thread hop.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        install_query_hooks()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = request.request_stats = RequestStats(request)
+        started = time.perf_counter()
+        with REQUESTS_IN_PROGRESS.track_inprogress(), query_hook(stats):
+            response = self.get_response(request)
+        self.finish(stats, response, started)
+        if stats.slow_queries:
+            self.record_slow_queries(stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = request.request_stats = RequestStats(request)
+        started = time.perf_counter()
+        with REQUESTS_IN_PROGRESS.track_inprogress(), query_hook(stats):
+            response = await self.get_response(request)
+        self.finish(stats, response, started)
+        if stats.slow_queries:
+            # The slow query log is written with the sync ORM.
+            await sync_to_async(self.record_slow_queries)(stats)
+        return response
+
+    def finish(self, stats, response, started):
+        finished = time.perf_counter()
+        stats.total_time = finished - started
+        if stats._render_started is not None:
+            stats.serialize_time = finished - stats._render_started
+        stats.status = response.status_code
+        if not response.streaming:
+            stats.size = len(response.content)
+        if stats.endpoint is None:
+            stats.endpoint = "unresolved"
+
+        request_stats.add(stats)
+        observe_request(stats)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(stats.as_dict()))
+
+    @staticmethod
+    def record_slow_queries(stats):
+        for connection, sql, params, duration in stats.slow_queries:
+            # Explained on this thread's connection to the same database.
+            connection = connections[connection.alias]
+            try:
+                record_slow_query(connection, sql, params, duration, stats.endpoint)
+            except DatabaseError:
+                logger.exception("Could not record a slow query")
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        endpoint = get_endpoint_name(view_func)
+        actions = getattr(view_func, "actions", None)
+        if actions:
+            endpoint = f"{endpoint}.{actions.get(request.method.lower(), 'unknown')}"
+        request.request_stats.endpoint = endpoint
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook returns.
+        request.request_stats._render_started = time.perf_counter()
+        return response
@@ -0,0 +1,262 @@
+"""
+On-demand profiling of single API requests for staff users.
+
+Add ``?profile=1`` (or an ``X-Profile: 1`` header) to a request to get
+the usual response with an ``X-Profile-Report`` header naming a report
+stored in ``PROFILE_DIR``, or ``?profile=download`` to get the report as
+an attachment instead of the response. Reports hold the cProfile
+functions by cumulative time, every SQL query with its duration and
+origin, and the request time split into view, serializer, rendering and
+database time. Stored reports are served to staff at
+``/profiles/<id>/``, the raw cProfile data at ``/profiles/<id>/?download=prof``.
+
+cProfile only sees the thread that enables it. Async views are profiled
+in the event loop: the code they run through ``sync_to_async``
+(authentication, permissions, ORM calls) is missing from the functions,
+though its queries are recorded, and other requests served by the loop
+meanwhile are included. Such reports are marked ``"async": true``.
+"""
+
+import cProfile
+import json
+import pstats
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+from rest_framework.exceptions import APIException
+from rest_framework.serializers import BaseSerializer
+from rest_framework.settings import api_settings
+
+from core import middleware
+
+SERIALIZER_ENTRY_POINTS = (
+    BaseSerializer.data.fget,
+    BaseSerializer.is_valid,
+    BaseSerializer.save,
+)
+INSTRUMENTATION_FILES = (__file__, middleware.__file__)
+TOP_FUNCTIONS = 60
+
+
+def profile_flag(request):
+    """
+    ``"download"``, ``"store"`` or ``None`` when profiling is not asked for.
+    """
+    flag = request.GET.get("profile") or request.headers.get("X-Profile")
+    if not flag or flag == "0":
+        return None
+    return "download" if flag == "download" else "store"
+
+
+def authenticate_staff(request):
+    """
+    Authenticate the raw Django request with the API authentication
+    classes; profiling is only done for staff users.
+    """
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(request)
+        except APIException:
+            return False
+        if result is not None:
+            return result[0].is_staff
+    return False
+
+
+def is_project_file(filename):
+    return (
+        filename.startswith(str(settings.BASE_DIR))
+        and "site-packages" not in filename
+        and filename not in INSTRUMENTATION_FILES
+    )
+
+
+def code_key(function):
+    code = function.__code__
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+class QueryRecorder:
+    """
+    ``connection.execute_wrapper`` hook keeping every query with its
+    duration and the innermost project frame that issued it.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            origin, in_serializer = self.inspect_stack()
+            self.queries.append(
+                {
+                    "sql": sql,
+                    "params": None if many else repr(params),
+                    "duration_ms": round(duration * 1000, 3),
+                    "origin": origin,
+                    "in_serializer": in_serializer,
+                }
+            )
+
+    @staticmethod
+    def inspect_stack():
+        origin = None
+        in_serializer = False
+        frame = sys._getframe(2)
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.endswith("serializers.py"):
+                in_serializer = True
+            if origin is None and is_project_file(filename):
+                origin = (
+                    f"{Path(filename).relative_to(settings.BASE_DIR)}:"
+                    f"{frame.f_lineno} in {frame.f_code.co_name}"
+                )
+            frame = frame.f_back
+        return origin, in_serializer
+
+
+def build_report(request, response, profiler, queries, total_time):
+    stats = pstats.Stats(profiler)
+    cumulative = {key: value[3] for key, value in stats.stats.items()}
+    serializer_time = sum(
+        cumulative.get(code_key(function), 0)
+        for function in SERIALIZER_ENTRY_POINTS
+    )
+    render_time = cumulative.get(code_key(SimpleTemplateResponse.render), 0)
+    db_time = sum(query["duration_ms"] for query in queries) / 1000
+    serializer_db_time = sum(
+        query["duration_ms"] for query in queries if query["in_serializer"]
+    ) / 1000
+    serializer_time -= serializer_db_time
+
+    functions = sorted(stats.stats.items(), key=lambda item: -item[1][3])
+    return {
+        "method": request.method,
+        "path": request.get_full_path(),
+        "status": response.status_code,
+        "total_ms": round(total_time * 1000, 2),
+        "split_ms": {
+            "view": round(
+                (total_time - serializer_time - render_time - db_time) * 1000, 2
+            ),
+            "serializer": round(serializer_time * 1000, 2),
+            "render": round(render_time * 1000, 2),
+            "db": round(db_time * 1000, 2),
+        },
+        "query_count": len(queries),
+        "queries": queries,
+        "functions": [
+            {
+                "function": pstats.func_std_string(key),
+                "calls": calls,
+                "tottime_ms": round(tottime * 1000, 3),
+                "cumtime_ms": round(cumtime * 1000, 3),
+            }
+            for key, (_, calls, tottime, cumtime, _) in functions[:TOP_FUNCTIONS]
+        ],
+    }
+
+
+def report_path(report_id, suffix):
+    return Path(settings.PROFILE_DIR) / f"{report_id}.{suffix}"
+
+
+def store_report(report, profiler):
+    report_id = str(uuid.uuid4())
+    report["id"] = report_id
+    Path(settings.PROFILE_DIR).mkdir(parents=True, exist_ok=True)
+    report_path(report_id, "json").write_text(json.dumps(report, indent=2))
+    profiler.dump_stats(report_path(report_id, "prof"))
+    return report_id
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests of staff users that ask for it (see module docstring).
+    Requests without the flag go straight through, in the event loop
+    under ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        middleware.install_query_hooks()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        flag = profile_flag(request)
+        if flag is None or not authenticate_staff(request):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with middleware.query_hook(recorder):
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        total_time = time.perf_counter() - started
+        return self.respond(
+            flag, request, response, profiler, recorder, total_time
+        )
+
+    async def __acall__(self, request):
+        flag = profile_flag(request)
+        if flag is None or not await sync_to_async(authenticate_staff)(request):
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with middleware.query_hook(recorder):
+            profiler.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profiler.disable()
+        total_time = time.perf_counter() - started
+        return await sync_to_async(self.respond)(
+            flag, request, response, profiler, recorder, total_time, True
+        )
+
+    @staticmethod
+    def respond(
+        flag, request, response, profiler, recorder, total_time, is_async=False
+    ):
+        report = build_report(
+            request, response, profiler, recorder.queries, total_time
+        )
+        report["async"] = is_async
+        report_id = store_report(report, profiler)
+        if flag == "download":
+            response = HttpResponse(
+                json.dumps(report, indent=2), content_type="application/json"
+            )
+            response["Content-Disposition"] = (
+                f'attachment; filename="profile-{report_id}.json"'
+            )
+        response["X-Profile-Report"] = report_id
+        return response
+
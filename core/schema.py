@@ -0,0 +1,144 @@
+"""
+OpenAPI schema served from artifacts generated at build time.
+
+``manage.py build_schema`` writes the schema as YAML and JSON, each with
+a gzip copy, to ``SCHEMA_ARTIFACT_DIR``. ``schema_view`` serves them with
+a strong ETag, so unchanged schemas are answered with 304, and sends the
+gzip copy to clients that accept it. With ``DEBUG`` the schema is
+generated on every request, as before, so it follows code changes.
+drf-spectacular itself is only imported when a schema is generated or
+the Swagger or Redoc page is requested.
+"""
+
+import gzip
+import hashlib
+import logging
+from functools import cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    "yaml": ("openapi.yaml", "application/vnd.oai.openapi; charset=utf-8"),
+    "json": ("openapi.json", "application/vnd.oai.openapi+json; charset=utf-8"),
+}
+
+
+def register_extensions():
+    import user.schema  # noqa: F401
+
+
+def generate_schema():
+    """
+    Render the schema of the whole API as ``{format: bytes}``.
+    """
+    register_extensions()
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        "yaml": OpenApiYamlRenderer().render(schema, renderer_context={}),
+        "json": OpenApiJsonRenderer().render(schema, renderer_context={}),
+    }
+
+
+def write_schema_artifacts(directory=None):
+    """
+    Write every schema format and its gzip copy; returns the written paths.
+    """
+    directory = Path(directory or settings.SCHEMA_ARTIFACT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for schema_format, content in generate_schema().items():
+        path = directory / FORMATS[schema_format][0]
+        path.write_bytes(content)
+        gzip_path = path.with_name(f"{path.name}.gz")
+        gzip_path.write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+        paths += [path, gzip_path]
+    return paths
+
+
+class SchemaArtifact:
+    def __init__(self, path, content_type):
+        self.content = path.read_bytes()
+        self.gzip_content = path.with_name(f"{path.name}.gz").read_bytes()
+        self.content_type = content_type
+        digest = hashlib.sha256(self.content).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+
+@cache
+def load_artifact(schema_format, directory):
+    """
+    The artifact of ``schema_format``, read once per process, or ``None``
+    when ``build_schema`` has not been run.
+    """
+    filename, content_type = FORMATS[schema_format]
+    try:
+        return SchemaArtifact(Path(directory) / filename, content_type)
+    except FileNotFoundError:
+        return None
+
+
+@cache
+def spectacular_view(name, **initkwargs):
+    """
+    A drf-spectacular view, imported on first use: the schema generator
+    is only needed by the documentation URLs, not by the API.
+    """
+    from drf_spectacular import views
+
+    register_extensions()
+    return getattr(views, name).as_view(**initkwargs)
+
+
+def swagger_view(request):
+    return spectacular_view("SpectacularSwaggerView", url_name="schema")(request)
+
+
+def redoc_view(request):
+    return spectacular_view("SpectacularRedocView", url_name="schema")(request)
+
+
+def requested_format(request):
+    if request.GET.get("format") == "json":
+        return "json"
+    if "json" in request.headers.get("Accept", ""):
+        return "json"
+    return "yaml"
+
+
+def schema_view(request):
+    if settings.DEBUG:
+        return spectacular_view("SpectacularAPIView")(request)
+
+    artifact = load_artifact(
+        requested_format(request), str(settings.SCHEMA_ARTIFACT_DIR)
+    )
+    if artifact is None:
+        logger.error("Schema artifacts are missing, run manage.py build_schema")
+        return HttpResponse("The API schema has not been generated.", status=503)
+
+    use_gzip = "gzip" in request.headers.get("Accept-Encoding", "")
+    etag = artifact.gzip_etag if use_gzip else artifact.etag
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(
+            artifact.gzip_content if use_gzip else artifact.content,
+            content_type=artifact.content_type,
+        )
+        if use_gzip:
+            response["Content-Encoding"] = "gzip"
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+    return response
@@ -55,6 +55,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.RequestStatsMiddleware",
+    "core.profiling.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -100,6 +102,15 @@ if os.environ.get("DOCKER_RUN", False):
             "PORT": os.environ.get("POSTGRES_PORT"),
         }
     }
+    if os.environ.get("POSTGRES_REPLICA_HOST"):
+        DATABASES["replica"] = {
+            **DATABASES["default"],
+            "HOST": os.environ["POSTGRES_REPLICA_HOST"],
+            "PORT": os.environ.get(
+                "POSTGRES_REPLICA_PORT", os.environ.get("POSTGRES_PORT")
+            ),
+            "TEST": {"MIRROR": "default"},
+        }
 else:
     DATABASES = {
         "default": {
@@ -107,6 +118,61 @@ else:
             "NAME": BASE_DIR / "db.sqlite3",
         }
     }
+    if os.environ.get("SQLITE_REPLICA_NAME"):
+        DATABASES["replica"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / os.environ["SQLITE_REPLICA_NAME"],
+            "TEST": {"MIRROR": "default"},
+        }
+
+# "shared" is seen by every worker: Redis at CACHE_REDIS_URL, else a
+# database table (python manage.py createcachetable).
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["CACHE_REDIS_URL"],
+        }
+        if os.environ.get("CACHE_REDIS_URL")
+        else {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "shared_cache",
+        }
+    ),
+}
+
+# Safe requests to train_station viewsets read from a replica whose lag
+# is within REPLICA_MAX_LAG seconds; users who wrote stay on the primary
+# for that long, pinned in the shared cache so every worker sees it.
+DATABASE_ROUTERS = ["core.db_routers.PrimaryReplicaRouter"]
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != "default"]
+REPLICA_MAX_LAG = float(os.environ.get("REPLICA_MAX_LAG", 5))
+REPLICA_LAG_CHECK_INTERVAL = 5
+REPLICA_PIN_CACHE = "shared"
+TEST_RUNNER = "core.test_runner.PrimaryDatabaseTestRunner"
+
+# One JSON line per request with its query count and timings
+# (see core.middleware.RequestStatsMiddleware) and one per slow query.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "core.middleware": {
+            "handlers": ["console"],
+            "level": os.environ.get("REQUEST_STATS_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+        "core.slow_queries": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -152,16 +218,80 @@ AUTH_USER_MODEL = "user.User"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "train_station.throttling.AnonBucketThrottle",
+        "train_station.throttling.UserBucketThrottle",
+        "train_station.throttling.ScopedBucketThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "10000/day", "user": "10000/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": "10000/day",
+        "user": "10000/day",
+        "orders": "30/min",
+        "trips": "600/min",
+    },
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
 }
 
+# Throttle buckets are kept in the database unless Redis is configured.
+THROTTLE_REDIS_URL = os.environ.get("THROTTLE_REDIS_URL")
+
+# Bearer token required by /metrics, open when unset unless
+# METRICS_REQUIRE_TOKEN (then /metrics is not served outside DEBUG).
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+METRICS_REQUIRE_TOKEN = False
+
+# Request profiles of staff users (?profile=1), see core.profiling.
+PROFILE_DIR = os.environ.get("PROFILE_DIR", BASE_DIR / "profiles")
+
+# Queries slower than THRESHOLD_MS during a request are logged, grouped
+# by fingerprint with their plan and listed at /slow-queries/.
+SLOW_QUERY_LOG = {
+    "THRESHOLD_MS": float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 200)),
+    "EXPLAIN_ANALYZE": os.environ.get("SLOW_QUERY_EXPLAIN_ANALYZE", "False")
+    == "True",
+}
+
+# OpenAPI schema written by "manage.py build_schema" and served at
+# /api/doc/ unless DEBUG, which generates it on every request.
+SCHEMA_ARTIFACT_DIR = os.environ.get("SCHEMA_ARTIFACT_DIR", BASE_DIR / "schema")
+
+# Ticket fares are served from a per-process table rebuilt every TIMEOUT
+# seconds (see train_station.fares).
+FARE_TABLE = {"TIMEOUT": 300}
+
+# Seat availability streams (see train_station.availability): seconds
+# between checks for sales in other workers and between keepalives, and
+# events buffered per client before it is sent a fresh snapshot.
+AVAILABILITY_STREAM = {"POLL_INTERVAL": 1, "KEEPALIVE": 15, "QUEUE_SIZE": 100}
+
+# Batch requests (see train_station.batch): operations per batch and
+# threads running their reads concurrently.
+BATCH = {"MAX_OPERATIONS": 20, "MAX_WORKERS": 4}
+
+# Trip searches are cached per process for TIMEOUT seconds, with the
+# tickets taken per trip reloaded every OVERLAY_TIMEOUT seconds (see
+# train_station.trip_search). At most MAX_SIZE searches and the counts
+# of MAX_TRIPS trips are kept, least recently used first out. A
+# generation counter in the SHARED_CACHE cache drops every worker's
+# searches after a change.
+TRIP_SEARCH_CACHE = {
+    "SHARED_CACHE": "shared",
+    "TIMEOUT": 30,
+    "OVERLAY_TIMEOUT": 5,
+    "MAX_SIZE": 1000,
+    "MAX_TRIPS": 10000,
+}
+
+# Authenticated users are cached per process for TIMEOUT seconds.
+# STATELESS trusts the signed token claims and skips the user lookup.
+AUTH_USER_CACHE = {
+    "TIMEOUT": 30,
+    "MAX_SIZE": 10000,
+    "STATELESS": os.environ.get("JWT_STATELESS_AUTH", "False") == "True",
+}
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Train Station Service API",
     "DESCRIPTION": "Order train trip tickets",
@@ -179,4 +309,7 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": (
+        "user.serializers.TokenObtainPairWithClaimsSerializer"
+    ),
 }
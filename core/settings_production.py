@@ -0,0 +1,26 @@
+"""
+Production settings, selected with
+``DJANGO_SETTINGS_MODULE=core.settings_production`` (the default under
+gunicorn, see gunicorn.conf.py).
+
+The development settings without the development tools: the debug
+toolbar app, its middleware and its ``__debug__/`` URLs are left out, so
+workers neither import them nor run them on every request. The metrics
+endpoint requires ``METRICS_TOKEN``.
+"""
+
+from core.settings import *  # noqa: F401, F403
+from core.settings import INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = False
+
+# /metrics is only served with METRICS_TOKEN set.
+METRICS_REQUIRE_TOKEN = True
+
+DEV_APPS = ("debug_toolbar",)
+DEV_MIDDLEWARE = ("debug_toolbar.middleware.DebugToolbarMiddleware",)
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DEV_APPS]
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE if middleware not in DEV_MIDDLEWARE
+]
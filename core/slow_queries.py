@@ -0,0 +1,115 @@
+import hashlib
+import json
+import logging
+import re
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from train_station.models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+NORMALIZE_PATTERNS = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+def normalize_sql(sql):
+    """
+    SQL with literals, placeholders and IN lists replaced, so that the
+    same statement with other values has the same fingerprint.
+    """
+    for pattern, replacement in NORMALIZE_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()
+
+
+def explain(connection, sql, params):
+    """
+    Query plan of a SELECT, with ANALYZE when enabled and supported.
+    Other statements are not explained: ANALYZE would run them again.
+    """
+    if not sql.lstrip().upper().startswith("SELECT"):
+        return ""
+
+    try:
+        prefix = connection.ops.explain_query_prefix(
+            analyze=settings.SLOW_QUERY_LOG["EXPLAIN_ANALYZE"]
+        )
+    except ValueError:
+        # The backend has no ANALYZE option.
+        prefix = connection.ops.explain_query_prefix()
+    try:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {sql}", params)
+            return "\n".join(
+                " ".join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
+    except DatabaseError as e:
+        return f"EXPLAIN failed: {e}"
+
+
+def add_occurrence(slow_queries, duration_ms):
+    return slow_queries.update(
+        count=F("count") + 1,
+        total_ms=F("total_ms") + duration_ms,
+        max_ms=Greatest("max_ms", Value(duration_ms)),
+        last_seen=timezone.now(),
+    )
+
+
+def record_slow_query(connection, sql, params, duration, endpoint):
+    """
+    Log a slow query and add it to the ``SlowQuery`` of its fingerprint,
+    explaining it the first time the fingerprint is seen.
+    """
+    normalized = normalize_sql(sql)
+    key = fingerprint(normalized)
+    duration_ms = duration * 1000
+    logger.warning(
+        json.dumps(
+            {
+                "endpoint": endpoint,
+                "database": connection.alias,
+                "duration_ms": round(duration_ms, 2),
+                "fingerprint": key,
+                "sql": sql,
+                "params": repr(params),
+            }
+        )
+    )
+
+    existing = SlowQuery.objects.filter(fingerprint=key)
+    if add_occurrence(existing, duration_ms):
+        return
+
+    plan = explain(connection, sql, params)
+    try:
+        with transaction.atomic():
+            SlowQuery.objects.create(
+                fingerprint=key,
+                normalized_sql=normalized,
+                sql=sql,
+                params=repr(params),
+                endpoint=endpoint,
+                database=connection.alias,
+                plan=plan,
+                total_ms=duration_ms,
+                max_ms=duration_ms,
+            )
+    except IntegrityError:
+        # Another request recorded the fingerprint first.
+        add_occurrence(existing, duration_ms)
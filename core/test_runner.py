@@ -0,0 +1,21 @@
+import logging
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class PrimaryDatabaseTestRunner(DiscoverRunner):
+    """
+    Run the suite with replica routing switched off.
+
+    Test mirrors are separate connections that cannot see rows created
+    inside ``TestCase`` transactions; routing itself is covered by
+    ``train_station.tests.test_db_routers``. Per-request stats and slow
+    query lines are silenced so they don't drown the test output.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.REPLICA_DATABASES = []
+        logging.getLogger("core.middleware").setLevel(logging.WARNING)
+        logging.getLogger("core.slow_queries").setLevel(logging.ERROR)
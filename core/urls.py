@@ -15,27 +15,31 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularRedocView,
-    SpectacularSwaggerView,
-)
+
+from core.schema import redoc_view, schema_view, swagger_view
+from core.views import ProfileReportView, SlowQueryReportView, metrics
 
 
 urlpatterns = [
-    path("api/doc/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/doc/", schema_view, name="schema"),
+    path("api/doc/swagger/", swagger_view, name="swagger-ui"),
+    path("api/doc/redoc/", redoc_view, name="redoc"),
+    path("train-station/", include("train_station.urls")),
+    path("user/", include("user.urls")),
+    path("admin/", admin.site.urls),
+    path("metrics", metrics, name="metrics"),
     path(
-        "api/doc/swagger/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
-        name="swagger-ui",
+        "profiles/<uuid:report_id>/",
+        ProfileReportView.as_view(),
+        name="profile-report",
     ),
     path(
-        "api/doc/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"
+        "slow-queries/", SlowQueryReportView.as_view(), name="slow-queries"
     ),
-    path("train-station/", include("train_station.urls")),
-    path("user/", include("user.urls")),
-    path("admin/", admin.site.urls),
-    path("__debug__/", include("debug_toolbar.urls")),
 ]
+
+if "debug_toolbar" in settings.INSTALLED_APPS:
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
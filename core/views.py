@@ -0,0 +1,94 @@
+import json
+
+from django.conf import settings
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseForbidden,
+)
+from django.utils.crypto import constant_time_compare
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.metrics import render_metrics
+from core.profiling import report_path
+from train_station.models import SlowQuery
+from train_station.serializers import SlowQueryReportParamsSerializer
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint. When ``METRICS_TOKEN`` is set the scraper
+    must send it as a bearer token; without it the endpoint does not
+    exist when ``METRICS_REQUIRE_TOKEN`` is set, unless in DEBUG.
+    """
+    if not settings.METRICS_TOKEN:
+        if settings.METRICS_REQUIRE_TOKEN and not settings.DEBUG:
+            raise Http404
+    elif not constant_time_compare(
+        request.headers.get("Authorization", ""),
+        f"Bearer {settings.METRICS_TOKEN}",
+    ):
+        return HttpResponseForbidden()
+
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
+
+class ProfileReportView(APIView):
+    """
+    A request profile stored by ``core.profiling.ProfilingMiddleware``;
+    ``?download=prof`` returns the raw cProfile data.
+    """
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, report_id):
+        suffix = "prof" if request.query_params.get("download") == "prof" else "json"
+        path = report_path(report_id, suffix)
+        if not path.exists():
+            raise NotFound("No such profile report.")
+
+        if suffix == "prof":
+            return FileResponse(
+                path.open("rb"), as_attachment=True, filename=path.name
+            )
+        return Response(json.loads(path.read_text()))
+
+
+class SlowQueryReportView(APIView):
+    """
+    Top slow queries by total time, or by ``?order=max`` / ``?order=count``.
+    """
+
+    permission_classes = (IsAdminUser,)
+    orderings = {"total": "-total_ms", "max": "-max_ms", "count": "-count"}
+
+    def get(self, request):
+        params = SlowQueryReportParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        ordering = self.orderings[params.validated_data["order"]]
+
+        slow_queries = SlowQuery.objects.order_by(ordering).values(
+            "fingerprint",
+            "endpoint",
+            "database",
+            "count",
+            "total_ms",
+            "max_ms",
+            "normalized_sql",
+            "sql",
+            "params",
+            "plan",
+            "first_seen",
+            "last_seen",
+        )[: params.validated_data["limit"]]
+        return Response(
+            [
+                {**slow_query, "avg_ms": slow_query["total_ms"] / slow_query["count"]}
+                for slow_query in slow_queries
+            ]
+        )
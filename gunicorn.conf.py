@@ -0,0 +1,10 @@
+import os
+
+from prometheus_client import multiprocess
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings_production")
+
+
+def child_exit(server, worker):
+    # Drop the live gauges of a dead worker from the shared metric files.
+    multiprocess.mark_process_dead(worker.pid)
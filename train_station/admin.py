@@ -5,17 +5,23 @@ from train_station.models import (
     Station,
     TrainType,
     Train,
+    FareRule,
     Route,
     Trip,
     Order,
-    Ticket
+    Ticket,
+    ArchivedTrip,
+    ArchivedTicket,
 )
 
 admin.site.register(Crew)
 admin.site.register(Station)
 admin.site.register(TrainType)
 admin.site.register(Train)
+admin.site.register(FareRule)
 admin.site.register(Route)
 admin.site.register(Trip)
 admin.site.register(Order)
 admin.site.register(Ticket)
+admin.site.register(ArchivedTrip)
+admin.site.register(ArchivedTicket)
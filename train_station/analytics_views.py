@@ -0,0 +1,86 @@
+from django.utils import timezone
+from rest_framework.generics import ListAPIView
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from train_station.mixins import ReplicaReadMixin
+from train_station.models import (
+    OccupancySummary,
+    Route,
+    TrainType,
+    TripForecast,
+)
+from train_station.occupancy import occupancy_report
+from train_station.serializers import (
+    DateRangeSerializer,
+    TripForecastSerializer,
+)
+from train_station.views import TripOrderViewPagination
+
+
+def route_labels(keys):
+    routes = Route.objects.filter(id__in=keys).values_list(
+        "id", "source__name", "destination__name"
+    )
+    return {id: f"{source} - {destination}" for id, source, destination in routes}
+
+
+def train_type_labels(keys):
+    return dict(TrainType.objects.filter(id__in=keys).values_list("id", "name"))
+
+
+def hour_labels(keys):
+    return {key: f"{key:02d}:00" for key in keys}
+
+
+class OccupancyReportView(ReplicaReadMixin, APIView):
+    """
+    Load factor by route, train type or departure hour over
+    ``?start=&end=`` (the last 30 days by default), read from the
+    occupancy summary rather than the ticket tables.
+    """
+
+    permission_classes = (IsAdminUser,)
+    dimension = None
+    labels = {
+        OccupancySummary.ROUTE: route_labels,
+        OccupancySummary.TRAIN_TYPE: train_type_labels,
+        OccupancySummary.HOUR: hour_labels,
+    }
+
+    def get(self, request):
+        dates = DateRangeSerializer(data=request.query_params)
+        dates.is_valid(raise_exception=True)
+        start, end = dates.validated_data["start"], dates.validated_data["end"]
+
+        report = occupancy_report(self.dimension, start, end)
+        labels = self.labels[self.dimension]([row["key"] for row in report])
+        return Response(
+            {
+                "dimension": self.dimension,
+                "start": start,
+                "end": end,
+                "results": [{**row, "label": labels.get(row["key"])} for row in report],
+            }
+        )
+
+
+class TripForecastListView(ReplicaReadMixin, ListAPIView):
+    """
+    Upcoming trips by expected final load factor, as forecast by the
+    nightly ``forecast_demand`` run. ``?sells_out=true`` lists only the
+    trips expected to sell out, the candidates for a bigger train.
+    """
+
+    permission_classes = (IsAdminUser,)
+    serializer_class = TripForecastSerializer
+    pagination_class = TripOrderViewPagination
+
+    def get_queryset(self):
+        queryset = TripForecast.objects.select_related(
+            "trip__route__source", "trip__route__destination", "trip__train"
+        ).filter(trip__departure_time__gt=timezone.now())
+        if self.request.query_params.get("sells_out") == "true":
+            queryset = queryset.filter(sells_out=True)
+        return queryset.order_by("-expected_load_factor", "trip__departure_time")
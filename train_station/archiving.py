@@ -0,0 +1,86 @@
+from django.db import transaction
+
+from train_station.change_feed import log_changes
+from train_station.models import (
+    ArchivedTicket,
+    ArchivedTrip,
+    ChangeLogEntry,
+    Ticket,
+    Trip,
+    TripForecast,
+)
+from train_station.trip_search import trip_search_cache
+
+
+class ArchiveResult:
+    def __init__(self):
+        self.trips = 0
+        self.tickets = 0
+        self.chunks = 0
+
+
+def archive_chunk(trip_ids, using="default"):
+    """
+    Copy trips, their crew links and tickets into the archive tables and
+    delete the live rows, and the trips' forecasts, with plain DELETEs,
+    bypassing the cascade collector. The trips leave the timetable's change feed as deletes
+    and the cached trip searches are dropped.
+    Returns the number of tickets moved.
+    """
+    trips = Trip.objects.using(using).filter(id__in=trip_ids)
+    ArchivedTrip.objects.using(using).bulk_create(
+        ArchivedTrip(**values)
+        for values in trips.values(
+            "id", "route_id", "train_id", "departure_time", "arrival_time"
+        )
+    )
+
+    trip_crew = Trip.crew.through.objects.using(using).filter(
+        trip_id__in=trip_ids
+    )
+    ArchivedTrip.crew.through.objects.using(using).bulk_create(
+        ArchivedTrip.crew.through(archivedtrip_id=trip_id, crew_id=crew_id)
+        for trip_id, crew_id in trip_crew.values_list("trip_id", "crew_id")
+    )
+
+    tickets = Ticket.objects.using(using).filter(trip_id__in=trip_ids)
+    archived_tickets = ArchivedTicket.objects.using(using).bulk_create(
+        ArchivedTicket(**values)
+        for values in tickets.values(
+            "id", "cargo", "seat", "price", "trip_id", "order_id"
+        )
+    )
+
+    tickets._raw_delete(using)
+    trip_crew._raw_delete(using)
+    TripForecast.objects.using(using).filter(trip_id__in=trip_ids)._raw_delete(
+        using
+    )
+    trips._raw_delete(using)
+    log_changes(Trip, trip_ids, ChangeLogEntry.DELETE, using)
+    transaction.on_commit(trip_search_cache.clear, using)
+    return len(archived_tickets)
+
+
+def archive_trips(before, chunk_size=500, using="default"):
+    """
+    Move trips departed before ``before`` and their tickets into the
+    archive tables, one transaction per chunk of trips.
+    """
+    result = ArchiveResult()
+    while True:
+        with transaction.atomic(using=using):
+            # Locking the trips makes concurrent ticket inserts for them
+            # wait for the chunk and then fail instead of being lost.
+            trip_ids = list(
+                Trip.objects.using(using)
+                .select_for_update()
+                .filter(departure_time__lt=before)
+                .order_by("id")
+                .values_list("id", flat=True)[:chunk_size]
+            )
+            if not trip_ids:
+                return result
+            result.tickets += archive_chunk(trip_ids, using)
+        result.trips += len(trip_ids)
+        result.chunks += 1
@@ -0,0 +1,217 @@
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.db_routers import set_read_database
+from train_station.availability import AvailabilityStream, availability_hub
+from train_station.fares import fare_table
+from train_station.filters import StationFilter, TripFilter
+from train_station.mixins import ReplicaReadMixin
+from train_station.models import Station, Order, Trip
+from train_station.permissions import IsAdminOrIfAuthenticatedReadOnly
+from train_station.query_plans import ORDER_LIST, TRIP_LIST, TRIP_RETRIEVE
+from train_station.serializers import (
+    StationSerializer,
+    OrderListSerializer,
+    TripListSerializer,
+    TripRetrieveSerializer,
+)
+from train_station.views import TripOrderViewPagination
+
+
+class AsyncTripOrderViewPagination(TripOrderViewPagination):
+    """
+    Page number pagination that counts and slices with the async ORM.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        paginator = Paginator(queryset, page_size)
+        paginator.count = await queryset.acount()
+
+        page_number = request.query_params.get(self.page_query_param) or 1
+        if page_number in self.last_page_strings:
+            page_number = paginator.num_pages
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=page_number, message=str(exc)
+                )
+            )
+
+        offset = (number - 1) * page_size
+        objects = [
+            obj async for obj in queryset[offset:offset + page_size]
+        ]
+        self.page = Page(objects, number, paginator)
+        return objects
+
+
+class AsyncReadAPIView(ReplicaReadMixin, APIView):
+    """
+    Read-only API view served from the event loop under ASGI.
+
+    Authentication, permissions and throttling are the regular DRF ones
+    and run in a worker thread; the handler itself fetches rows with the
+    async ORM, so slow or idle clients do not hold a thread.
+    Subclasses set ``queryset``, refined per request in ``get_queryset``.
+    Querysets must load every relation the serializer reads: lazy
+    queries raise ``SynchronousOnlyOperation`` in async context.
+    """
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    queryset = None
+    filterset_class = None
+    pagination_class = None
+    serializer_class = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        if cls.queryset is None:
+            raise ImproperlyConfigured(
+                f"{cls.__name__} should include a `queryset` attribute."
+            )
+        return super().as_view(**initkwargs)
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(
+                self, request.method.lower(), self.http_method_not_allowed
+            )
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        finally:
+            set_read_database(None)
+
+        self.response = self.finalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def filter_queryset(self, queryset):
+        if self.filterset_class is None:
+            return queryset
+        filterset = self.filterset_class(
+            self.request.query_params, queryset=queryset, request=self.request
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        return filterset.qs
+
+
+class AsyncListAPIView(AsyncReadAPIView):
+    async def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.pagination_class is None:
+            objects = [obj async for obj in queryset]
+            return Response(self.serializer_class(objects, many=True).data)
+
+        paginator = self.pagination_class()
+        objects = await paginator.apaginate_queryset(queryset, request, self)
+        serializer = self.serializer_class(objects, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class AsyncRetrieveAPIView(AsyncReadAPIView):
+    async def get(self, request, pk, *args, **kwargs):
+        queryset = self.get_queryset()
+        try:
+            obj = await queryset.aget(pk=pk)
+        except queryset.model.DoesNotExist:
+            raise NotFound()
+        await sync_to_async(self.check_object_permissions)(request, obj)
+        return Response(self.serializer_class(obj).data)
+
+
+class FaresLoadedMixin:
+    """
+    Load the fare table before serializing trips in the event loop,
+    where it cannot be rebuilt, valid for long enough to serialize.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        await sync_to_async(fare_table.load_if_stale)(valid_for=10)
+        return await super().get(request, *args, **kwargs)
+
+
+class AsyncTripListView(FaresLoadedMixin, AsyncListAPIView):
+    filterset_class = TripFilter
+    pagination_class = AsyncTripOrderViewPagination
+    serializer_class = TripListSerializer
+    queryset = Trip.objects.all()
+    throttle_scope = "trips"
+
+    def get_queryset(self):
+        return TRIP_LIST.apply(super().get_queryset())
+
+
+class AsyncTripDetailView(FaresLoadedMixin, AsyncRetrieveAPIView):
+    queryset = Trip.objects.all()
+    serializer_class = TripRetrieveSerializer
+    throttle_scope = "trips"
+
+    def get_queryset(self):
+        return TRIP_RETRIEVE.apply(super().get_queryset())
+
+
+class AsyncTripAvailabilityStreamView(AsyncReadAPIView):
+    """
+    Server-sent events with the seat map of a trip: a ``snapshot`` of the
+    taken seats, then a ``delta`` of seats sold and released with the new
+    ``tickets_available`` on every change. Served by the worker's
+    availability hub, so clients do not query the database; needs ASGI.
+    """
+    queryset = Trip.objects.all()
+
+    async def get(self, request, pk, *args, **kwargs):
+        queue = await availability_hub.subscribe(int(pk))
+        if queue is None:
+            raise NotFound()
+        response = StreamingHttpResponse(
+            AvailabilityStream(int(pk), queue),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class AsyncStationListView(AsyncListAPIView):
+    queryset = Station.objects.all()
+    filterset_class = StationFilter
+    serializer_class = StationSerializer
+
+
+class AsyncOrderListView(AsyncListAPIView):
+    queryset = Order.objects.all()
+    pagination_class = AsyncTripOrderViewPagination
+    permission_classes = (IsAuthenticated,)
+    serializer_class = OrderListSerializer
+
+    def get_queryset(self):
+        queryset = ORDER_LIST.apply(super().get_queryset())
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(user=self.request.user)
@@ -0,0 +1,240 @@
+"""
+Live seat availability pushed to server-sent event streams.
+
+Each worker has one ``availability_hub``. The first client watching a
+trip loads its taken seats; later clients get their snapshot from the
+hub. Tickets saved or deleted in this worker are applied when their
+transaction commits (see ``train_station.signals``). Sales and
+cancellations in other workers are found by one poller per worker that
+compares a (count, last id) signature of every watched trip and re-reads
+the seats only of trips whose signature changed. Every change is sent
+to the trip's subscribers as a delta.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+
+from train_station.models import Ticket, Trip
+
+logger = logging.getLogger(__name__)
+
+
+def load_trip(trip_id):
+    """
+    ``(capacity, taken seats, signature)`` of a trip, or ``None``.
+    """
+    train = (
+        Trip.objects.filter(id=trip_id)
+        .values_list("train__cargo_num", "train__places_in_cargo")
+        .first()
+    )
+    if train is None:
+        return None
+    signature = ticket_signatures([trip_id]).get(trip_id)
+    return train[0] * train[1], taken_seats(trip_id), signature
+
+
+def taken_seats(trip_id):
+    return set(
+        Ticket.objects.filter(trip_id=trip_id).values_list("cargo", "seat")
+    )
+
+
+def ticket_signatures(trip_ids):
+    """
+    ``{trip id: (tickets, last ticket id)}``, which changes with every
+    sale and cancellation; trips without tickets are left out.
+    """
+    return {
+        trip_id: (tickets, last_id)
+        for trip_id, tickets, last_id in Ticket.objects.filter(
+            trip_id__in=trip_ids
+        )
+        .order_by()
+        .values("trip_id")
+        .annotate(tickets=Count("id"), last_id=Max("id"))
+        .values_list("trip_id", "tickets", "last_id")
+    }
+
+
+def format_event(event, data, event_id=None):
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class TripState:
+    def __init__(self, capacity, taken, signature):
+        self.capacity = capacity
+        self.taken = taken
+        self.signature = signature
+        self.sequence = 0
+        self.subscribers = set()
+
+    @property
+    def tickets_available(self):
+        return self.capacity - len(self.taken)
+
+    def snapshot(self):
+        return format_event(
+            "snapshot",
+            {
+                "tickets_available": self.tickets_available,
+                "taken": sorted(self.taken),
+            },
+            self.sequence,
+        )
+
+
+class AvailabilityHub:
+    def __init__(self):
+        self._trips = {}
+        self._loop = None
+        self._poller = None
+
+    async def subscribe(self, trip_id):
+        """
+        A queue of events for ``trip_id`` starting with a snapshot, or
+        ``None`` when the trip does not exist.
+        """
+        self._loop = asyncio.get_running_loop()
+        state = self._trips.get(trip_id)
+        if state is None:
+            loaded = await sync_to_async(load_trip)(trip_id)
+            if loaded is None:
+                return None
+            # Another client may have loaded the trip meanwhile.
+            state = self._trips.setdefault(trip_id, TripState(*loaded))
+
+        queue = asyncio.Queue(settings.AVAILABILITY_STREAM["QUEUE_SIZE"])
+        queue.put_nowait(state.snapshot())
+        state.subscribers.add(queue)
+        if (
+            self._poller is None
+            or self._poller.done()
+            or self._poller.get_loop() is not self._loop
+        ):
+            # The poller outlives the request that starts it: it must not
+            # inherit the request's context, whose thread is gone by then.
+            self._poller = asyncio.create_task(
+                self._poll(), context=contextvars.Context()
+            )
+        return queue
+
+    def unsubscribe(self, trip_id, queue):
+        state = self._trips.get(trip_id)
+        if state is None:
+            return
+        state.subscribers.discard(queue)
+        if not state.subscribers:
+            del self._trips[trip_id]
+
+    def watched(self):
+        return list(self._trips)
+
+    def publish(self, trip_id, sold=(), released=()):
+        """
+        Apply seats sold or released in this worker. Safe to call from
+        any thread; does nothing while no stream is open.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        if trip_id in self._trips:
+            loop.call_soon_threadsafe(self.apply, trip_id, set(sold), set(released))
+
+    def apply(self, trip_id, sold, released):
+        state = self._trips.get(trip_id)
+        if state is None:
+            return
+        sold -= state.taken
+        released &= state.taken
+        if not sold and not released:
+            return
+        state.taken = (state.taken | sold) - released
+        state.sequence += 1
+        event = format_event(
+            "delta",
+            {
+                "tickets_available": state.tickets_available,
+                "sold": sorted(sold),
+                "released": sorted(released),
+            },
+            state.sequence,
+        )
+        for queue in state.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A client too slow for the deltas starts over.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(state.snapshot())
+
+    async def poll_once(self):
+        """
+        Pick up sales and cancellations made by other workers.
+        """
+        trip_ids = self.watched()
+        if not trip_ids:
+            return
+        signatures = await sync_to_async(ticket_signatures)(trip_ids)
+        for trip_id in trip_ids:
+            state = self._trips.get(trip_id)
+            signature = signatures.get(trip_id)
+            if state is None or state.signature == signature:
+                continue
+            taken = await sync_to_async(taken_seats)(trip_id)
+            state.signature = signature
+            self.apply(trip_id, taken - state.taken, state.taken - taken)
+
+    async def _poll(self):
+        while self._trips:
+            await asyncio.sleep(settings.AVAILABILITY_STREAM["POLL_INTERVAL"])
+            try:
+                await self.poll_once()
+            except Exception:
+                logger.exception("Polling seat availability failed")
+
+
+availability_hub = AvailabilityHub()
+
+
+class AvailabilityStream:
+    """
+    Server-sent events of one client, with a comment line as keepalive
+    when the trip is quiet. Django closes it with the response when the
+    client disconnects, which unsubscribes it from the hub.
+    """
+
+    def __init__(self, trip_id, queue, hub=availability_hub):
+        self.trip_id = trip_id
+        self.queue = queue
+        self.hub = hub
+        self.loop = asyncio.get_running_loop()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await asyncio.wait_for(
+                self.queue.get(), settings.AVAILABILITY_STREAM["KEEPALIVE"]
+            )
+        except asyncio.TimeoutError:
+            return ": keepalive\n\n"
+
+    def close(self):
+        # Called from a worker thread; the hub is only changed on its loop.
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(
+                self.hub.unsubscribe, self.trip_id, self.queue
+            )
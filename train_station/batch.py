@@ -0,0 +1,171 @@
+"""
+Several API calls in one request.
+
+``POST /train-station/batch/`` takes a list of operations (method, path
+and JSON body) and runs each one through the URL resolver in this
+process, as the user the batch was authenticated as: the token is
+decoded and the user and anon throttle buckets charged once for the
+whole batch (see ``TokenBucketThrottle.get_cost``). Consecutive reads
+run concurrently in ``BATCH["MAX_WORKERS"]`` threads, writes one at a
+time in order, so a read listed after a write sees it. With ``atomic``
+every operation runs in one transaction that is rolled back when one of
+them fails.
+"""
+
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.handlers.exception import response_for_exception
+from django.db import close_old_connections, connection, transaction
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, get_resolver
+from rest_framework.permissions import SAFE_METHODS
+
+FAILED_DEPENDENCY = 424
+
+
+class BatchResult:
+    def __init__(self, status, body=None):
+        self.status = status
+        self.body = body
+
+    @property
+    def failed(self):
+        return self.status >= 400
+
+    def as_dict(self):
+        return {"status": self.status, "body": self.body}
+
+
+def build_request(parent, method, path, body):
+    """
+    A request for ``path`` carrying the user, headers and cookies of
+    ``parent`` (the batch request).
+    """
+    url = urlsplit(path)
+    content = b"" if body is None else json.dumps(body).encode()
+    request = HttpRequest()
+    request.method = method
+    request.path = request.path_info = url.path
+    request.META = {
+        **{
+            key: value
+            for key, value in parent.META.items()
+            if key not in ("CONTENT_LENGTH", "CONTENT_TYPE", "QUERY_STRING")
+        },
+        "REQUEST_METHOD": method,
+        "PATH_INFO": url.path,
+        "QUERY_STRING": url.query,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(content)),
+    }
+    request.GET = QueryDict(url.query)
+    request.COOKIES = parent.COOKIES
+    request._stream = io.BytesIO(content)
+    request._read_started = False
+    # Authenticated once for the whole batch, see rest_framework.request.
+    request._force_auth_user = parent.user
+    request._force_auth_token = parent.auth
+    request.batched = True
+    return request
+
+
+def decode(response):
+    if not response.content:
+        return None
+    if response.get("Content-Type", "").startswith("application/json"):
+        return json.loads(response.content)
+    return response.content.decode(response.charset, errors="replace")
+
+
+def run_operation(parent, operation):
+    request = build_request(
+        parent, operation["method"], operation["path"], operation.get("body")
+    )
+    try:
+        match = get_resolver().resolve(request.path_info)
+    except Resolver404:
+        return BatchResult(404, {"detail": "Not found."})
+    view = match.func
+    if not getattr(getattr(view, "cls", None), "batchable", True):
+        return BatchResult(400, {"detail": "Batches cannot be nested."})
+    if iscoroutinefunction(view):
+        return BatchResult(400, {"detail": "Async endpoints cannot be batched."})
+
+    request.resolver_match = match
+    try:
+        response = view(request, *match.args, **match.kwargs)
+        if hasattr(response, "render"):
+            response = response.render()
+    except Exception as exc:
+        response = response_for_exception(request, exc)
+    if response.streaming:
+        return BatchResult(
+            400, {"detail": "Streaming endpoints cannot be batched."}
+        )
+    return BatchResult(response.status_code, decode(response))
+
+
+def run_read(parent, operation):
+    # Pool threads keep their own connections between batches, closed
+    # like a worker's after CONN_MAX_AGE.
+    close_old_connections()
+    try:
+        return run_operation(parent, operation)
+    finally:
+        close_old_connections()
+
+
+@cache
+def get_pool():
+    return ThreadPoolExecutor(
+        settings.BATCH["MAX_WORKERS"], thread_name_prefix="batch"
+    )
+
+
+def run_reads(parent, operations):
+    if len(operations) == 1 or connection.in_atomic_block:
+        # Other connections cannot see this transaction's writes.
+        return [run_operation(parent, operation) for operation in operations]
+    return list(
+        get_pool().map(lambda operation: run_read(parent, operation), operations)
+    )
+
+
+def run_batch(parent, operations):
+    """
+    ``BatchResult`` of every operation in order.
+    """
+    results, reads = [], []
+    for operation in operations:
+        if operation["method"] in SAFE_METHODS:
+            reads.append(operation)
+            continue
+        results += run_reads(parent, reads) if reads else []
+        reads = []
+        results.append(run_operation(parent, operation))
+    return results + (run_reads(parent, reads) if reads else [])
+
+
+def run_atomic_batch(parent, operations):
+    """
+    Run ``operations`` one by one in a transaction, rolled back at the
+    first failure; the operations after it are not run (status 424).
+    """
+    results = []
+    with transaction.atomic():
+        for operation in operations:
+            result = run_operation(parent, operation)
+            results.append(result)
+            if result.failed:
+                transaction.set_rollback(True)
+                break
+    skipped = BatchResult(
+        FAILED_DEPENDENCY, {"detail": "Not run, an earlier operation failed."}
+    )
+    return results + [skipped] * (len(operations) - len(results))
@@ -0,0 +1,336 @@
+import csv
+import io
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from train_station.change_feed import log_changes
+from train_station.models import (
+    ChangeLogEntry,
+    Station,
+    Route,
+    TrainType,
+    Train,
+    Trip,
+)
+from train_station.occupancy import mark_changed
+from train_station.search_names import search_name
+from train_station.trip_search import trip_search_cache
+
+
+def read_batches(path, batch_size):
+    """
+    Stream a CSV file as batches of (line number, row) pairs.
+    """
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        rows = enumerate(csv.DictReader(csv_file), start=2)
+        while batch := list(islice(rows, batch_size)):
+            yield batch
+
+
+def clean_field(model, field_name, value):
+    """
+    Convert and validate a raw CSV value with the model field's validators.
+    """
+    field = model._meta.get_field(field_name)
+    try:
+        return field.clean(value, None)
+    except ValidationError as e:
+        raise ValidationError(f"{field_name}: {' '.join(e.messages)}")
+
+
+def clean_datetime(model, field_name, value):
+    value = clean_field(model, field_name, value)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+class NameMap:
+    """
+    In-memory name -> id lookup that remembers ambiguous names.
+    """
+
+    def __init__(self, pairs=()):
+        self.ids = {}
+        self.ambiguous = set()
+        self.update(pairs)
+
+    def update(self, pairs):
+        for key, pk in pairs:
+            if key in self.ids and self.ids[key] != pk:
+                self.ambiguous.add(key)
+            self.ids[key] = pk
+
+    def __contains__(self, key):
+        return key in self.ids
+
+    def resolve(self, key, label):
+        if key in self.ambiguous:
+            raise ValidationError(f"{label} '{key}' is ambiguous.")
+        if key not in self.ids:
+            raise ValidationError(f"{label} '{key}' does not exist.")
+        return self.ids[key]
+
+
+class ImportResult:
+    def __init__(self, name):
+        self.name = name
+        self.created = 0
+        self.skipped = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rows(self):
+        return self.created + self.skipped + len(self.errors)
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+
+class NetworkImporter:
+    """
+    Stream stations, routes, trains and trips from CSV files into the database.
+
+    Rows are validated in batches against the model field validators and
+    foreign keys are resolved through in-memory name -> id maps, so
+    nothing goes through ``Model.save()`` and ``full_clean()``.
+    Valid rows are written with ``COPY`` on PostgreSQL and ``bulk_create``
+    elsewhere; invalid rows are reported and skipped.
+    """
+
+    def __init__(self, batch_size=1000, use_copy=True, using="default"):
+        self.batch_size = batch_size
+        self.using = using
+        self.use_copy = use_copy and connection.vendor == "postgresql"
+        self.stations = NameMap(Station.objects.values_list("name", "id"))
+        self.routes = NameMap(
+            ((source, destination), pk)
+            for pk, source, destination in Route.objects.values_list(
+                "id", "source__name", "destination__name"
+            )
+        )
+        self.train_types = NameMap(TrainType.objects.values_list("name", "id"))
+        self.trains = NameMap(Train.objects.values_list("name", "id"))
+        self.train_keys = set(
+            Train.objects.values_list("name", "train_type__name")
+        )
+
+    def import_stations(self, path):
+        return self._import(path, Station, self._clean_station, self._after_stations)
+
+    def import_routes(self, path):
+        return self._import(path, Route, self._clean_route, self._after_routes)
+
+    def import_trains(self, path):
+        return self._import(path, Train, self._clean_train, self._after_trains)
+
+    def import_trips(self, path):
+        return self._import(path, Trip, self._clean_trip)
+
+    def _import(self, path, model, clean_row, after_write=None):
+        result = ImportResult(model._meta.verbose_name_plural)
+        for batch in read_batches(path, self.batch_size):
+            objects = []
+            seen = set()
+            for line, row in batch:
+                try:
+                    obj, key = clean_row(row)
+                except ValidationError as e:
+                    result.add_error(line, " ".join(e.messages))
+                    continue
+                if obj is None or key in seen:
+                    result.skipped += 1
+                    continue
+                seen.add(key)
+                objects.append(obj)
+
+            if model is Trip:
+                objects = self._drop_taken_trains(objects, result)
+            if not objects:
+                continue
+
+            try:
+                with transaction.atomic(using=self.using):
+                    self._write(model, objects)
+            except DatabaseError as e:
+                first_line = batch[0][0]
+                result.add_error(
+                    first_line,
+                    f"batch of {len(objects)} rows starting here failed: {e}",
+                )
+                continue
+            result.created += len(objects)
+            if after_write:
+                after_write(objects)
+        return result.finish()
+
+    def _write(self, model, objects):
+        queryset = model.objects.using(self.using)
+        if self.use_copy:
+            last_id = queryset.aggregate(last=Max("id"))["last"] or 0
+            self._copy(model, objects)
+            # COPY returns no ids. Rows inserted concurrently are logged
+            # twice at worst, which the change feed tolerates.
+            ids = queryset.filter(id__gt=last_id).values_list("id", flat=True)
+        else:
+            queryset.bulk_create(objects, batch_size=self.batch_size)
+            ids = [obj.pk for obj in objects]
+        log_changes(model, ids, ChangeLogEntry.INSERT, self.using)
+        if model is Trip:
+            mark_changed(model, ids, self.using)
+        transaction.on_commit(trip_search_cache.clear, self.using)
+
+    def _copy(self, model, objects):
+        fields = [
+            field for field in model._meta.concrete_fields
+            if not field.primary_key
+        ]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        db_connection = transaction.get_connection(self.using)
+        for obj in objects:
+            writer.writerow(
+                field.get_db_prep_save(
+                    getattr(obj, field.attname), db_connection
+                )
+                for field in fields
+            )
+        buffer.seek(0)
+        columns = ", ".join(
+            db_connection.ops.quote_name(field.column) for field in fields
+        )
+        table = db_connection.ops.quote_name(model._meta.db_table)
+        with db_connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+
+    def _clean_station(self, row):
+        name = clean_field(Station, "name", row.get("name"))
+        if name in self.stations:
+            return None, name
+        return Station(
+            name=name,
+            search_name=search_name(name),
+            latitude=clean_field(Station, "latitude", row.get("latitude")),
+            longitude=clean_field(Station, "longitude", row.get("longitude")),
+        ), name
+
+    def _after_stations(self, objects):
+        names = [station.name for station in objects]
+        self.stations.update(
+            Station.objects.filter(name__in=names).values_list("name", "id")
+        )
+
+    def _clean_route(self, row):
+        source = row.get("source")
+        destination = row.get("destination")
+        source_id = self.stations.resolve(source, "Station")
+        destination_id = self.stations.resolve(destination, "Station")
+        if source_id == destination_id:
+            raise ValidationError("Source and destination cannot be the same.")
+        key = (source, destination)
+        if key in self.routes:
+            return None, key
+        return Route(
+            source_id=source_id,
+            destination_id=destination_id,
+            distance=clean_field(Route, "distance", row.get("distance")),
+        ), key
+
+    def _after_routes(self, objects):
+        ids = {route.source_id for route in objects}
+        self.routes.update(
+            ((source, destination), pk)
+            for pk, source, destination in Route.objects.filter(
+                source_id__in=ids
+            ).values_list("id", "source__name", "destination__name")
+        )
+
+    def _clean_train(self, row):
+        name = clean_field(Train, "name", row.get("name"))
+        type_name = clean_field(TrainType, "name", row.get("train_type"))
+        key = (name, type_name)
+        if key in self.train_keys:
+            return None, key
+        train = Train(
+            name=name,
+            cargo_num=clean_field(Train, "cargo_num", row.get("cargo_num")),
+            places_in_cargo=clean_field(
+                Train, "places_in_cargo", row.get("places_in_cargo")
+            ),
+        )
+        if type_name not in self.train_types:
+            train_type = TrainType.objects.using(self.using).create(
+                name=type_name
+            )
+            self.train_types.update([(type_name, train_type.id)])
+        train.train_type_id = self.train_types.resolve(type_name, "Train type")
+        return train, key
+
+    def _after_trains(self, objects):
+        names = [train.name for train in objects]
+        self.trains.update(
+            Train.objects.filter(name__in=names).values_list("name", "id")
+        )
+        self.train_keys.update(
+            Train.objects.filter(name__in=names).values_list(
+                "name", "train_type__name"
+            )
+        )
+
+    def _clean_trip(self, row):
+        route_id = self.routes.resolve(
+            (row.get("source"), row.get("destination")), "Route"
+        )
+        train_id = self.trains.resolve(row.get("train"), "Train")
+        departure_time = clean_datetime(
+            Trip, "departure_time", row.get("departure_time")
+        )
+        arrival_time = clean_datetime(
+            Trip, "arrival_time", row.get("arrival_time")
+        )
+        if arrival_time <= departure_time:
+            raise ValidationError("Arrival time must be after departure time.")
+        return Trip(
+            route_id=route_id,
+            train_id=train_id,
+            departure_time=departure_time,
+            arrival_time=arrival_time,
+        ), (train_id, departure_time)
+
+    def _drop_taken_trains(self, trips, result):
+        """
+        Skip trips whose train is already taken at the departure time,
+        checked with one query per batch.
+        """
+        if not trips:
+            return trips
+        taken = set(
+            Trip.objects.filter(
+                train_id__in={trip.train_id for trip in trips},
+                departure_time__in={trip.departure_time for trip in trips},
+            ).values_list("train_id", "departure_time")
+        )
+        free = [
+            trip for trip in trips
+            if (trip.train_id, trip.departure_time) not in taken
+        ]
+        result.skipped += len(trips) - len(free)
+        return free
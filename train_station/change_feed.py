@@ -0,0 +1,107 @@
+"""
+Change feed of the timetable: stations, routes, trains and trips.
+
+Every insert, update and delete of these records adds a
+``ChangeLogEntry`` in the same transaction: ``Model.save()`` and
+``delete()`` through the receivers in ``train_station.signals``, bulk
+writes (network imports, fixtures, archiving) through ``log_changes``.
+Clients keep the last sequence they have seen and fetch what changed
+since with ``changes_since``, instead of downloading every record again.
+
+Sequences are the entry ids, which the database hands out at insert,
+not at commit. So that a client never reads past a change that commits
+later with a lower id, writers of the log take turns: PostgreSQL
+writers hold an advisory lock from their first entry until commit,
+SQLite already allows one writing transaction at a time.
+"""
+
+from django.db import connections, transaction
+
+from train_station.models import ChangeLogEntry, Route, Station, Train, Trip
+from train_station.serializers import (
+    RouteSerializer,
+    StationSerializer,
+    TrainSerializer,
+    TripSerializer,
+)
+
+FEEDS = {
+    "station": (Station, StationSerializer),
+    "route": (Route, RouteSerializer),
+    "train": (Train, TrainSerializer),
+    "trip": (Trip, TripSerializer),
+}
+MODEL_NAMES = {model: name for name, (model, _) in FEEDS.items()}
+
+# Key of the advisory lock serializing the writers of the change log.
+CHANGE_LOG_LOCK = 0x6368616E6765
+
+LOCK_SQL = "SELECT pg_advisory_xact_lock(%s)"
+
+
+def lock_change_log(using="default"):
+    """
+    Wait for other transactions that logged changes to end; the lock is
+    held until the current transaction does.
+    """
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(LOCK_SQL, [CHANGE_LOG_LOCK])
+
+
+def log_changes(model, ids, action, using="default"):
+    entries = [
+        ChangeLogEntry(model=MODEL_NAMES[model], object_id=pk, action=action)
+        for pk in ids
+    ]
+    if not entries:
+        return
+    with transaction.atomic(using=using):
+        lock_change_log(using)
+        ChangeLogEntry.objects.using(using).bulk_create(entries)
+
+
+def current_records(entries, using="default"):
+    """
+    ``{(model name, id): serialized record}`` of the records ``entries``
+    refer to that still exist, one query per model (and one for crews).
+    """
+    ids = {}
+    for entry in entries:
+        if entry.action != ChangeLogEntry.DELETE:
+            ids.setdefault(entry.model, set()).add(entry.object_id)
+
+    records = {}
+    for name, object_ids in ids.items():
+        model, serializer_class = FEEDS[name]
+        queryset = model.objects.using(using).filter(id__in=object_ids)
+        if model is Trip:
+            queryset = queryset.prefetch_related("crew")
+        for obj in queryset:
+            records[name, obj.id] = serializer_class(obj).data
+    return records
+
+
+def changes_since(since, limit, using="default"):
+    """
+    Up to ``limit`` changes after sequence ``since`` in order, with the
+    current state of inserted and updated records (``None`` once they
+    are deleted again), and whether more changes follow.
+    """
+    entries = list(
+        ChangeLogEntry.objects.using(using).filter(id__gt=since)[: limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    records = current_records(entries, using)
+    return [
+        {
+            "seq": entry.id,
+            "model": entry.model,
+            "id": entry.object_id,
+            "action": entry.action,
+            "data": records.get((entry.model, entry.object_id)),
+        }
+        for entry in entries
+    ], has_more
@@ -0,0 +1,136 @@
+"""
+Ticket prices from route distance, train type and seat class.
+
+``fare_table`` holds the fare matrix of every (route, train type) pair
+in memory, so pricing an order or a trip list adds no queries. It is
+built with two queries on first use and rebuilt after
+``FARE_TABLE["TIMEOUT"]`` seconds. Saving or deleting a route or a fare
+rule updates only the affected row or column of the matrix in this
+process (see ``train_station.signals``); other workers pick up the
+change on their next rebuild.
+"""
+
+import threading
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+
+from train_station.models import FareRule, Route
+
+CENT = Decimal("0.01")
+
+
+def fare(rule, distance):
+    base_fare, per_km = rule
+    return (base_fare + per_km * distance).quantize(CENT, ROUND_HALF_UP)
+
+
+class FareTable:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._distances = {}
+        # {train type id: {seat class: (base fare, per km)}}
+        self._rules = {}
+        # {(route id, train type id): {seat class: price}}
+        self._fares = None
+        self._expires_at = 0
+
+    def load(self, using="default"):
+        distances = dict(
+            Route.objects.using(using).values_list("id", "distance")
+        )
+        rules = {}
+        for train_type_id, seat_class, base_fare, per_km in (
+            FareRule.objects.using(using).values_list(
+                "train_type_id", "seat_class", "base_fare", "per_km"
+            )
+        ):
+            rules.setdefault(train_type_id, {})[seat_class] = (base_fare, per_km)
+
+        fares = {
+            (route_id, train_type_id): {
+                seat_class: fare(rule, distance)
+                for seat_class, rule in classes.items()
+            }
+            for route_id, distance in distances.items()
+            for train_type_id, classes in rules.items()
+        }
+        with self._lock:
+            self._distances, self._rules, self._fares = distances, rules, fares
+            self._expires_at = time.monotonic() + settings.FARE_TABLE["TIMEOUT"]
+
+    def load_if_stale(self, valid_for=0):
+        """
+        Rebuild the table unless it stays valid for ``valid_for`` more
+        seconds.
+        """
+        if self._fares is None or self._expires_at < time.monotonic() + valid_for:
+            self.load()
+
+    def fares(self, route_id, train_type_id):
+        """
+        ``{seat class: price}`` on a route, empty without fare rules for
+        the train type.
+        """
+        self.load_if_stale()
+        return self._fares.get((route_id, train_type_id), {})
+
+    def price(self, route_id, train_type_id, seat_class):
+        return self.fares(route_id, train_type_id).get(seat_class, Decimal(0))
+
+    def update_route(self, route_id, distance):
+        with self._lock:
+            if self._fares is None:
+                return
+            self._distances[route_id] = distance
+            for train_type_id, classes in self._rules.items():
+                self._fares[route_id, train_type_id] = {
+                    seat_class: fare(rule, distance)
+                    for seat_class, rule in classes.items()
+                }
+
+    def remove_route(self, route_id):
+        with self._lock:
+            if self._fares is None:
+                return
+            self._distances.pop(route_id, None)
+            for train_type_id in self._rules:
+                self._fares.pop((route_id, train_type_id), None)
+
+    def update_rule(self, train_type_id, seat_class, rule=None):
+        """
+        Set (or with ``rule=None`` remove) the ``(base fare, per km)`` of
+        a seat class and reprice it on every route.
+        """
+        with self._lock:
+            if self._fares is None:
+                return
+            classes = self._rules.setdefault(train_type_id, {})
+            if rule is None:
+                classes.pop(seat_class, None)
+            else:
+                classes[seat_class] = rule
+            for route_id, distance in self._distances.items():
+                route_fares = self._fares.setdefault((route_id, train_type_id), {})
+                if rule is None:
+                    route_fares.pop(seat_class, None)
+                else:
+                    route_fares[seat_class] = fare(rule, distance)
+
+    def clear(self):
+        with self._lock:
+            self._distances, self._rules, self._fares = {}, {}, None
+
+
+fare_table = FareTable()
+
+
+def ticket_price(trip, cargo):
+    """
+    Price of a seat in ``cargo`` of ``trip``; reads ``trip.train``.
+    """
+    train = trip.train
+    return fare_table.price(
+        trip.route_id, train.train_type_id, train.seat_class(cargo)
+    )
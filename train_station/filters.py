@@ -1,6 +1,23 @@
 from django_filters import rest_framework as filters
 
 from train_station.models import Station, Route, Trip
+from train_station.search_names import search_name
+
+
+class StationNameFilter(filters.CharFilter):
+    """
+    Rows whose ``field_name`` station has a name starting with the value,
+    compared by ``search_name`` so that "Kiev" also finds "Київ". The
+    stations are found with the ``search_name`` index, in a subquery
+    whose ids then filter the rows.
+    """
+
+    def filter(self, qs, value):
+        name = search_name(value or "")
+        if not name:
+            return qs
+        stations = Station.objects.filter(search_name__startswith=name)
+        return qs.filter(**{f"{self.field_name}__in": stations.values("id")})
 
 
 class StationFilter(filters.FilterSet):
@@ -12,10 +29,8 @@ class StationFilter(filters.FilterSet):
 
 
 class RouteFilter(filters.FilterSet):
-    source = filters.CharFilter(field_name="source__name", lookup_expr="icontains")
-    destination = filters.CharFilter(
-        field_name="destination__name", lookup_expr="icontains"
-    )
+    source = StationNameFilter(field_name="source_id")
+    destination = StationNameFilter(field_name="destination_id")
 
     class Meta:
         model = Route
@@ -23,12 +38,8 @@ class RouteFilter(filters.FilterSet):
 
 
 class TripFilter(filters.FilterSet):
-    source_station = filters.CharFilter(
-        field_name="route__source__name", lookup_expr="icontains"
-    )
-    destination_station = filters.CharFilter(
-        field_name="route__destination__name", lookup_expr="icontains"
-    )
+    source_station = StationNameFilter(field_name="route__source_id")
+    destination_station = StationNameFilter(field_name="route__destination_id")
     departure_time = filters.DateFilter(
         field_name="departure_time", lookup_expr="date"
     )
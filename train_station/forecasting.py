@@ -0,0 +1,220 @@
+"""
+Demand forecasting from the booking curves of departed trips.
+
+A trip's booking curve is the number of its tickets sold at least ``d``
+days before departure, for ``d`` up to ``HORIZON_DAYS``. From the curves
+of trips departed in the last ``HISTORY_DAYS`` days the average pickup,
+the share of seats still sold after ``d`` days before departure, is
+computed per route (or over all routes for routes with little history).
+An upcoming trip is expected to end at its current load factor plus the
+pickup for its days left. Every upcoming trip is forecast in one NumPy
+batch and the results are stored in ``TripForecast``.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.db_routers import choose_replica
+from train_station.models import Trip, TripForecast
+from train_station.occupancy import TRIP_TABLES, load_factors
+from train_station.query_plans import tickets_taken
+
+HORIZON_DAYS = 60
+HISTORY_DAYS = 180
+MIN_ROUTE_HISTORY = 5
+
+CAPACITY = F("train__cargo_num") * F("train__places_in_cargo")
+
+
+class BookingCurves:
+    def __init__(self, routes, capacities, booked):
+        self.routes = routes
+        self.capacities = capacities
+        # booked[i, d]: tickets of trip i sold at least d days before departure.
+        self.booked = booked
+
+
+class ForecastResult:
+    def __init__(self):
+        self.history_trips = 0
+        self.trips = 0
+        self.sell_outs = 0
+
+
+def lead_days(departure_days, booking_days, horizon):
+    return np.clip(departure_days - booking_days, 0, horizon)
+
+
+def booking_curves(since, until, horizon=HORIZON_DAYS, using="default"):
+    """
+    Booking curves of live and archived trips departed between ``since``
+    and ``until``, trips without tickets included.
+    """
+    trips, sales = [], []
+    for trip_model, ticket_model in TRIP_TABLES:
+        trips += (
+            trip_model.objects.using(using)
+            .filter(departure_time__range=(since, until))
+            .values_list("id", "route_id", CAPACITY)
+        )
+        sales += (
+            ticket_model.objects.using(using)
+            .filter(trip__departure_time__range=(since, until))
+            .order_by()
+            .values(
+                trip_key=F("trip_id"),
+                departure_day=TruncDate("trip__departure_time"),
+                booking_day=TruncDate("order__created_at"),
+            )
+            .annotate(tickets=Count("id"))
+            .values_list("trip_key", "departure_day", "booking_day", "tickets")
+        )
+
+    trips = np.array(sorted(trips), dtype=np.int64).reshape(-1, 3)
+    sales = np.array(
+        [
+            (trip_id, departure.toordinal(), booking.toordinal(), tickets)
+            for trip_id, departure, booking, tickets in sales
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 4)
+
+    counts = np.zeros((len(trips), horizon + 1), dtype=np.int64)
+    rows = np.searchsorted(trips[:, 0], sales[:, 0])
+    np.add.at(
+        counts, (rows, lead_days(sales[:, 1], sales[:, 2], horizon)), sales[:, 3]
+    )
+    booked = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1]
+    return BookingCurves(trips[:, 1], trips[:, 2], booked)
+
+
+def upcoming_trips(now, using="default"):
+    """
+    ``[id, route id, departure day ordinal, capacity, tickets sold]`` rows
+    of trips departing after ``now``.
+    """
+    trips = (
+        Trip.objects.using(using)
+        .filter(departure_time__gt=now)
+        .values_list(
+            "id", "route_id", TruncDate("departure_time"), CAPACITY, tickets_taken()
+        )
+    )
+    return np.array(
+        [
+            (trip_id, route_id, departure.toordinal(), capacity, sold)
+            for trip_id, route_id, departure, capacity, sold in trips
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 5)
+
+
+def pickup_curves(curves, min_route_history=MIN_ROUTE_HISTORY):
+    """
+    ``(route ids, pickup per route and lead day, history trips per route,
+    pickup over all routes)``. Routes with fewer than
+    ``min_route_history`` departed trips use the pickup over all routes.
+    """
+    horizon = curves.booked.shape[1]
+    has_seats = curves.capacities > 0
+    factors = curves.booked[has_seats] / curves.capacities[has_seats, None]
+    pickup = factors[:, :1] - factors
+    routes = curves.routes[has_seats]
+    overall = pickup.mean(axis=0) if len(pickup) else np.zeros(horizon)
+
+    keys, inverse = np.unique(routes, return_inverse=True)
+    history = np.bincount(inverse, minlength=len(keys))
+    by_route = np.zeros((len(keys), horizon))
+    np.add.at(by_route, inverse, pickup)
+    by_route /= np.maximum(history, 1)[:, None]
+    by_route[history < min_route_history] = overall
+    history[history < min_route_history] = len(pickup)
+    return keys, by_route, history, overall
+
+
+def forecast_loads(curves, routes, capacities, sold, days_left, min_route_history):
+    """
+    ``(expected load factors, history trips)`` of upcoming trips given
+    their routes, capacities, tickets sold and days left to departure.
+    """
+    keys, by_route, history, overall = pickup_curves(curves, min_route_history)
+    lead = np.clip(days_left, 0, len(overall) - 1)
+    pickup = overall[lead]
+    trip_history = np.full(len(routes), np.count_nonzero(curves.capacities))
+
+    rows = np.searchsorted(keys, routes)
+    known = rows < len(keys)
+    known[known] = keys[rows[known]] == routes[known]
+    pickup[known] = by_route[rows[known], lead[known]]
+    trip_history[known] = history[rows[known]]
+
+    current = load_factors(sold, capacities)
+    expected = np.clip(current + pickup, current, 1.0)
+    return expected, trip_history
+
+
+def refresh_forecasts(
+    horizon=HORIZON_DAYS,
+    history_days=HISTORY_DAYS,
+    min_route_history=MIN_ROUTE_HISTORY,
+    now=None,
+    using=None,
+):
+    """
+    Forecast the final load of every upcoming trip and replace the stored
+    forecasts. Reads go to a healthy replica when one is configured.
+    """
+    if min(horizon, history_days, min_route_history) < 1:
+        raise ValueError(
+            "The horizon, history days and minimum route history must be "
+            "at least 1."
+        )
+    using = using or choose_replica() or "default"
+    now = now or timezone.now()
+    curves = booking_curves(
+        now - timedelta(days=history_days), now, horizon=horizon, using=using
+    )
+    upcoming = upcoming_trips(now, using)
+    capacities, sold = upcoming[:, 3], upcoming[:, 4]
+    days_left = upcoming[:, 2] - timezone.localdate(now).toordinal()
+    expected, history = forecast_loads(
+        curves, upcoming[:, 1], capacities, sold, days_left, min_route_history
+    )
+    expected_tickets = expected * capacities
+    sells_out = (capacities > 0) & (np.rint(expected_tickets) >= capacities)
+
+    forecasts = [
+        TripForecast(
+            trip_id=trip_id,
+            booked=booked,
+            capacity=capacity,
+            expected_tickets=round(tickets, 2),
+            expected_load_factor=round(factor, 4),
+            sells_out=full,
+            history_trips=trips,
+            computed_at=now,
+        )
+        for trip_id, booked, capacity, tickets, factor, full, trips in zip(
+            upcoming[:, 0].tolist(),
+            sold.tolist(),
+            capacities.tolist(),
+            expected_tickets.tolist(),
+            expected.tolist(),
+            sells_out.tolist(),
+            history.tolist(),
+        )
+    ]
+    with transaction.atomic():
+        TripForecast.objects.all().delete()
+        TripForecast.objects.bulk_create(forecasts)
+
+    result = ForecastResult()
+    result.history_trips = np.count_nonzero(curves.capacities)
+    result.trips = len(forecasts)
+    result.sell_outs = int(sells_out.sum())
+    return result
@@ -0,0 +1,228 @@
+import random
+from datetime import datetime, time as day_start, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from train_station.models import (
+    Crew,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+    Trip,
+)
+from train_station.occupancy import mark_days
+from train_station.search_names import search_name
+
+TRAIN_TYPES = ("Intercity", "Regional", "Night")
+AVERAGE_SPEED = 90  # km/h
+TURNAROUND = timedelta(hours=1)
+
+
+class LoadDataResult:
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, label, objects):
+        self.counts[label] = self.counts.get(label, 0) + len(objects)
+        return objects
+
+
+def generate_load_data(
+    stations=50,
+    routes=150,
+    trains=20,
+    days=14,
+    load_factor=0.5,
+    users=50,
+    start=None,
+    seed=0,
+    batch_size=5000,
+    using="default",
+):
+    """
+    Create a synthetic network with bulk inserts: ``stations`` stations
+    joined by ``routes`` routes, ``trains`` trains running back to back
+    for ``days`` days from ``start`` (today by default), and tickets for
+    ``load_factor`` of every trip's seats, grouped into orders of 1-4
+    tickets by ``users`` users. The same ``seed`` gives the same network.
+    """
+    if stations < 2:
+        raise ValueError("At least two stations are needed for a route.")
+    if min(routes, trains, days) < 0:
+        raise ValueError("Routes, trains and days cannot be negative.")
+    if trains and not routes:
+        raise ValueError("At least one route is needed to schedule trains.")
+    if not 0 <= load_factor <= 1:
+        raise ValueError("The load factor must be between 0 and 1.")
+    if users < 1:
+        raise ValueError("At least one user is needed to own the orders.")
+
+    rng = random.Random(seed)
+    result = LoadDataResult()
+    if start is None:
+        start = timezone.localdate()
+    start = timezone.make_aware(datetime.combine(start, day_start.min))
+    end = start + timedelta(days=days)
+
+    with transaction.atomic(using=using):
+        station_objects = result.add(
+            "stations",
+            Station.objects.using(using).bulk_create(
+                (
+                    Station(
+                        name=f"Load Station {i}",
+                        search_name=search_name(f"Load Station {i}"),
+                        latitude=rng.uniform(44, 52),
+                        longitude=rng.uniform(22, 40),
+                    )
+                    for i in range(stations)
+                ),
+                batch_size=batch_size,
+            ),
+        )
+        route_objects = result.add(
+            "routes",
+            Route.objects.using(using).bulk_create(
+                (
+                    Route(
+                        source=source,
+                        destination=destination,
+                        distance=rng.randint(50, 1200),
+                    )
+                    for source, destination in (
+                        rng.sample(station_objects, 2) for _ in range(routes)
+                    )
+                ),
+                batch_size=batch_size,
+            ),
+        )
+
+        train_types = TrainType.objects.using(using).bulk_create(
+            TrainType(name=name) for name in TRAIN_TYPES
+        )
+        train_objects = result.add(
+            "trains",
+            Train.objects.using(using).bulk_create(
+                (
+                    Train(
+                        name=f"Load Train {i}",
+                        cargo_num=rng.randint(3, 12),
+                        places_in_cargo=rng.randint(20, 60),
+                        train_type=rng.choice(train_types),
+                    )
+                    for i in range(trains)
+                ),
+                batch_size=batch_size,
+            ),
+        )
+        crew = result.add(
+            "crew",
+            Crew.objects.using(using).bulk_create(
+                (
+                    Crew(first_name=f"Crew{i}", last_name=f"Member{i}")
+                    for i in range(trains * 2)
+                ),
+                batch_size=batch_size,
+            ),
+        )
+
+        trip_objects = []
+        for train in train_objects:
+            departure = start + timedelta(minutes=rng.randrange(0, 12 * 60, 5))
+            while departure < end:
+                route = rng.choice(route_objects)
+                arrival = departure + timedelta(
+                    minutes=max(30, route.distance * 60 // AVERAGE_SPEED)
+                )
+                trip_objects.append(
+                    Trip(
+                        route=route,
+                        train=train,
+                        departure_time=departure,
+                        arrival_time=arrival,
+                    )
+                )
+                departure = arrival + TURNAROUND
+        result.add(
+            "trips",
+            Trip.objects.using(using).bulk_create(
+                trip_objects, batch_size=batch_size
+            ),
+        )
+        Trip.crew.through.objects.using(using).bulk_create(
+            (
+                Trip.crew.through(trip_id=trip.id, crew_id=member.id)
+                for trip in trip_objects
+                for member in rng.sample(crew, 2)
+            ),
+            batch_size=batch_size,
+        )
+
+        user_objects = create_load_users(users, using)
+        seats = [
+            (trip, cargo, seat)
+            for trip in trip_objects
+            for cargo, seat in sample_seats(trip.train, load_factor, rng)
+        ]
+        orders = []
+        order_sizes = []
+        taken = 0
+        while taken < len(seats):
+            size = min(rng.randint(1, 4), len(seats) - taken)
+            orders.append(Order(user=rng.choice(user_objects)))
+            order_sizes.append(size)
+            taken += size
+        result.add(
+            "orders",
+            Order.objects.using(using).bulk_create(orders, batch_size=batch_size),
+        )
+
+        tickets = []
+        seat_iter = iter(seats)
+        for order, size in zip(orders, order_sizes):
+            for _ in range(size):
+                trip, cargo, seat = next(seat_iter)
+                tickets.append(Ticket(trip=trip, order=order, cargo=cargo, seat=seat))
+        result.add(
+            "tickets",
+            Ticket.objects.using(using).bulk_create(tickets, batch_size=batch_size),
+        )
+        mark_days(
+            {timezone.localdate(trip.departure_time) for trip in trip_objects}, using
+        )
+
+    return result
+
+
+def create_load_users(count, using="default"):
+    """
+    Users ``load{i}@load.test`` that own the generated orders; they have
+    no usable password and are reused by later runs.
+    """
+    user_model = get_user_model()
+    emails = [f"load{i}@load.test" for i in range(count)]
+    password = make_password(None)
+    user_model.objects.using(using).bulk_create(
+        (user_model(email=email, password=password) for email in emails),
+        ignore_conflicts=True,
+    )
+    return list(
+        user_model.objects.using(using).filter(email__in=emails).order_by("email")
+    )
+
+
+def sample_seats(train, load_factor, rng):
+    """
+    ``load_factor`` of the train's seats as (cargo, seat) pairs.
+    """
+    taken = rng.sample(range(train.capacity), round(train.capacity * load_factor))
+    return [
+        (index // train.places_in_cargo + 1, index % train.places_in_cargo + 1)
+        for index in taken
+    ]
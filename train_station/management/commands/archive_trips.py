@@ -0,0 +1,48 @@
+import time
+from datetime import datetime, time as day_start, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from train_station.archiving import archive_trips
+
+
+class Command(BaseCommand):
+    help = (
+        "Move departed trips and their tickets into the archive tables "
+        "in chunked transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Archive trips that departed more than this many days ago.",
+        )
+        parser.add_argument(
+            "--before",
+            help="Archive trips departed before this date (YYYY-MM-DD).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        if options["before"]:
+            try:
+                date = datetime.strptime(options["before"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("--before must be a date in YYYY-MM-DD format.")
+            before = timezone.make_aware(datetime.combine(date, day_start.min))
+        else:
+            before = timezone.now() - timedelta(days=options["days"])
+
+        started = time.perf_counter()
+        result = archive_trips(before, chunk_size=options["chunk_size"])
+        self.stdout.write(
+            f"Archived {result.trips} trips and {result.tickets} tickets "
+            f"departed before {before:%Y-%m-%d %H:%M} in {result.chunks} "
+            f"chunks ({time.perf_counter() - started:.2f}s)"
+        )
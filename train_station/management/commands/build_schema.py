@@ -0,0 +1,23 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.schema import write_schema_artifacts
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema files served at /api/doc/."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            type=Path,
+            default=None,
+            help="Directory to write to, SCHEMA_ARTIFACT_DIR by default.",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["output"] or Path(settings.SCHEMA_ARTIFACT_DIR)
+        for path in write_schema_artifacts(directory):
+            self.stdout.write(f"Wrote {path} ({path.stat().st_size} bytes)")
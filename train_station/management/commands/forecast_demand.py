@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from train_station.forecasting import (
+    HISTORY_DAYS,
+    HORIZON_DAYS,
+    MIN_ROUTE_HISTORY,
+    refresh_forecasts,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Forecast the final load of every upcoming trip from the booking "
+        "curves of departed trips. Meant to run nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--history-days",
+            type=int,
+            default=HISTORY_DAYS,
+            help="Learn from trips departed in this many past days.",
+        )
+        parser.add_argument(
+            "--horizon",
+            type=int,
+            default=HORIZON_DAYS,
+            help="Longest booking curve, in days before departure.",
+        )
+        parser.add_argument(
+            "--min-route-history",
+            type=int,
+            default=MIN_ROUTE_HISTORY,
+            help="Departed trips a route needs for its own booking curve.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            result = refresh_forecasts(
+                horizon=options["horizon"],
+                history_days=options["history_days"],
+                min_route_history=options["min_route_history"],
+            )
+        except ValueError as e:
+            raise CommandError(e)
+        self.stdout.write(
+            f"Forecast {result.trips} upcoming trips from "
+            f"{result.history_trips} departed trips, "
+            f"{result.sell_outs} expected to sell out "
+            f"({time.perf_counter() - started:.2f}s)"
+        )
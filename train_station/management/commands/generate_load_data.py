@@ -0,0 +1,64 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from train_station.load_data import generate_load_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk insert a synthetic network of stations, routes, trains, "
+        "trips and tickets for load testing. Run it on a disposable database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stations", type=int, default=50)
+        parser.add_argument("--routes", type=int, default=150)
+        parser.add_argument("--trains", type=int, default=20)
+        parser.add_argument(
+            "--days", type=int, default=14, help="Days of trips to schedule."
+        )
+        parser.add_argument(
+            "--start", help="First day of trips (YYYY-MM-DD), today by default."
+        )
+        parser.add_argument(
+            "--load-factor",
+            type=float,
+            default=0.5,
+            help="Share of each trip's seats that are sold.",
+        )
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        start = None
+        if options["start"]:
+            try:
+                start = datetime.strptime(options["start"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("--start must be a date in YYYY-MM-DD format.")
+
+        started = time.perf_counter()
+        try:
+            result = generate_load_data(
+                stations=options["stations"],
+                routes=options["routes"],
+                trains=options["trains"],
+                days=options["days"],
+                load_factor=options["load_factor"],
+                users=options["users"],
+                start=start,
+                seed=options["seed"],
+                batch_size=options["batch_size"],
+            )
+        except ValueError as e:
+            raise CommandError(e)
+
+        counts = ", ".join(
+            f"{count} {label}" for label, count in result.counts.items()
+        )
+        self.stdout.write(
+            f"Created {counts} in {time.perf_counter() - started:.2f}s"
+        )
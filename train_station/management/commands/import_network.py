@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from train_station.bulk_import import NetworkImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream stations, routes, trains and trips from CSV files "
+        "into the database in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stations", help="CSV with columns: name, latitude, longitude"
+        )
+        parser.add_argument(
+            "--routes", help="CSV with columns: source, destination, distance"
+        )
+        parser.add_argument(
+            "--trains",
+            help="CSV with columns: name, cargo_num, places_in_cargo, train_type",
+        )
+        parser.add_argument(
+            "--trips",
+            help=(
+                "CSV with columns: source, destination, train, "
+                "departure_time, arrival_time"
+            ),
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Use bulk_create even when PostgreSQL COPY is available.",
+        )
+
+    def handle(self, *args, **options):
+        steps = [
+            (option, options[option])
+            for option in ("stations", "routes", "trains", "trips")
+            if options[option]
+        ]
+        if not steps:
+            raise CommandError(
+                "Pass at least one of --stations, --routes, --trains, --trips."
+            )
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        importer = NetworkImporter(
+            batch_size=options["batch_size"],
+            use_copy=not options["no_copy"],
+        )
+        for option, path in steps:
+            try:
+                result = getattr(importer, f"import_{option}")(path)
+            except OSError as e:
+                raise CommandError(f"Cannot read {path}: {e}")
+
+            for line, message in result.errors:
+                self.stderr.write(f"{path}:{line}: {message}")
+            self.stdout.write(
+                f"{result.name}: {result.created} created, "
+                f"{result.skipped} skipped, {len(result.errors)} errors "
+                f"in {result.elapsed:.2f}s "
+                f"({result.rows_per_second:.0f} rows/s)"
+            )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from train_station.throttling import get_bucket_store
+
+
+class Command(BaseCommand):
+    help = "Delete throttle buckets that have been idle long enough to be full."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--idle",
+            type=int,
+            default=86400,
+            help="Seconds since the last request (at least the longest "
+                 "throttle period).",
+        )
+
+    def handle(self, *args, **options):
+        if options["idle"] < 1:
+            raise CommandError("--idle must be positive.")
+
+        deleted = get_bucket_store().prune(options["idle"])
+        self.stdout.write(f"Deleted {deleted} idle throttle buckets")
@@ -0,0 +1,36 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from train_station.occupancy import refresh_occupancy
+
+
+class Command(BaseCommand):
+    help = (
+        "Update the occupancy summary for departure days with trips or "
+        "tickets changed since the last run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Recompute every day.")
+        parser.add_argument(
+            "--day",
+            action="append",
+            default=[],
+            help="Also recompute this departure day (YYYY-MM-DD), "
+            "e.g. after train capacity changes. Can be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            days = [date.fromisoformat(day) for day in options["day"]]
+        except ValueError:
+            raise CommandError("--day must be a date in YYYY-MM-DD format.")
+
+        started = time.perf_counter()
+        result = refresh_occupancy(full=options["full"], days=days)
+        self.stdout.write(
+            f"Recomputed {result.days} days ({result.rows} summary rows) "
+            f"({time.perf_counter() - started:.2f}s)"
+        )
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from train_station.seeding import seed_fixture
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply a JSON fixture with bulk upserts, skipping it entirely "
+        "when its content hash matches the last applied one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("fixture", help="Path to a JSON fixture file.")
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Compare and apply the fixture even if its hash is unchanged.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = seed_fixture(options["fixture"], force=options["force"])
+        except OSError as e:
+            raise CommandError(f"Cannot read {options['fixture']}: {e}")
+
+        if result.skipped:
+            self.stdout.write(
+                f"{result.name} unchanged ({result.content_hash[:12]}), "
+                f"skipped in {result.elapsed * 1000:.1f}ms"
+            )
+            return
+
+        for label, (created, updated, unchanged) in result.counts.items():
+            self.stdout.write(
+                f"{label}: {created} created, {updated} updated, "
+                f"{unchanged} unchanged"
+            )
+        self.stdout.write(
+            f"{result.name} applied ({result.content_hash[:12]}) "
+            f"in {result.elapsed * 1000:.1f}ms"
+        )
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("train_station", "0003_alter_crew_options_alter_order_options_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FixtureState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("content_hash", models.CharField(max_length=64)),
+                ("applied_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Fixture State",
+                "verbose_name_plural": "Fixture States",
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name="ticket",
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name="trip",
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name="ticket",
+            constraint=models.UniqueConstraint(
+                fields=("trip", "cargo", "seat"), name="unique_trip_cargo_seat"
+            ),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("train_station", "0004_fixturestate"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTrip",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("departure_time", models.DateTimeField()),
+                ("arrival_time", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "crew",
+                    models.ManyToManyField(
+                        related_name="archived_trips", to="train_station.crew"
+                    ),
+                ),
+                (
+                    "route",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_trips",
+                        to="train_station.route",
+                    ),
+                ),
+                (
+                    "train",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_trips",
+                        to="train_station.train",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived Trip",
+                "verbose_name_plural": "Archived Trips",
+                "ordering": ("departure_time",),
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedTicket",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("cargo", models.PositiveIntegerField()),
+                ("seat", models.PositiveIntegerField()),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_tickets",
+                        to="train_station.order",
+                    ),
+                ),
+                (
+                    "trip",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tickets",
+                        to="train_station.archivedtrip",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived Ticket",
+                "verbose_name_plural": "Archived Tickets",
+                "ordering": ("cargo", "seat"),
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("train_station", "0005_archivedtrip_archivedticket"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ThrottleBucket",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=255, primary_key=True, serialize=False),
+                ),
+                ("tokens", models.FloatField()),
+                ("updated_at", models.FloatField(db_index=True)),
+            ],
+            options={
+                "verbose_name": "Throttle Bucket",
+                "verbose_name_plural": "Throttle Buckets",
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("train_station", "0006_throttlebucket"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlowQuery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=40, unique=True)),
+                ("normalized_sql", models.TextField()),
+                ("sql", models.TextField()),
+                ("params", models.TextField(blank=True)),
+                ("endpoint", models.CharField(max_length=255)),
+                ("database", models.CharField(max_length=64)),
+                ("plan", models.TextField(blank=True)),
+                ("count", models.PositiveIntegerField(default=1)),
+                ("total_ms", models.FloatField()),
+                ("max_ms", models.FloatField()),
+                ("first_seen", models.DateTimeField(auto_now_add=True)),
+                ("last_seen", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Slow Query",
+                "verbose_name_plural": "Slow Queries",
+                "ordering": ("-total_ms",),
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("train_station", "0007_slowquery"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SummaryState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("last_ticket_id", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Summary State",
+                "verbose_name_plural": "Summary States",
+            },
+        ),
+        migrations.CreateModel(
+            name="OccupancySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[
+                            ("route", "Route"),
+                            ("train_type", "Train type"),
+                            ("hour", "Departure hour"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("key", models.IntegerField()),
+                ("trips", models.PositiveIntegerField()),
+                ("seats", models.PositiveIntegerField()),
+                ("sold", models.PositiveIntegerField()),
+                ("load_factor", models.FloatField()),
+            ],
+            options={
+                "verbose_name": "Occupancy Summary",
+                "verbose_name_plural": "Occupancy Summaries",
+                "ordering": ("dimension", "day", "key"),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("dimension", "day", "key"),
+                        name="unique_occupancy_dimension_day_key",
+                    )
+                ],
+            },
+        ),
+    ]
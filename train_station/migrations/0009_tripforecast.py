@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("train_station", "0008_occupancysummary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TripForecast",
+            fields=[
+                (
+                    "trip",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="forecast",
+                        serialize=False,
+                        to="train_station.trip",
+                    ),
+                ),
+                ("booked", models.PositiveIntegerField()),
+                ("capacity", models.PositiveIntegerField()),
+                ("expected_tickets", models.FloatField()),
+                ("expected_load_factor", models.FloatField()),
+                ("sells_out", models.BooleanField()),
+                ("history_trips", models.PositiveIntegerField()),
+                ("computed_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Trip Forecast",
+                "verbose_name_plural": "Trip Forecasts",
+                "ordering": ("-expected_load_factor",),
+            },
+        ),
+    ]
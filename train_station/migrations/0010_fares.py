@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("train_station", "0009_tripforecast"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedticket",
+            name="price",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="total",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name="ticket",
+            name="price",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AddField(
+            model_name="train",
+            name="first_class_cargos",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Cargos 1 to N are first class."
+            ),
+        ),
+        migrations.CreateModel(
+            name="FareRule",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "seat_class",
+                    models.CharField(
+                        choices=[("first", "First class"), ("second", "Second class")],
+                        max_length=6,
+                    ),
+                ),
+                ("base_fare", models.DecimalField(decimal_places=2, max_digits=8)),
+                ("per_km", models.DecimalField(decimal_places=4, max_digits=8)),
+                (
+                    "train_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fare_rules",
+                        to="train_station.traintype",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Fare Rule",
+                "verbose_name_plural": "Fare Rules",
+                "unique_together": {("train_type", "seat_class")},
+            },
+        ),
+    ]
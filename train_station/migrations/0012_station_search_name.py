@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:38
+
+from django.db import migrations, models
+
+from train_station.search_names import search_name
+
+
+def fill_search_names(apps, schema_editor):
+    Station = apps.get_model("train_station", "Station")
+    stations = list(Station.objects.using(schema_editor.connection.alias))
+    for station in stations:
+        station.search_name = search_name(station.name)
+    Station.objects.using(schema_editor.connection.alias).bulk_update(
+        stations, ["search_name"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("train_station", "0011_changelogentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="station",
+            name="search_name",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=255
+            ),
+        ),
+        migrations.RunPython(fill_search_names, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="station",
+            index=models.Index(
+                fields=["search_name"],
+                name="station_search_name_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+    ]
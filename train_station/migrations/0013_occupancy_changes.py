@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("train_station", "0012_station_search_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OccupancyChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+            ],
+            options={
+                "verbose_name": "Occupancy Change",
+                "verbose_name_plural": "Occupancy Changes",
+            },
+        ),
+        migrations.DeleteModel(
+            name="SummaryState",
+        ),
+    ]
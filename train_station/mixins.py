@@ -0,0 +1,100 @@
+from django.db.models import BigIntegerField
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from core.db_routers import (
+    choose_replica,
+    is_pinned_to_primary,
+    pin_to_primary,
+    set_read_database,
+)
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe requests from a read replica.
+
+    Users who wrote recently stay on the primary (see ``pin_to_primary``),
+    so e.g. the order list right after ``POST /orders/`` includes the order.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned_to_primary(
+            request.user
+        ):
+            set_read_database(choose_replica())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            set_read_database(None)
+
+
+class QueryPlanMixin:
+    """
+    Load the rows of each action with its ``QueryPlan`` from
+    ``query_plans``; actions without a plan use the queryset as is.
+    """
+
+    query_plans = {}
+
+    def get_query_plan(self):
+        return self.query_plans.get(self.action)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        plan = self.get_query_plan()
+        if plan is None:
+            return queryset
+        return plan.apply(queryset)
+
+
+class BulkRetrieveMixin:
+    """
+    ``?ids=3,1,2`` on the list returns those rows in that order, loaded
+    and serialized as by ``retrieve`` in one ``id__in`` query and not
+    paginated. Ids that do not exist (or are not visible) are left out;
+    at most ``bulk_retrieve_limit`` ids are accepted.
+    """
+
+    bulk_retrieve_limit = 50
+
+    def get_bulk_ids(self):
+        # A dict keeps the first occurrence of each id, in order.
+        ids = {}
+        for value in self.request.query_params["ids"].split(","):
+            try:
+                pk = int(value)
+            except ValueError:
+                pk = 0
+            if not 0 < pk <= BigIntegerField.MAX_BIGINT:
+                raise ValidationError(
+                    {"ids": "Expected comma-separated positive ids."}
+                )
+            ids[pk] = None
+        if len(ids) > self.bulk_retrieve_limit:
+            raise ValidationError(
+                {"ids": f"At most {self.bulk_retrieve_limit} ids."}
+            )
+        return list(ids)
+
+    def list(self, request, *args, **kwargs):
+        if "ids" not in request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        ids = self.get_bulk_ids()
+        # Pick the detail query plan and serializer.
+        self.action = "retrieve"
+        objects = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [objects[pk] for pk in ids if pk in objects], many=True
+        )
+        return Response(serializer.data)
@@ -1,7 +1,9 @@
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, router, transaction
+
+from train_station.search_names import search_name
 
 
 def validate_latitude(value):
@@ -18,24 +20,54 @@ def validate_longitude(value):
         )
 
 
-class Station(models.Model):
+class AtomicSaveMixin:
+    """
+    Save in a transaction with the ``post_save`` receivers, so the change
+    log entry (see ``train_station.change_feed``) commits with the change.
+    """
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(
+            type(self), instance=self
+        )
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+class Station(AtomicSaveMixin, models.Model):
     name = models.CharField(max_length=255)
+    # Filled from the name on save, see train_station.search_names.
+    search_name = models.CharField(
+        max_length=255, blank=True, editable=False, default=""
+    )
     latitude = models.FloatField(validators=[validate_latitude])
     longitude = models.FloatField(validators=[validate_longitude])
 
     class Meta:
         verbose_name = "Station"
         verbose_name_plural = "Stations"
+        indexes = [
+            # Prefix LIKE on PostgreSQL needs the pattern operator class.
+            models.Index(
+                fields=["search_name"],
+                name="station_search_name_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ]
 
     def save(self, *args, **kwargs):
+        self.search_name = search_name(self.name)
         self.full_clean()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "search_name"}
         super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return self.name
 
 
-class Route(models.Model):
+class Route(AtomicSaveMixin, models.Model):
     source = models.ForeignKey(
         Station, related_name="source_routes", on_delete=models.CASCADE
     )
@@ -73,13 +105,16 @@ class TrainType(models.Model):
         return self.name
 
 
-class Train(models.Model):
+class Train(AtomicSaveMixin, models.Model):
     name = models.CharField(max_length=255)
     cargo_num = models.IntegerField(validators=[MinValueValidator(1)])
     places_in_cargo = models.IntegerField(validators=[MinValueValidator(1)])
     train_type = models.ForeignKey(
         TrainType, related_name="trains", on_delete=models.CASCADE
     )
+    first_class_cargos = models.PositiveIntegerField(
+        default=0, help_text="Cargos 1 to N are first class."
+    )
 
     class Meta:
         verbose_name = "Train"
@@ -90,26 +125,64 @@ class Train(models.Model):
     def capacity(self):
         return self.cargo_num * self.places_in_cargo
 
+    def seat_class(self, cargo) -> str:
+        if cargo <= self.first_class_cargos:
+            return FareRule.FIRST
+        return FareRule.SECOND
+
     def __str__(self) -> str:
         return self.name
 
 
+class FareRule(models.Model):
+    """
+    Fare of a seat class on trains of a type:
+    ``base_fare + per_km * route distance``.
+    """
+    FIRST = "first"
+    SECOND = "second"
+    SEAT_CLASSES = ((FIRST, "First class"), (SECOND, "Second class"))
+
+    train_type = models.ForeignKey(
+        TrainType, related_name="fare_rules", on_delete=models.CASCADE
+    )
+    seat_class = models.CharField(max_length=6, choices=SEAT_CLASSES)
+    base_fare = models.DecimalField(max_digits=8, decimal_places=2)
+    per_km = models.DecimalField(max_digits=8, decimal_places=4)
+
+    class Meta:
+        verbose_name = "Fare Rule"
+        verbose_name_plural = "Fare Rules"
+        unique_together = ("train_type", "seat_class")
+
+    def __str__(self) -> str:
+        return f"{self.train_type_id} {self.seat_class}"
+
+
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE
     )
+    total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
     def __str__(self) -> str:
         return str(self.created_at)
 
+    @property
+    def all_tickets(self) -> list:
+        """
+        Live tickets followed by the tickets of archived trips.
+        """
+        return [*self.tickets.all(), *self.archived_tickets.all()]
+
     class Meta:
         ordering = ["-created_at"]
         verbose_name = "Order"
         verbose_name_plural = "Orders"
 
 
-class Trip(models.Model):
+class Trip(AtomicSaveMixin, models.Model):
     route = models.ForeignKey(
         Route, related_name="trips", on_delete=models.CASCADE
     )
@@ -168,6 +241,7 @@ class Ticket(models.Model):
     order = models.ForeignKey(
         Order, related_name="tickets", on_delete=models.CASCADE
     )
+    price = models.DecimalField(max_digits=8, decimal_places=2, default=0)
 
     class Meta:
         constraints = [
@@ -235,3 +309,218 @@ class Crew(models.Model):
 
     def __str__(self) -> str:
         return f"{self.first_name} {self.last_name}"
+
+
+class ArchivedTrip(models.Model):
+    """
+    Departed trip moved out of the live ``Trip`` table, keeping its id.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    route = models.ForeignKey(
+        Route, related_name="archived_trips", on_delete=models.CASCADE
+    )
+    train = models.ForeignKey(
+        Train, related_name="archived_trips", on_delete=models.CASCADE
+    )
+    departure_time = models.DateTimeField()
+    arrival_time = models.DateTimeField()
+    crew = models.ManyToManyField("Crew", related_name="archived_trips")
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("departure_time",)
+        verbose_name = "Archived Trip"
+        verbose_name_plural = "Archived Trips"
+
+    def __str__(self) -> str:
+        return (
+            f"({str(self.departure_time)}) "
+            f"{str(self.route)} "
+            f"({str(self.arrival_time)})"
+        )
+
+
+class ArchivedTicket(models.Model):
+    """
+    Ticket of an archived trip, keeping its id and order.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    cargo = models.PositiveIntegerField()
+    seat = models.PositiveIntegerField()
+    trip = models.ForeignKey(
+        ArchivedTrip, related_name="tickets", on_delete=models.CASCADE
+    )
+    order = models.ForeignKey(
+        Order, related_name="archived_tickets", on_delete=models.CASCADE
+    )
+    price = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ("cargo", "seat")
+        verbose_name = "Archived Ticket"
+        verbose_name_plural = "Archived Tickets"
+
+    def __str__(self):
+        return (f"{str(self.trip)} "
+                f" (cargo: {self.cargo}, "
+                f"seat: {self.seat})")
+
+
+class FixtureState(models.Model):
+    """
+    Content hash of the last fixture applied by ``seed_data``.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    content_hash = models.CharField(max_length=64)
+    applied_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Fixture State"
+        verbose_name_plural = "Fixture States"
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.content_hash[:12]})"
+
+
+class ThrottleBucket(models.Model):
+    """
+    Token bucket state of one throttle key, shared by all workers.
+    """
+    key = models.CharField(max_length=255, primary_key=True)
+    tokens = models.FloatField()
+    updated_at = models.FloatField(db_index=True)
+
+    class Meta:
+        verbose_name = "Throttle Bucket"
+        verbose_name_plural = "Throttle Buckets"
+
+    def __str__(self) -> str:
+        return f"{self.key} ({self.tokens:.2f} tokens)"
+
+
+class SlowQuery(models.Model):
+    """
+    Queries over ``SLOW_QUERY_LOG["THRESHOLD_MS"]`` grouped by their
+    normalized SQL, with the plan of the first occurrence.
+    """
+    fingerprint = models.CharField(max_length=40, unique=True)
+    normalized_sql = models.TextField()
+    sql = models.TextField()
+    params = models.TextField(blank=True)
+    endpoint = models.CharField(max_length=255)
+    database = models.CharField(max_length=64)
+    plan = models.TextField(blank=True)
+    count = models.PositiveIntegerField(default=1)
+    total_ms = models.FloatField()
+    max_ms = models.FloatField()
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("-total_ms",)
+        verbose_name = "Slow Query"
+        verbose_name_plural = "Slow Queries"
+
+    def __str__(self) -> str:
+        return f"{self.endpoint}: {self.normalized_sql[:80]}"
+
+
+class OccupancySummary(models.Model):
+    """
+    Trips, seats and tickets sold on one departure day, for one route,
+    train type or departure hour; refreshed by ``refresh_occupancy``.
+    """
+    ROUTE = "route"
+    TRAIN_TYPE = "train_type"
+    HOUR = "hour"
+    DIMENSIONS = [
+        (ROUTE, "Route"),
+        (TRAIN_TYPE, "Train type"),
+        (HOUR, "Departure hour"),
+    ]
+
+    dimension = models.CharField(max_length=16, choices=DIMENSIONS)
+    day = models.DateField()
+    key = models.IntegerField()
+    trips = models.PositiveIntegerField()
+    seats = models.PositiveIntegerField()
+    sold = models.PositiveIntegerField()
+    load_factor = models.FloatField()
+
+    class Meta:
+        ordering = ("dimension", "day", "key")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dimension", "day", "key"],
+                name="unique_occupancy_dimension_day_key",
+            )
+        ]
+        verbose_name = "Occupancy Summary"
+        verbose_name_plural = "Occupancy Summaries"
+
+    def __str__(self) -> str:
+        return f"{self.dimension} {self.key} on {self.day}: {self.load_factor:.0%}"
+
+
+class OccupancyChange(models.Model):
+    """
+    Departure day whose trips or tickets changed, written in the
+    transaction of the change and consumed by ``refresh_occupancy``.
+    """
+    day = models.DateField()
+
+    class Meta:
+        verbose_name = "Occupancy Change"
+        verbose_name_plural = "Occupancy Changes"
+
+    def __str__(self) -> str:
+        return f"{self.id}: {self.day}"
+
+
+class TripForecast(models.Model):
+    """
+    Expected final load of an upcoming trip, precomputed by
+    ``forecast_demand`` from the booking curves of departed trips.
+    """
+    trip = models.OneToOneField(
+        Trip, primary_key=True, related_name="forecast", on_delete=models.CASCADE
+    )
+    booked = models.PositiveIntegerField()
+    capacity = models.PositiveIntegerField()
+    expected_tickets = models.FloatField()
+    expected_load_factor = models.FloatField()
+    sells_out = models.BooleanField()
+    history_trips = models.PositiveIntegerField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ("-expected_load_factor",)
+        verbose_name = "Trip Forecast"
+        verbose_name_plural = "Trip Forecasts"
+
+    def __str__(self) -> str:
+        return f"{self.trip_id}: {self.expected_load_factor:.0%}"
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Insert, update or delete of a timetable record. The id is the change
+    sequence clients sync from with ``/changes/?since=``.
+    """
+    INSERT = "insert"
+    UPDATE = "update"
+    DELETE = "delete"
+    ACTIONS = ((INSERT, "Insert"), (UPDATE, "Update"), (DELETE, "Delete"))
+
+    model = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=6, choices=ACTIONS)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("id",)
+        verbose_name = "Change Log Entry"
+        verbose_name_plural = "Change Log Entries"
+
+    def __str__(self) -> str:
+        return f"{self.id}: {self.action} {self.model} {self.object_id}"
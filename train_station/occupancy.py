@@ -0,0 +1,247 @@
+"""
+Occupancy analytics: trips, seats and tickets sold per departure day by
+route, train type and departure hour.
+
+The ticket tables are aggregated with one grouped query per dimension
+(and per live or archived table), preferably on a read replica, and the
+results are materialized into ``OccupancySummary``. Writes to trips and
+tickets record their departure days in ``OccupancyChange`` within the
+same transaction, so a refresh only recomputes those days. Reports only
+read the summary, combining days with NumPy, which is imported by the
+functions using it so that loading the URLconf does not load it.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractHour, TruncDate
+from django.utils import timezone
+
+from core.db_routers import choose_replica
+from train_station.models import (
+    ArchivedTicket,
+    ArchivedTrip,
+    OccupancyChange,
+    OccupancySummary,
+    Ticket,
+    Trip,
+)
+from train_station.query_plans import tickets_taken
+
+DIMENSION_KEYS = {
+    OccupancySummary.ROUTE: F("route_id"),
+    OccupancySummary.TRAIN_TYPE: F("train__train_type_id"),
+    OccupancySummary.HOUR: ExtractHour("departure_time"),
+}
+TRIP_TABLES = ((Trip, Ticket), (ArchivedTrip, ArchivedTicket))
+DELETE_BATCH_SIZE = 1000
+
+
+class RefreshResult:
+    def __init__(self):
+        self.days = 0
+        self.rows = 0
+
+
+def day_ranges(days):
+    """
+    ``departure_time`` filter for ``days``, with consecutive days merged
+    into one range so the index on departure time can be used.
+    """
+    condition = Q(pk__in=[])
+    days = sorted(days)
+    start = 0
+    for i, day in enumerate(days):
+        if i + 1 < len(days) and days[i + 1] == day + timedelta(days=1):
+            continue
+        condition |= Q(
+            departure_time__gte=timezone.make_aware(
+                datetime.combine(days[start], time.min)
+            ),
+            departure_time__lt=timezone.make_aware(
+                datetime.combine(day + timedelta(days=1), time.min)
+            ),
+        )
+        start = i + 1
+    return condition
+
+
+def aggregate_dimension(dimension, days, using):
+    """
+    ``(day ordinals, keys, [trips, seats, sold])`` arrays of one
+    dimension over live and archived trips, one row per (day, key).
+    """
+    import numpy as np
+
+    rows = []
+    for trip_model, ticket_model in TRIP_TABLES:
+        rows += (
+            trip_model.objects.using(using)
+            .filter(day_ranges(days))
+            .order_by()
+            .values(day=TruncDate("departure_time"), key=DIMENSION_KEYS[dimension])
+            .annotate(
+                trips=Count("id"),
+                seats=Sum(F("train__cargo_num") * F("train__places_in_cargo")),
+                sold=Sum(tickets_taken(ticket_model)),
+            )
+            .values_list("day", "key", "trips", "seats", "sold")
+        )
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty((0, 3), dtype=np.int64)
+
+    pairs = np.array([(day.toordinal(), key) for day, key, *_ in rows])
+    values = np.array([row[2:] for row in rows], dtype=np.int64)
+    # A day split between the live and archive tables has two rows.
+    unique, inverse = np.unique(pairs, axis=0, return_inverse=True)
+    totals = np.zeros((len(unique), 3), dtype=np.int64)
+    np.add.at(totals, inverse.ravel(), values)
+    return unique[:, 0], unique[:, 1], totals
+
+
+def load_factors(sold, seats):
+    import numpy as np
+
+    return np.divide(
+        sold, seats, out=np.zeros(len(seats), dtype=float), where=seats > 0
+    )
+
+
+def rebuild_days(days, using="default"):
+    """
+    Recompute the summary rows of ``days`` from trips read on ``using``.
+    Returns the number of rows written.
+    """
+    summaries = []
+    for dimension in DIMENSION_KEYS:
+        ordinals, keys, totals = aggregate_dimension(dimension, days, using)
+        factors = load_factors(totals[:, 2], totals[:, 1])
+        summaries += [
+            OccupancySummary(
+                dimension=dimension,
+                day=datetime.fromordinal(ordinal).date(),
+                key=key,
+                trips=trips,
+                seats=seats,
+                sold=sold,
+                load_factor=factor,
+            )
+            for ordinal, key, (trips, seats, sold), factor in zip(
+                ordinals.tolist(), keys.tolist(), totals.tolist(), factors.tolist()
+            )
+        ]
+
+    with transaction.atomic():
+        OccupancySummary.objects.filter(day__in=days).delete()
+        OccupancySummary.objects.bulk_create(summaries)
+    return len(summaries)
+
+
+def mark_days(days, using="default"):
+    """
+    Record ``days`` as changed in the current transaction of ``using``.
+    """
+    OccupancyChange.objects.using(using).bulk_create(
+        OccupancyChange(day=day) for day in set(days)
+    )
+
+
+def mark_changed(model, ids, using="default"):
+    """
+    Record the departure days of the ``Trip`` or ``Ticket`` rows ``ids``,
+    for writes that bypass the model signals.
+    """
+    field = "departure_time" if model is Trip else "trip__departure_time"
+    mark_days(
+        model.objects.using(using)
+        .filter(id__in=ids)
+        .order_by()
+        .values_list(TruncDate(field), flat=True)
+        .distinct(),
+        using,
+    )
+
+
+def all_days(using):
+    return {
+        day
+        for trip_model, _ in TRIP_TABLES
+        for day in trip_model.objects.using(using)
+        .order_by()
+        .values_list(TruncDate("departure_time"), flat=True)
+        .distinct()
+    }
+
+
+def refresh_occupancy(full=False, days=None, using=None):
+    """
+    Update the occupancy summary incrementally: only the days recorded
+    in ``OccupancyChange`` are recomputed. ``days`` adds days to
+    recompute (e.g. after train capacity changes), ``full`` recomputes
+    every day. Reads go to a healthy replica when one is configured.
+
+    The changes are read on the same database as the trips, so a change
+    whose transaction has not reached the replica yet is kept for the
+    next run; only the changes read are deleted afterwards.
+    """
+    using = using or choose_replica() or "default"
+    changes = dict(OccupancyChange.objects.using(using).values_list("id", "day"))
+
+    dirty = all_days(using) if full else set(changes.values())
+    dirty |= set(days or ())
+
+    result = RefreshResult()
+    result.days = len(dirty)
+    if dirty:
+        result.rows = rebuild_days(dirty, using)
+    ids = list(changes)
+    for start in range(0, len(ids), DELETE_BATCH_SIZE):
+        OccupancyChange.objects.filter(
+            id__in=ids[start:start + DELETE_BATCH_SIZE]
+        ).delete()
+    return result
+
+
+def occupancy_report(dimension, start, end):
+    """
+    Per-key totals of ``dimension`` between ``start`` and ``end``
+    (inclusive) from the summary, sorted by load factor: trips, seats,
+    sold, overall, mean daily and peak daily load factor.
+    """
+    import numpy as np
+
+    rows = np.array(
+        OccupancySummary.objects.filter(
+            dimension=dimension, day__range=(start, end)
+        ).values_list("key", "trips", "seats", "sold", "load_factor"),
+        dtype=float,
+    ).reshape(-1, 5)
+    keys, inverse = np.unique(rows[:, 0].astype(np.int64), return_inverse=True)
+    size = len(keys)
+    days = np.bincount(inverse, minlength=size)
+    trips, seats, sold = (
+        np.bincount(inverse, weights=rows[:, column], minlength=size)
+        for column in (1, 2, 3)
+    )
+    daily = rows[:, 4]
+    mean = np.bincount(inverse, weights=daily, minlength=size) / np.maximum(days, 1)
+    peak = np.zeros(size)
+    np.maximum.at(peak, inverse, daily)
+    overall = load_factors(sold, seats)
+
+    order = np.argsort(-overall, kind="stable")
+    return [
+        {
+            "key": int(keys[i]),
+            "days": int(days[i]),
+            "trips": int(trips[i]),
+            "seats": int(seats[i]),
+            "sold": int(sold[i]),
+            "load_factor": round(float(overall[i]), 4),
+            "mean_daily_load_factor": round(float(mean[i]), 4),
+            "peak_daily_load_factor": round(float(peak[i]), 4),
+        }
+        for i in order
+    ]
@@ -0,0 +1,137 @@
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+
+from train_station.models import Ticket
+
+
+class QueryPlan:
+    """
+    How rows are loaded for one serializer: ``select_related`` lookups,
+    the ``only()`` fields, annotations and ``prefetch`` plans of related
+    rows (``{lookup: QueryPlan}``), so that every column the serializer
+    reads, and only those, is fetched up front.
+    """
+
+    def __init__(self, select_related=(), only=(), annotate=None, prefetch=None):
+        self.select_related = select_related
+        self.only = only
+        self.annotate = annotate or {}
+        self.prefetch = prefetch or {}
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        if self.annotate:
+            queryset = queryset.annotate(**self.annotate)
+        for lookup, plan in self.prefetch.items():
+            related_model = queryset.model._meta.get_field(lookup).related_model
+            queryset = queryset.prefetch_related(
+                Prefetch(lookup, queryset=plan.apply(related_model.objects.all()))
+            )
+        return queryset
+
+
+def tickets_taken(ticket_model=Ticket):
+    """
+    Number of tickets sold for the trip, as a correlated subquery: unlike
+    ``Count("tickets")`` it needs no GROUP BY and is dropped from the
+    pagination ``count()``. Archived trips count ``ArchivedTicket`` rows.
+    """
+    tickets = (
+        ticket_model.objects.filter(trip=OuterRef("pk"))
+        .order_by()
+        .values("trip")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(tickets, output_field=IntegerField()), 0)
+
+
+# Crew members shown by ``full_name``.
+CREW_NAMES = QueryPlan(only=("first_name", "last_name"))
+
+# TripListSerializer
+TRIP_LIST = QueryPlan(
+    select_related=("route__source", "route__destination", "train"),
+    only=(
+        "departure_time",
+        "arrival_time",
+        "route__source__name",
+        "route__destination__name",
+        "train__name",
+        "train__cargo_num",
+        "train__places_in_cargo",
+        "train__train_type",
+    ),
+    annotate={"tickets_taken": tickets_taken()},
+    prefetch={"crew": CREW_NAMES},
+)
+
+# TripRetrieveSerializer: the sold seats are listed, so they are
+# prefetched and also give the number of tickets taken.
+TRIP_RETRIEVE = QueryPlan(
+    select_related=("route__source", "route__destination", "train"),
+    only=(*TRIP_LIST.only, "route__distance"),
+    prefetch={
+        "crew": CREW_NAMES,
+        "tickets": QueryPlan(only=("cargo", "seat", "trip")),
+    },
+)
+
+# TripSeatMapSerializer: the sold seats are read as tuples instead, see
+# train_station.seat_maps.
+TRIP_SEAT_MAP = QueryPlan(
+    select_related=TRIP_RETRIEVE.select_related,
+    only=TRIP_RETRIEVE.only,
+    prefetch={"crew": CREW_NAMES},
+)
+
+# TicketListSerializer, for live and archived tickets alike.
+TICKET_LIST = QueryPlan(
+    select_related=("trip__route__source", "trip__route__destination"),
+    only=(
+        "cargo",
+        "seat",
+        "price",
+        "order",
+        "trip__departure_time",
+        "trip__arrival_time",
+        "trip__route__distance",
+        "trip__route__source__name",
+        "trip__route__destination__name",
+    ),
+)
+
+# TicketDetailSerializer, for live and archived tickets alike.
+TICKET_DETAIL = QueryPlan(
+    select_related=(
+        "trip__route__source",
+        "trip__route__destination",
+        "trip__train",
+    ),
+    only=(
+        "cargo",
+        "seat",
+        "price",
+        "order",
+        "trip__departure_time",
+        "trip__arrival_time",
+        "trip__route__source__name",
+        "trip__route__destination__name",
+        "trip__train__name",
+    ),
+)
+
+# OrderListSerializer
+ORDER_LIST = QueryPlan(
+    only=("created_at", "total"),
+    prefetch={"tickets": TICKET_LIST, "archived_tickets": TICKET_LIST},
+)
+
+# OrderRetrieveSerializer
+ORDER_RETRIEVE = QueryPlan(
+    only=("created_at", "user", "total"),
+    prefetch={"tickets": TICKET_DETAIL, "archived_tickets": TICKET_DETAIL},
+)
@@ -0,0 +1,39 @@
+"""
+Station names reduced to a form that spelling variants share.
+
+``search_name("Київ") == search_name("Kyiv") == search_name("Kiev")``:
+Cyrillic is transliterated (Ukrainian national system, plus the Russian
+letters), accents and strokes are dropped, case is folded and anything
+but letters and digits becomes a single space. Then the usual differences between
+romanizations are folded away: ``y`` is ``i``, ``ie`` is ``i`` and
+doubled letters count once (``Odessa`` is ``Odesa``).
+"""
+
+import re
+import unicodedata
+
+CYRILLIC = {
+    "а": "a", "б": "b", "в": "v", "г": "h", "ґ": "g", "д": "d", "е": "e",
+    "є": "ie", "ж": "zh", "з": "z", "и": "y", "і": "i", "ї": "i", "й": "i",
+    "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r",
+    "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch",
+    "ш": "sh", "щ": "shch", "ь": "", "ю": "iu", "я": "ia", "ё": "e",
+    "ъ": "", "ы": "y", "э": "e", "'": "", "’": "", "ʼ": "",
+}
+# Latin letters that NFKD does not split into a letter and an accent.
+STROKED = {"ł": "l", "đ": "d", "ø": "o", "ħ": "h"}
+TRANSLITERATION = str.maketrans({**CYRILLIC, **STROKED})
+
+SEPARATORS = re.compile(r"[^a-z0-9]+")
+DOUBLED = re.compile(r"([a-z])\1+")
+
+
+def search_name(name):
+    name = name.casefold().translate(TRANSLITERATION)
+    name = "".join(
+        char for char in unicodedata.normalize("NFKD", name)
+        if not unicodedata.combining(char)
+    )
+    name = SEPARATORS.sub(" ", name).strip()
+    name = name.replace("y", "i").replace("ie", "i")
+    return DOUBLED.sub(r"\1", name)
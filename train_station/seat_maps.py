@@ -0,0 +1,67 @@
+"""
+Compact encodings of the seats sold on a trip.
+
+The trip detail lists every sold seat as ``{"cargo": x, "seat": y}``,
+tens of kilobytes for a full train. ``?seat_map=bitmap`` sends instead
+one bit per seat, cargo by cargo, and ``?seat_map=ranges`` the runs of
+consecutive sold seats of each cargo. Both are built from
+``(cargo, seat)`` tuples read with one query for all the trips
+serialized, without a ``Ticket`` instance per seat.
+"""
+
+import base64
+from itertools import groupby
+
+from train_station.models import Ticket
+
+LIST = "list"
+BITMAP = "bitmap"
+RANGES = "ranges"
+ENCODINGS = (LIST, BITMAP, RANGES)
+
+
+def attach_taken_seats(trips):
+    """
+    Set ``taken_seats``, the sorted ``(cargo, seat)`` pairs sold, and
+    ``tickets_taken`` on each of ``trips``.
+    """
+    seats = {trip.pk: [] for trip in trips}
+    for trip_id, cargo, seat in (
+        Ticket.objects.filter(trip_id__in=seats)
+        .order_by("trip_id", "cargo", "seat")
+        .values_list("trip_id", "cargo", "seat")
+    ):
+        seats[trip_id].append((cargo, seat))
+    for trip in trips:
+        trip.taken_seats = seats[trip.pk]
+        trip.tickets_taken = len(trip.taken_seats)
+
+
+def encode_bitmap(seats, cargo_num, places_in_cargo):
+    """
+    Base64 of a bit per seat, set when sold: seat ``s`` of cargo ``c`` is
+    bit ``(c - 1) * places_in_cargo + s - 1``, most significant bit
+    of each byte first.
+    """
+    bits = bytearray((cargo_num * places_in_cargo + 7) // 8)
+    for cargo, seat in seats:
+        if cargo <= cargo_num and seat <= places_in_cargo:
+            index = (cargo - 1) * places_in_cargo + seat - 1
+            bits[index >> 3] |= 0x80 >> (index & 7)
+    return base64.b64encode(bits).decode()
+
+
+def encode_ranges(seats):
+    """
+    ``{cargo: [[first seat, last seat], ...]}`` of the runs of sold
+    seats; ``seats`` must be sorted.
+    """
+    ranges = {}
+    for cargo, cargo_seats in groupby(seats, key=lambda pair: pair[0]):
+        runs = ranges[str(cargo)] = []
+        for _, seat in cargo_seats:
+            if runs and runs[-1][1] == seat - 1:
+                runs[-1][1] = seat
+            else:
+                runs.append([seat, seat])
+    return ranges
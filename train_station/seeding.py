@@ -0,0 +1,187 @@
+import hashlib
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import connections, transaction
+
+from train_station.change_feed import MODEL_NAMES, log_changes
+from train_station.models import (
+    ChangeLogEntry,
+    FixtureState,
+    Station,
+    Ticket,
+    Trip,
+)
+from train_station.occupancy import mark_changed
+from train_station.search_names import search_name
+from train_station.trip_search import trip_search_cache
+
+
+class SeedResult:
+    def __init__(self, name, content_hash):
+        self.name = name
+        self.content_hash = content_hash
+        self.skipped = False
+        self.counts = {}
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def group_by_model(content):
+    """
+    Deserialize a JSON fixture without saving and group the objects
+    by model, keeping the order in which models first appear.
+
+    Also return the field names each model sets in the fixture, so that
+    fields left to their defaults are neither compared nor overwritten.
+    """
+    records = json.loads(content)
+    present = defaultdict(set)
+    for record in records:
+        present[record["model"].lower()].update(record.get("fields", {}))
+
+    grouped = defaultdict(list)
+    for deserialized in serializers.deserialize(
+        "python", records, ignorenonexistent=True
+    ):
+        grouped[type(deserialized.object)].append(deserialized)
+    return grouped, present
+
+
+def fill_search_names(deserialized, field_names):
+    """
+    Set the ``search_name`` that ``Station.save()`` would derive from the
+    name, which bulk writes skip, and return the fields to write.
+    """
+    if "name" not in field_names:
+        return field_names
+    for item in deserialized:
+        item.object.search_name = search_name(item.object.name)
+    return {*field_names, "search_name"}
+
+
+def row_values(obj, fields):
+    return tuple(getattr(obj, field.attname) for field in fields)
+
+
+def seed_model(model, deserialized, field_names, using):
+    """
+    Upsert the fixture rows of one model that are missing or differ
+    from the database and return (created, updated, unchanged).
+    """
+    pk = model._meta.pk
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and field.name in field_names
+    ]
+    objects = {item.object.pk: item for item in deserialized}
+    existing = {
+        row[0]: row[1:]
+        for row in model.objects.using(using)
+        .filter(pk__in=objects)
+        .values_list(pk.attname, *(field.attname for field in fields))
+    }
+
+    changed = [
+        item for key, item in objects.items()
+        if existing.get(key) != row_values(item.object, fields)
+    ]
+    changed_pks = [item.object.pk for item in changed]
+    created = sum(1 for key in changed_pks if key not in existing)
+    if changed:
+        instances = [item.object for item in changed]
+        # bulk_create() stamps auto_now(_add) fields with the current
+        # time, keep the fixture values to write them back afterwards.
+        stamped = [
+            field for field in fields
+            if getattr(field, "auto_now", False)
+            or getattr(field, "auto_now_add", False)
+        ]
+        fixture_values = [row_values(obj, stamped) for obj in instances]
+        if fields:
+            model.objects.using(using).bulk_create(
+                instances,
+                update_conflicts=True,
+                unique_fields=[pk.name],
+                update_fields=[field.name for field in fields],
+            )
+        else:
+            model.objects.using(using).bulk_create(
+                instances, ignore_conflicts=True
+            )
+        if stamped:
+            for obj, values in zip(instances, fixture_values):
+                for field, value in zip(stamped, values):
+                    setattr(obj, field.attname, value)
+            model.objects.using(using).bulk_update(
+                instances, [field.name for field in stamped]
+            )
+        if model in MODEL_NAMES:
+            inserted = [pk for pk in changed_pks if pk not in existing]
+            updated = [pk for pk in changed_pks if pk in existing]
+            log_changes(model, inserted, ChangeLogEntry.INSERT, using)
+            log_changes(model, updated, ChangeLogEntry.UPDATE, using)
+            transaction.on_commit(trip_search_cache.clear, using)
+        if model in (Trip, Ticket):
+            mark_changed(model, changed_pks, using)
+
+    for item in deserialized:
+        for field_name, values in (item.m2m_data or {}).items():
+            manager = getattr(item.object, field_name)
+            if set(manager.values_list("pk", flat=True)) != set(values):
+                manager.set(values)
+
+    return created, len(changed) - created, len(objects) - len(changed)
+
+
+def seed_fixture(path, force=False, using="default"):
+    """
+    Apply a JSON fixture unless its content hash matches the last applied one.
+
+    Only rows that are missing or differ from the database are written,
+    with one bulk upsert per model instead of a ``save()`` per object.
+    """
+    content = Path(path).read_bytes()
+    result = SeedResult(Path(path).name, content_hash(content))
+
+    state = FixtureState.objects.using(using).filter(name=result.name).first()
+    if not force and state and state.content_hash == result.content_hash:
+        result.skipped = True
+        return result.finish()
+
+    with transaction.atomic(using=using):
+        grouped, present = group_by_model(content)
+        for model, deserialized in grouped.items():
+            field_names = present[model._meta.label_lower]
+            if model is Station:
+                field_names = fill_search_names(deserialized, field_names)
+            result.counts[model._meta.label] = seed_model(
+                model, deserialized, field_names, using
+            )
+
+        connection = connections[using]
+        sequence_sql = connection.ops.sequence_reset_sql(
+            no_style(), list(grouped)
+        )
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+
+        FixtureState.objects.using(using).update_or_create(
+            name=result.name,
+            defaults={"content_hash": result.content_hash},
+        )
+    return result.finish()
@@ -1,9 +1,22 @@
 from collections import defaultdict
+from datetime import timedelta
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
+from core.metrics import BOOKING_CONFLICTS
+
+from train_station.fares import fare_table, ticket_price
+from train_station.seat_maps import (
+    BITMAP,
+    attach_taken_seats,
+    encode_bitmap,
+    encode_ranges,
+)
+
 from train_station.models import (
     Station,
     Route,
@@ -11,6 +24,7 @@ from train_station.models import (
     Train,
     Order,
     Trip,
+    TripForecast,
     Ticket,
     Crew,
 )
@@ -57,6 +71,7 @@ class TrainSerializer(serializers.ModelSerializer):
             "cargo_num",
             "places_in_cargo",
             "train_type",
+            "first_class_cargos",
             "capacity",
         )
 
@@ -88,7 +103,8 @@ class CrewListSerializer(CrewSerializer):
 class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
-        fields = ("id", "cargo", "seat", "trip")
+        fields = ("id", "cargo", "seat", "trip", "price")
+        read_only_fields = ("price",)
 
 
 class TicketSeatsSerializer(TicketSerializer):
@@ -116,6 +132,7 @@ class TicketListSerializer(TicketSerializer):
         fields = (
             "cargo",
             "seat",
+            "price",
             "route",
             "departure_time",
             "arrival_time",
@@ -142,6 +159,7 @@ class TicketDetailSerializer(TicketListSerializer):
             "id",
             "cargo",
             "seat",
+            "price",
             "source",
             "departure_time",
             "destination",
@@ -150,6 +168,17 @@ class TicketDetailSerializer(TicketListSerializer):
         )
 
 
+def count_unique_errors(detail):
+    """
+    Number of "unique" errors in a nested ``ValidationError.detail``.
+    """
+    if isinstance(detail, dict):
+        return sum(count_unique_errors(value) for value in detail.values())
+    if isinstance(detail, list):
+        return sum(count_unique_errors(value) for value in detail)
+    return int(getattr(detail, "code", None) == "unique")
+
+
 class OrderSerializer(serializers.ModelSerializer):
     """
     Serializer for working with orders.
@@ -160,15 +189,31 @@ class OrderSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Order
-        fields = ("id", "created_at", "tickets")
+        fields = ("id", "created_at", "total", "tickets")
+        read_only_fields = ("total",)
+
+    def to_internal_value(self, data):
+        try:
+            return super().to_internal_value(data)
+        except serializers.ValidationError as e:
+            # Seats sold before this request fail the unique validator.
+            BOOKING_CONFLICTS.inc(count_unique_errors(e.detail))
+            raise
 
     def create(self, validated_data):
         """
-        Creating an order with tickets.
+        Creating an order with tickets priced from the fare table.
         """
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
-            order = Order.objects.create(**validated_data)
+            for ticket_data in tickets_data:
+                ticket_data["price"] = ticket_price(
+                    ticket_data["trip"], ticket_data["cargo"]
+                )
+            order = Order.objects.create(
+                total=sum(ticket_data["price"] for ticket_data in tickets_data),
+                **validated_data,
+            )
 
             errors = defaultdict(list)
             for idx, ticket_data in enumerate(tickets_data):
@@ -180,6 +225,7 @@ class OrderSerializer(serializers.ModelSerializer):
                     errors[f"tickets[{idx}]"].append(
                         "Ticket with this trip, cargo, and seat already exists."
                     )
+                    BOOKING_CONFLICTS.inc()
                 else:
                     Ticket.objects.create(order=order, **ticket_data)
 
@@ -191,18 +237,21 @@ class OrderSerializer(serializers.ModelSerializer):
 
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(
-        many=True, read_only=True
+        source="all_tickets", many=True, read_only=True
     )
 
 
 class OrderRetrieveSerializer(OrderSerializer):
+    """
+    Order with its live and archived tickets.
+    """
     tickets = TicketDetailSerializer(
-        many=True, read_only=True
+        source="all_tickets", many=True, read_only=True
     )
 
     class Meta:
         model = Order
-        fields = ("id", "user", "created_at", "tickets")
+        fields = ("id", "user", "created_at", "total", "tickets")
 
 
 class TripSerializer(serializers.ModelSerializer):
@@ -242,7 +291,7 @@ class TripSerializer(serializers.ModelSerializer):
 
 class TripListSerializer(TripSerializer):
     """
-    List of trips with available tickets.
+    List of trips with available tickets and fares by seat class.
     """
     route = serializers.SerializerMethodField()
     train = serializers.CharField(source="train.name", read_only=True)
@@ -250,6 +299,7 @@ class TripListSerializer(TripSerializer):
         many=True, read_only=True, slug_field="full_name"
     )
     tickets_available = serializers.SerializerMethodField(read_only=True)
+    fares = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Trip
@@ -258,6 +308,7 @@ class TripListSerializer(TripSerializer):
             "route",
             "train",
             "tickets_available",
+            "fares",
             "departure_time",
             "arrival_time",
             "crew",
@@ -274,12 +325,26 @@ class TripListSerializer(TripSerializer):
 
     def get_tickets_available(self, obj):
         """
-        Calculating available tickets for the trip.
+        Calculating available tickets for the trip, from the
+        ``tickets_taken`` annotation when the queryset has it.
         """
-        tickets_taken = obj.tickets.count()
+        tickets_taken = getattr(obj, "tickets_taken", None)
+        if tickets_taken is None:
+            tickets_taken = obj.tickets.count()
         capacity = obj.train.capacity
         return capacity - tickets_taken
 
+    def get_fares(self, obj):
+        """
+        Price by seat class, from the in-memory fare table.
+        """
+        return {
+            seat_class: str(price)
+            for seat_class, price in fare_table.fares(
+                obj.route_id, obj.train.train_type_id
+            ).items()
+        }
+
 
 class TripRetrieveSerializer(TripListSerializer):
     route = RouteListSerializer(
@@ -296,8 +361,141 @@ class TripRetrieveSerializer(TripListSerializer):
             "route",
             "train",
             "tickets_available",
+            "fares",
             "departure_time",
             "arrival_time",
             "crew",
             "taken_places"
         )
+
+
+class TripSeatMapListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        trips = list(data.all() if hasattr(data, "all") else data)
+        attach_taken_seats(trips)
+        return super().to_representation(trips)
+
+
+class TripSeatMapSerializer(TripRetrieveSerializer):
+    """
+    Trip detail with ``taken_places`` in the compact encoding named by
+    the ``seat_map`` context entry (see ``train_station.seat_maps``).
+    Expects trips loaded without their tickets.
+    """
+    taken_places = serializers.SerializerMethodField()
+
+    class Meta(TripRetrieveSerializer.Meta):
+        list_serializer_class = TripSeatMapListSerializer
+
+    def to_representation(self, instance):
+        if not hasattr(instance, "taken_seats"):
+            attach_taken_seats([instance])
+        return super().to_representation(instance)
+
+    def get_taken_places(self, obj):
+        if self.context["seat_map"] == BITMAP:
+            return {
+                "cargo_num": obj.train.cargo_num,
+                "places_in_cargo": obj.train.places_in_cargo,
+                "bitmap": encode_bitmap(
+                    obj.taken_seats,
+                    obj.train.cargo_num,
+                    obj.train.places_in_cargo,
+                ),
+            }
+        return encode_ranges(obj.taken_seats)
+
+
+class DateRangeSerializer(serializers.Serializer):
+    """
+    ``start`` and ``end`` query parameters of the analytics reports,
+    the last 30 days by default.
+    """
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        end = attrs.get("end") or timezone.localdate()
+        start = attrs.get("start") or end - timedelta(days=29)
+        if start > end:
+            raise serializers.ValidationError(
+                {"start": "Start must not be after end."}
+            )
+        return {"start": start, "end": end}
+
+
+class TripForecastSerializer(serializers.ModelSerializer):
+    """
+    Forecast final load of an upcoming trip.
+    """
+    source = serializers.CharField(
+        source="trip.route.source.name", read_only=True
+    )
+    destination = serializers.CharField(
+        source="trip.route.destination.name", read_only=True
+    )
+    train = serializers.CharField(source="trip.train.name", read_only=True)
+    departure_time = serializers.DateTimeField(
+        source="trip.departure_time", read_only=True
+    )
+
+    class Meta:
+        model = TripForecast
+        fields = (
+            "trip",
+            "source",
+            "destination",
+            "train",
+            "departure_time",
+            "capacity",
+            "booked",
+            "expected_tickets",
+            "expected_load_factor",
+            "sells_out",
+            "history_trips",
+            "computed_at",
+        )
+
+
+class ChangeFeedParamsSerializer(serializers.Serializer):
+    """
+    ``since`` (the last change sequence a client has) and ``limit``
+    query parameters of the change feed.
+    """
+    since = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(min_value=1, max_value=5000, default=500)
+
+
+class SlowQueryReportParamsSerializer(serializers.Serializer):
+    """
+    ``order`` and ``limit`` query parameters of the slow query report.
+    """
+    order = serializers.ChoiceField(
+        choices=("total", "max", "count"), default="total"
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(
+        choices=("GET", "POST", "PUT", "PATCH", "DELETE")
+    )
+    path = serializers.RegexField(r"^/", max_length=2000)
+    body = serializers.JSONField(required=False, allow_null=True)
+
+
+class BatchSerializer(serializers.Serializer):
+    """
+    Operations of a batch request; with ``atomic`` they all run in one
+    transaction.
+    """
+    operations = BatchOperationSerializer(many=True, allow_empty=False)
+    atomic = serializers.BooleanField(default=False)
+
+    def validate_operations(self, operations):
+        limit = settings.BATCH["MAX_OPERATIONS"]
+        if len(operations) > limit:
+            raise serializers.ValidationError(
+                f"At most {limit} operations per batch."
+            )
+        return operations
@@ -0,0 +1,215 @@
+from decimal import Decimal
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from train_station.availability import availability_hub
+from train_station.change_feed import FEEDS, log_changes
+from train_station.fares import fare_table
+from train_station.models import (
+    ChangeLogEntry,
+    Crew,
+    FareRule,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    Trip,
+)
+from train_station.occupancy import mark_changed, mark_days
+from train_station.trip_search import trip_search_cache
+
+
+@receiver(post_save, sender=Route)
+def reprice_route(sender, instance, using, **kwargs):
+    transaction.on_commit(
+        partial(fare_table.update_route, instance.pk, instance.distance), using
+    )
+
+
+@receiver(post_delete, sender=Route)
+def remove_route_fares(sender, instance, using, **kwargs):
+    transaction.on_commit(partial(fare_table.remove_route, instance.pk), using)
+
+
+@receiver(post_save, sender=FareRule)
+def reprice_fare_rule(sender, instance, using, **kwargs):
+    transaction.on_commit(
+        partial(
+            fare_table.update_rule,
+            instance.train_type_id,
+            instance.seat_class,
+            # Values assigned as strings or floats are only converted on load.
+            (Decimal(str(instance.base_fare)), Decimal(str(instance.per_km))),
+        ),
+        using,
+    )
+
+
+@receiver(post_delete, sender=FareRule)
+def remove_fare_rule(sender, instance, using, **kwargs):
+    transaction.on_commit(
+        partial(fare_table.update_rule, instance.train_type_id, instance.seat_class),
+        using,
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def publish_sold_seat(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(
+            partial(
+                availability_hub.publish,
+                instance.trip_id,
+                sold=[(instance.cargo, instance.seat)],
+            )
+        )
+
+
+@receiver(post_delete, sender=Ticket)
+def publish_released_seat(sender, instance, **kwargs):
+    transaction.on_commit(
+        partial(
+            availability_hub.publish,
+            instance.trip_id,
+            released=[(instance.cargo, instance.seat)],
+        )
+    )
+
+
+@receiver(post_save, sender=Ticket)
+def count_sold_seat(sender, instance, created, using, **kwargs):
+    if created:
+        transaction.on_commit(
+            partial(trip_search_cache.update_taken, instance.trip_id, 1), using
+        )
+
+
+@receiver(post_delete, sender=Ticket)
+def count_released_seat(sender, instance, using, **kwargs):
+    transaction.on_commit(
+        partial(trip_search_cache.update_taken, instance.trip_id, -1), using
+    )
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def mark_ticket_day(sender, instance, using, raw=False, **kwargs):
+    if not raw:
+        mark_changed(Trip, [instance.trip_id], using)
+
+
+def invalidate_trip_searches(route_ids, using):
+    """
+    Drop the cached searches listing trips on ``route_ids`` once the
+    change commits.
+    """
+    for source, destination in Route.objects.using(using).filter(
+        id__in=route_ids
+    ).values_list("source__name", "destination__name"):
+        transaction.on_commit(
+            partial(trip_search_cache.invalidate_route, source, destination),
+            using,
+        )
+
+
+@receiver(pre_save, sender=Trip)
+def remember_trip_route(sender, instance, raw, using, **kwargs):
+    if instance.pk is not None and not raw:
+        instance._saved_route_id, instance._saved_departure_time = (
+            Trip.objects.using(using)
+            .filter(pk=instance.pk)
+            .values_list("route_id", "departure_time")
+            .first()
+        ) or (None, None)
+
+
+@receiver(post_save, sender=Trip)
+def invalidate_saved_trip(sender, instance, raw, using, **kwargs):
+    route_ids = {instance.route_id, instance.__dict__.pop("_saved_route_id", None)}
+    invalidate_trip_searches(route_ids - {None}, using)
+    saved_departure = instance.__dict__.pop("_saved_departure_time", None)
+    if not raw:
+        # The saved value may be a string or naive, read it back.
+        mark_changed(Trip, [instance.pk], using)
+        if saved_departure is not None:
+            mark_days([timezone.localdate(saved_departure)], using)
+
+
+@receiver(pre_delete, sender=Trip)
+def mark_deleted_trip_day(sender, instance, using, **kwargs):
+    mark_changed(Trip, [instance.pk], using)
+
+
+@receiver(post_delete, sender=Trip)
+def invalidate_deleted_trip(sender, instance, using, **kwargs):
+    invalidate_trip_searches([instance.route_id], using)
+
+
+def clear_trip_searches(sender, using, **kwargs):
+    transaction.on_commit(trip_search_cache.clear, using)
+
+
+# Station and train names, capacities, crews and fares are part of
+# every search result.
+for model in (Station, Route, Train, Crew, FareRule):
+    post_save.connect(
+        clear_trip_searches, sender=model, dispatch_uid=f"clear_searches_{model}"
+    )
+    post_delete.connect(
+        clear_trip_searches, sender=model, dispatch_uid=f"clear_searches_{model}"
+    )
+
+
+def log_save(sender, instance, created, raw, using, **kwargs):
+    action = ChangeLogEntry.INSERT if created else ChangeLogEntry.UPDATE
+    log_changes(sender, [instance.pk], action, using)
+
+
+def log_delete(sender, instance, using, **kwargs):
+    log_changes(sender, [instance.pk], ChangeLogEntry.DELETE, using)
+
+
+for model, _ in FEEDS.values():
+    post_save.connect(log_save, sender=model, dispatch_uid=f"log_save_{model}")
+    post_delete.connect(
+        log_delete, sender=model, dispatch_uid=f"log_delete_{model}"
+    )
+
+
+@receiver(m2m_changed, sender=Trip.crew.through)
+def log_crew_change(sender, instance, action, reverse, pk_set, using, **kwargs):
+    """
+    Crew changes are updates of the trips, seen from either side, for
+    the change feed and the cached searches alike.
+    """
+    if reverse and action == "pre_clear":
+        instance._cleared_trip_ids = list(
+            instance.trips.using(using).values_list("id", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        trip_ids = [instance.pk] if pk_set or action == "post_clear" else []
+    elif action == "post_clear":
+        trip_ids = instance.__dict__.pop("_cleared_trip_ids", [])
+    else:
+        trip_ids = pk_set
+    log_changes(Trip, trip_ids, ChangeLogEntry.UPDATE, using)
+    if trip_ids:
+        invalidate_trip_searches(
+            Trip.objects.using(using)
+            .filter(id__in=trip_ids)
+            .values_list("route_id", flat=True),
+            using,
+        )
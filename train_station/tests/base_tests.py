@@ -1,6 +1,10 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 
+from train_station.models import ThrottleBucket
+
 
 class BaseAuthenticatedTest(APITestCase):
     def setUp(self):
@@ -16,3 +20,30 @@ class BaseAdminTest(APITestCase):
             email="admin@mail.tt", password="adminpassword"
         )
         self.client.force_authenticate(self.admin)
+
+
+class QueryBudgetMixin:
+    """
+    Assert the number of SQL queries an endpoint issues.
+
+    Throttle bucket updates and savepoints are not counted: they depend
+    on the bucket store and transaction nesting, not on the endpoint.
+    """
+
+    def assertQueryBudget(self, budget, url, method="get", data=None, **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            res = getattr(self.client, method)(url, data, **kwargs)
+        self.assertLess(res.status_code, 400, res.content)
+
+        queries = [
+            query["sql"] for query in context.captured_queries
+            if ThrottleBucket._meta.db_table not in query["sql"]
+            and not query["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))
+        ]
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            f"{method.upper()} {url} issued {len(queries)} queries, "
+            f"budget is {budget}:\n" + "\n".join(queries),
+        )
+        return res
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from train_station.archiving import archive_trips
+from train_station.models import (
+    ArchivedTicket,
+    ArchivedTrip,
+    Crew,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+    Trip,
+    TripForecast,
+)
+from train_station.tests.base_tests import BaseAuthenticatedTest
+
+
+class ArchiveTripsTest(BaseAuthenticatedTest):
+    def setUp(self):
+        super().setUp()
+        kyiv = Station.objects.create(name="Kyiv", latitude=50.4, longitude=30.5)
+        lviv = Station.objects.create(name="Lviv", latitude=49.8, longitude=24.0)
+        route = Route.objects.create(source=kyiv, destination=lviv, distance=540)
+        train = Train.objects.create(
+            name="IC",
+            cargo_num=2,
+            places_in_cargo=10,
+            train_type=TrainType.objects.create(name="Fast"),
+        )
+        crew = Crew.objects.create(first_name="Oleg", last_name="Vitov")
+        now = timezone.now()
+        self.old_trips = []
+        for days in (60, 40):
+            trip = Trip.objects.create(
+                route=route,
+                train=train,
+                departure_time=now - timedelta(days=days),
+                arrival_time=now - timedelta(days=days) + timedelta(hours=6),
+            )
+            trip.crew.add(crew)
+            self.old_trips.append(trip)
+        self.future_trip = Trip.objects.create(
+            route=route,
+            train=train,
+            departure_time=now + timedelta(days=1),
+            arrival_time=now + timedelta(days=1, hours=6),
+        )
+        self.order = Order.objects.create(user=self.user)
+        for trip in (*self.old_trips, self.future_trip):
+            Ticket.objects.create(trip=trip, cargo=1, seat=1, order=self.order)
+
+    def test_departed_trips_are_moved(self):
+        result = archive_trips(timezone.now() - timedelta(days=30), chunk_size=1)
+
+        self.assertEqual((result.trips, result.tickets, result.chunks), (2, 2, 2))
+        self.assertEqual(list(Trip.objects.all()), [self.future_trip])
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(
+            set(ArchivedTrip.objects.values_list("id", flat=True)),
+            {trip.id for trip in self.old_trips},
+        )
+        archived = ArchivedTrip.objects.get(id=self.old_trips[0].id)
+        self.assertEqual(archived.crew.count(), 1)
+        self.assertEqual(
+            ArchivedTicket.objects.filter(order=self.order).count(), 2
+        )
+
+    def test_forecasts_of_archived_trips_are_deleted(self):
+        for trip in (*self.old_trips, self.future_trip):
+            TripForecast.objects.create(
+                trip=trip,
+                booked=1,
+                capacity=20,
+                expected_tickets=10,
+                expected_load_factor=0.5,
+                sells_out=False,
+                history_trips=5,
+                computed_at=timezone.now(),
+            )
+
+        archive_trips(timezone.now() - timedelta(days=30))
+
+        self.assertEqual(
+            list(TripForecast.objects.values_list("trip_id", flat=True)),
+            [self.future_trip.id],
+        )
+
+    def test_order_history_reads_live_and_archived_tickets(self):
+        url = reverse("train_station:orders-detail", args=[self.order.id])
+        before = self.client.get(url).data["tickets"]
+
+        archive_trips(timezone.now() - timedelta(days=30))
+        after = self.client.get(url).data["tickets"]
+
+        self.assertEqual(
+            sorted(ticket["id"] for ticket in after),
+            sorted(ticket["id"] for ticket in before),
+        )
+        self.assertEqual(
+            len(self.client.get(reverse("train_station:orders-list"))
+                .data["results"][0]["tickets"]),
+            3,
+        )
+
+    def test_command_reports_counts(self):
+        stdout = StringIO()
+        call_command("archive_trips", days=50, stdout=stdout)
+        self.assertIn("Archived 1 trips and 1 tickets", stdout.getvalue())
@@ -0,0 +1,87 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from train_station.async_views import AsyncListAPIView
+from train_station.models import Order, Ticket, Trip
+from train_station.tests.base_tests import BaseAuthenticatedTest
+from train_station.tests.test_view import SampleTrips
+
+ASYNC_TRIP_URL = reverse("train_station:async-trips-list")
+ASYNC_STATION_URL = reverse("train_station:async-stations-list")
+ASYNC_ORDER_URL = reverse("train_station:async-orders-list")
+
+
+def async_trip_detail_url(trip_id):
+    return reverse("train_station:async-trips-detail", args=[trip_id])
+
+
+class AsyncViewConfigurationTest(SimpleTestCase):
+    def test_queryset_is_required(self):
+        class NoQuerysetView(AsyncListAPIView):
+            pass
+
+        with self.assertRaises(ImproperlyConfigured):
+            NoQuerysetView.as_view()
+
+
+class UnauthenticatedAsyncViewsTest(APITestCase):
+    def test_auth_required(self):
+        for url in (ASYNC_TRIP_URL, ASYNC_STATION_URL, ASYNC_ORDER_URL):
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AsyncViewsTest(BaseAuthenticatedTest, SampleTrips):
+    def setUp(self):
+        super().setUp()
+        SampleTrips.setUp(self)
+        self.trip = Trip.objects.first()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(trip=self.trip, cargo=1, seat=1, order=order)
+
+    def assertSameAsSync(self, async_url, sync_url, params=None):
+        async_res = self.client.get(async_url, params)
+        sync_res = self.client.get(sync_url, params)
+        self.assertEqual(async_res.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_res.json(), sync_res.json())
+
+    def test_trip_list_matches_sync(self):
+        self.assertSameAsSync(
+            ASYNC_TRIP_URL, reverse("train_station:trips-list")
+        )
+
+    def test_trip_list_filter_and_page_size(self):
+        self.assertSameAsSync(
+            ASYNC_TRIP_URL,
+            reverse("train_station:trips-list"),
+            {"departure_time": "2024-12-30", "page_size": 1},
+        )
+
+    def test_trip_detail_matches_sync(self):
+        self.assertSameAsSync(
+            async_trip_detail_url(self.trip.id),
+            reverse("train_station:trips-detail", args=[self.trip.id]),
+        )
+
+    def test_trip_detail_not_found(self):
+        res = self.client.get(async_trip_detail_url(0))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_station_list_matches_sync(self):
+        self.assertSameAsSync(
+            ASYNC_STATION_URL,
+            reverse("train_station:stations-list"),
+            {"name": "source"},
+        )
+
+    def test_order_list_matches_sync(self):
+        self.assertSameAsSync(
+            ASYNC_ORDER_URL, reverse("train_station:orders-list")
+        )
+
+    def test_invalid_page(self):
+        res = self.client.get(ASYNC_TRIP_URL, {"page": 5})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
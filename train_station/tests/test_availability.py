@@ -0,0 +1,162 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, override_settings
+from django.utils import timezone
+from rest_framework.reverse import reverse
+
+from train_station.availability import AvailabilityHub, availability_hub
+from train_station.models import (
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+    Trip,
+)
+from train_station.tests.base_tests import BaseAuthenticatedTest
+from user.serializers import TokenObtainPairWithClaimsSerializer
+
+
+def stream_url(trip_id):
+    return reverse("train_station:trips-availability-stream", args=[trip_id])
+
+
+def parse_event(text):
+    fields = dict(line.split(": ", 1) for line in text.strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+class AvailabilityTest(BaseAuthenticatedTest):
+    def setUp(self):
+        super().setUp()
+        kyiv = Station.objects.create(name="Kyiv", latitude=50.4, longitude=30.5)
+        lviv = Station.objects.create(name="Lviv", latitude=49.8, longitude=24.0)
+        train = Train.objects.create(
+            name="IC",
+            cargo_num=2,
+            places_in_cargo=5,
+            train_type=TrainType.objects.create(name="Fast"),
+        )
+        departure = timezone.make_aware(datetime(2030, 1, 1, 8))
+        self.trip = Trip.objects.create(
+            route=Route.objects.create(source=kyiv, destination=lviv, distance=540),
+            train=train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=5),
+        )
+        self.order = Order.objects.create(user=self.user)
+        Ticket.objects.create(trip=self.trip, order=self.order, cargo=1, seat=1)
+        self.hub = AvailabilityHub()
+
+    async def next_event(self, queue):
+        return parse_event(await asyncio.wait_for(queue.get(), 1))
+
+    async def test_snapshot_is_shared_by_subscribers(self):
+        first = await self.hub.subscribe(self.trip.id)
+
+        with mock.patch("train_station.availability.load_trip") as load_trip:
+            second = await self.hub.subscribe(self.trip.id)
+        load_trip.assert_not_called()
+
+        for queue in (first, second):
+            self.assertEqual(
+                await self.next_event(queue),
+                ("snapshot", {"tickets_available": 9, "taken": [[1, 1]]}),
+            )
+
+    async def test_missing_trip(self):
+        self.assertIsNone(await self.hub.subscribe(0))
+
+    async def test_sales_in_this_worker_are_pushed(self):
+        queue = await availability_hub.subscribe(self.trip.id)
+        await self.next_event(queue)
+
+        def sell():
+            with self.captureOnCommitCallbacks(execute=True):
+                Ticket.objects.create(
+                    trip=self.trip, order=self.order, cargo=2, seat=3
+                )
+
+        await sync_to_async(sell)()
+
+        self.assertEqual(
+            await self.next_event(queue),
+            ("delta", {"tickets_available": 8, "sold": [[2, 3]], "released": []}),
+        )
+        availability_hub.unsubscribe(self.trip.id, queue)
+
+    async def test_poll_finds_changes_of_other_workers(self):
+        queue = await self.hub.subscribe(self.trip.id)
+        await self.next_event(queue)
+
+        def change_elsewhere():
+            # Raw queries send no signals, like another worker's sales.
+            Ticket.objects.bulk_create(
+                [Ticket(trip=self.trip, order=self.order, cargo=2, seat=5)]
+            )
+            Ticket.objects.filter(cargo=1, seat=1)._raw_delete("default")
+
+        await sync_to_async(change_elsewhere)()
+        await self.hub.poll_once()
+
+        self.assertEqual(
+            await self.next_event(queue),
+            (
+                "delta",
+                {"tickets_available": 9, "sold": [[2, 5]], "released": [[1, 1]]},
+            ),
+        )
+        with mock.patch("train_station.availability.taken_seats") as taken_seats:
+            await self.hub.poll_once()
+        taken_seats.assert_not_called()
+        self.assertTrue(queue.empty())
+
+    @override_settings(
+        AVAILABILITY_STREAM={"POLL_INTERVAL": 1, "KEEPALIVE": 15, "QUEUE_SIZE": 2}
+    )
+    async def test_slow_client_gets_a_new_snapshot(self):
+        queue = await self.hub.subscribe(self.trip.id)
+
+        self.hub.apply(self.trip.id, {(1, 2)}, set())
+        self.hub.apply(self.trip.id, {(1, 3)}, set())
+
+        self.assertEqual(queue.qsize(), 1)
+        event, data = await self.next_event(queue)
+        self.assertEqual((event, data["tickets_available"]), ("snapshot", 7))
+
+    async def test_last_unsubscribe_forgets_the_trip(self):
+        queue = await self.hub.subscribe(self.trip.id)
+
+        self.hub.unsubscribe(self.trip.id, queue)
+
+        self.assertEqual(self.hub.watched(), [])
+
+    async def test_stream_endpoint(self):
+        token = TokenObtainPairWithClaimsSerializer.get_token(self.user)
+        headers = {"Authorization": f"Bearer {token.access_token}"}
+        client = AsyncClient()
+
+        response = await client.get(stream_url(self.trip.id), headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = response.streaming_content
+        event, data = parse_event((await anext(content)).decode())
+        self.assertEqual((event, data["tickets_available"]), ("snapshot", 9))
+        # As the ASGI handler does when the client disconnects.
+        await sync_to_async(response.close)()
+        await asyncio.sleep(0)
+        self.assertNotIn(self.trip.id, availability_hub.watched())
+
+        response = await client.get(stream_url(0), headers=headers)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_stream_requires_authentication(self):
+        response = await AsyncClient().get(stream_url(self.trip.id))
+
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,213 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from train_station import batch
+from train_station.models import Order, Route, Station, Train, TrainType, Trip
+from train_station.tests.base_tests import BaseAuthenticatedTest
+from train_station.throttling import UserBucketThrottle
+
+BATCH_URL = reverse("train_station:batch")
+
+
+def create_trip():
+    kyiv = Station.objects.create(name="Kyiv", latitude=50.4, longitude=30.5)
+    lviv = Station.objects.create(name="Lviv", latitude=49.8, longitude=24.0)
+    route = Route.objects.create(source=kyiv, destination=lviv, distance=540)
+    train = Train.objects.create(
+        name="IC",
+        cargo_num=2,
+        places_in_cargo=5,
+        train_type=TrainType.objects.create(name="Fast"),
+    )
+    departure = timezone.make_aware(datetime(2030, 1, 1, 8))
+    return Trip.objects.create(
+        route=route,
+        train=train,
+        departure_time=departure,
+        arrival_time=departure + timedelta(hours=5),
+    )
+
+
+class BatchTest(BaseAuthenticatedTest):
+    def setUp(self):
+        super().setUp()
+        self.trip = create_trip()
+
+    def batch(self, *operations, atomic=False):
+        res = self.client.post(
+            BATCH_URL,
+            {
+                "operations": [
+                    {"method": method, "path": path, "body": body}
+                    for method, path, body in operations
+                ],
+                "atomic": atomic,
+            },
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.content)
+        return res.data["results"]
+
+    def test_reads_and_writes(self):
+        trip_url = reverse("train_station:trips-detail", args=[self.trip.id])
+        order_url = reverse("train_station:orders-list")
+
+        results = self.batch(
+            ("GET", trip_url, None),
+            ("GET", f"{reverse('train_station:routes-list')}?source=Kyiv", None),
+            (
+                "POST",
+                order_url,
+                {"tickets": [{"trip": self.trip.id, "cargo": 1, "seat": 2}]},
+            ),
+            ("GET", order_url, None),
+        )
+
+        self.assertEqual([result["status"] for result in results], [200, 200, 201, 200])
+        self.assertEqual(results[0]["body"]["id"], self.trip.id)
+        self.assertEqual(len(results[1]["body"]), 1)
+        order = Order.objects.get()
+        self.assertEqual(order.user, self.user)
+        self.assertEqual(results[2]["body"]["id"], order.id)
+        # Reads listed after a write see it.
+        self.assertEqual(results[3]["body"]["count"], 1)
+
+    def test_operation_errors_are_results(self):
+        results = self.batch(
+            ("GET", "/train-station/nowhere/", None),
+            ("GET", reverse("train_station:trips-detail", args=[0]), None),
+            ("POST", reverse("train_station:stations-list"), {"name": "Odesa"}),
+            ("POST", BATCH_URL, {"operations": []}),
+            ("GET", reverse("train_station:async-trips-list"), None),
+        )
+
+        self.assertEqual(
+            [result["status"] for result in results], [404, 404, 403, 400, 400]
+        )
+        self.assertFalse(Station.objects.filter(name="Odesa").exists())
+
+    def test_invalid_batch(self):
+        res = self.client.post(
+            BATCH_URL,
+            {"operations": [{"method": "TRACE", "path": "stations/"}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("method", res.data["operations"][0])
+        self.assertIn("path", res.data["operations"][0])
+
+    @override_settings(BATCH={"MAX_OPERATIONS": 2, "MAX_WORKERS": 2})
+    def test_operation_limit(self):
+        res = self.client.post(
+            BATCH_URL,
+            {"operations": [{"method": "GET", "path": "/train-station/trips/"}] * 3},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_charges_one_token_per_operation(self):
+        trips = ("GET", reverse("train_station:trips-list"), None)
+        with mock.patch.dict(UserBucketThrottle.THROTTLE_RATES, {"user": "3/min"}):
+            self.assertEqual(len(self.batch(trips, trips)), 2)
+
+            res = self.client.post(
+                BATCH_URL,
+                {"operations": [{"method": "GET", "path": trips[1]}] * 2},
+                format="json",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class AtomicBatchTest(APITestCase):
+    def setUp(self):
+        admin = get_user_model().objects.create_superuser(
+            email="admin@mail.tt", password="adminpassword"
+        )
+        self.client.force_authenticate(admin)
+
+    def test_failure_rolls_back_the_batch(self):
+        stations_url = reverse("train_station:stations-list")
+        operations = [
+            {
+                "method": "POST",
+                "path": stations_url,
+                "body": {"name": "Odesa", "latitude": 46.5, "longitude": 30.7},
+            },
+            {"method": "POST", "path": stations_url, "body": {"name": "Lviv"}},
+            {"method": "GET", "path": stations_url},
+        ]
+
+        res = self.client.post(
+            BATCH_URL, {"operations": operations, "atomic": True}, format="json"
+        )
+
+        self.assertEqual(
+            [result["status"] for result in res.data["results"]], [201, 400, 424]
+        )
+        self.assertFalse(Station.objects.exists())
+
+    def test_success_commits(self):
+        operations = [
+            {
+                "method": "POST",
+                "path": reverse("train_station:stations-list"),
+                "body": {"name": name, "latitude": 46.5, "longitude": 30.7},
+            }
+            for name in ("Odesa", "Lviv")
+        ]
+
+        res = self.client.post(
+            BATCH_URL, {"operations": operations, "atomic": True}, format="json"
+        )
+
+        self.assertEqual(
+            [result["status"] for result in res.data["results"]], [201, 201]
+        )
+        self.assertEqual(Station.objects.count(), 2)
+
+
+class ConcurrentReadsTest(TransactionTestCase):
+    def test_reads_run_in_the_pool(self):
+        trip = create_trip()
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@mail.tt", password="testpassword"
+            )
+        )
+        paths = [
+            reverse("train_station:trips-detail", args=[trip.id]),
+            reverse("train_station:routes-list"),
+            reverse("train_station:trains-list"),
+        ]
+
+        with mock.patch.object(batch, "run_read", wraps=batch.run_read) as run_read:
+            res = client.post(
+                BATCH_URL,
+                {"operations": [{"method": "GET", "path": path} for path in paths]},
+                format="json",
+            )
+
+        self.assertEqual(run_read.call_count, 3)
+        results = res.data["results"]
+        self.assertEqual([result["status"] for result in results], [200] * 3)
+        self.assertEqual(results[0]["body"]["id"], trip.id)
+        self.assertEqual(results[1]["body"][0]["id"], trip.route_id)
+        self.assertEqual(results[2]["body"][0]["id"], trip.train_id)
+
+
+class UnauthenticatedBatchTest(APITestCase):
+    def test_auth_required(self):
+        res = self.client.post(BATCH_URL, {"operations": []}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,216 @@
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from train_station.archiving import archive_chunk
+from train_station.bulk_import import NetworkImporter
+from train_station.change_feed import LOCK_SQL, changes_since, log_changes
+from train_station.models import (
+    ChangeLogEntry,
+    Crew,
+    Route,
+    Station,
+    Train,
+    TrainType,
+    Trip,
+)
+from train_station.tests.base_tests import BaseAuthenticatedTest
+
+CHANGES_URL = reverse("train_station:changes")
+
+
+class ChangeFeedTest(BaseAuthenticatedTest):
+    def setUp(self):
+        super().setUp()
+        self.kyiv = Station.objects.create(name="Kyiv", latitude=50.4, longitude=30.5)
+        self.lviv = Station.objects.create(name="Lviv", latitude=49.8, longitude=24.0)
+        self.route = Route.objects.create(
+            source=self.kyiv, destination=self.lviv, distance=540
+        )
+        self.train = Train.objects.create(
+            name="IC",
+            cargo_num=2,
+            places_in_cargo=5,
+            train_type=TrainType.objects.create(name="Fast"),
+        )
+        departure = timezone.make_aware(datetime(2030, 1, 1, 8))
+        self.trip = Trip.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=5),
+        )
+        self.last_seq = ChangeLogEntry.objects.latest("id").id
+
+    def changes(self, since=0, **params):
+        res = self.client.get(CHANGES_URL, {"since": since, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def actions(self, since):
+        return [
+            (change["model"], change["id"], change["action"])
+            for change in self.changes(since)["results"]
+        ]
+
+    def test_inserts_in_order(self):
+        data = self.changes()
+
+        self.assertEqual(
+            [(change["model"], change["action"]) for change in data["results"]],
+            [
+                ("station", "insert"),
+                ("station", "insert"),
+                ("route", "insert"),
+                ("train", "insert"),
+                ("trip", "insert"),
+            ],
+        )
+        self.assertEqual(data["next"], self.last_seq)
+        self.assertFalse(data["has_more"])
+        self.assertEqual(
+            data["results"][2]["data"],
+            {
+                "id": self.route.id,
+                "source": self.kyiv.id,
+                "destination": self.lviv.id,
+                "distance": 540,
+            },
+        )
+
+    def test_updates_since_sequence(self):
+        self.route.distance = 550
+        self.route.save()
+        crew = Crew.objects.create(first_name="Ivan", last_name="Franko")
+        self.trip.crew.add(crew)
+
+        data = self.changes(self.last_seq)
+
+        self.assertEqual(
+            [
+                (change["model"], change["id"], change["action"])
+                for change in data["results"]
+            ],
+            [("route", self.route.id, "update"), ("trip", self.trip.id, "update")],
+        )
+        self.assertEqual(data["results"][0]["data"]["distance"], 550)
+        self.assertEqual(data["results"][1]["data"]["crew"], [crew.id])
+
+    def test_cascaded_deletes(self):
+        station_id = self.kyiv.id
+        self.kyiv.delete()
+
+        self.assertEqual(
+            sorted(self.actions(self.last_seq)),
+            [
+                ("route", self.route.id, "delete"),
+                ("station", station_id, "delete"),
+                ("trip", self.trip.id, "delete"),
+            ],
+        )
+        self.assertIsNone(self.changes(self.last_seq)["results"][0]["data"])
+
+    def test_limit_pages_through_changes(self):
+        first = self.changes(limit=2)
+
+        self.assertTrue(first["has_more"])
+        self.assertEqual(len(first["results"]), 2)
+        rest = self.changes(first["next"], limit=10)
+        self.assertEqual(len(rest["results"]), 3)
+        self.assertFalse(rest["has_more"])
+
+    def test_entry_commits_with_the_change(self):
+        with mock.patch("train_station.signals.log_changes", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                Station.objects.create(name="Odesa", latitude=46.5, longitude=30.7)
+
+        self.assertFalse(Station.objects.filter(name="Odesa").exists())
+
+    def test_archived_trips_are_deleted(self):
+        archive_chunk([self.trip.id])
+
+        self.assertEqual(
+            self.actions(self.last_seq), [("trip", self.trip.id, "delete")]
+        )
+
+    def test_bulk_import_is_logged(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "stations.csv"
+            path.write_text("name,latitude,longitude\nOdesa,46.5,30.7\n")
+            NetworkImporter(use_copy=False).import_stations(str(path))
+
+        odesa = Station.objects.get(name="Odesa")
+        self.assertEqual(self.actions(self.last_seq), [("station", odesa.id, "insert")])
+
+    def test_invalid_since(self):
+        res = self.client.get(CHANGES_URL, {"since": -1})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ChangeLogLockTest(TransactionTestCase):
+    def test_postgres_writers_lock_before_logging(self):
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            if sql != "BEGIN":
+                statements.append(sql)
+            if sql != LOCK_SQL:
+                return execute(sql, params, many, context)
+
+        with mock.patch.object(connection, "vendor", "postgresql"):
+            with connection.execute_wrapper(record):
+                log_changes(Station, [1, 2], ChangeLogEntry.INSERT)
+
+        self.assertEqual(statements[0], LOCK_SQL)
+        self.assertIn("INSERT", statements[1])
+        self.assertEqual(ChangeLogEntry.objects.count(), 2)
+
+    @skipUnless(connection.vendor == "postgresql", "needs concurrent writers")
+    def test_out_of_order_commits_are_not_skipped(self):
+        logged, release = threading.Event(), threading.Event()
+
+        def write(pk, hold=False):
+            try:
+                with transaction.atomic():
+                    log_changes(Station, [pk], ChangeLogEntry.INSERT)
+                    if hold:
+                        logged.set()
+                        release.wait(5)
+            finally:
+                connection.close()
+
+        first = threading.Thread(target=write, args=(1, True))
+        first.start()
+        logged.wait(5)
+        second = threading.Thread(target=write, args=(2,))
+        second.start()
+        time.sleep(0.2)
+
+        # The second writer waits for the first one to commit, so no
+        # sequence after the first one's can be read before it.
+        changes, _ = changes_since(0, 10)
+        self.assertEqual(changes, [])
+
+        release.set()
+        first.join()
+        second.join()
+        changes, _ = changes_since(0, 10)
+        self.assertEqual([change["id"] for change in changes], [1, 2])
+
+
+class UnauthenticatedChangeFeedTest(APITestCase):
+    def test_auth_required(self):
+        res = self.client.get(CHANGES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
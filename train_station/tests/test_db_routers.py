@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.reverse import reverse
+
+from core import db_routers
+from core.db_routers import PrimaryReplicaRouter, set_read_database
+from train_station.models import Trip
+from train_station.tests.base_tests import BaseAuthenticatedTest
+from train_station.tests.test_view import SampleTrips
+
+
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    def tearDown(self):
+        set_read_database(None)
+
+    def test_reads_follow_selected_database(self):
+        router = PrimaryReplicaRouter()
+        self.assertIsNone(router.db_for_read(Trip))
+
+        set_read_database("replica")
+        self.assertEqual(router.db_for_read(Trip), "replica")
+        self.assertEqual(router.db_for_write(Trip), "default")
+
+    def test_pins_are_shared_by_workers(self):
+        self.assertNotIsInstance(caches[settings.REPLICA_PIN_CACHE], LocMemCache)
+
+    @override_settings(REPLICA_DATABASES=["replica"], REPLICA_MAX_LAG=5)
+    def test_lagging_replica_is_skipped(self):
+        db_routers._replica_lag.clear()
+        with mock.patch.object(db_routers, "measure_lag", return_value=30):
+            self.assertIsNone(db_routers.choose_replica())
+
+        db_routers._replica_lag.clear()
+        with mock.patch.object(db_routers, "measure_lag", return_value=1):
+            self.assertEqual(db_routers.choose_replica(), "replica")
+
+
+@override_settings(REPLICA_DATABASES=["default"])
+class ReplicaReadViewTest(BaseAuthenticatedTest, SampleTrips):
+    """
+    "default" stands in for the replica: the router returns the alias
+    when a request is routed and ``None`` when it stays on the primary.
+    """
+
+    def setUp(self):
+        super().setUp()
+        SampleTrips.setUp(self)
+        caches[settings.REPLICA_PIN_CACHE].clear()
+        self.addCleanup(caches[settings.REPLICA_PIN_CACHE].clear)
+        self.routed = []
+        db_for_read = PrimaryReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            alias = db_for_read(router, model, **hints)
+            self.routed.append(alias)
+            return alias
+
+        patcher = mock.patch.object(PrimaryReplicaRouter, "db_for_read", spy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_safe_requests_read_from_replica(self):
+        self.client.get(reverse("train_station:trips-list"))
+        self.assertIn("default", self.routed)
+
+    def test_reads_stay_on_primary_after_write(self):
+        orders_url = reverse("train_station:orders-list")
+        self.client.post(
+            orders_url,
+            {"tickets": [{"trip": Trip.objects.first().id, "cargo": 1, "seat": 1}]},
+            format="json",
+        )
+        self.routed.clear()
+
+        res = self.client.get(orders_url)
+
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertNotIn("default", self.routed)
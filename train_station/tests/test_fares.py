@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import DatabaseError, transaction
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from train_station.archiving import archive_chunk
+from train_station.fares import fare_table, ticket_price
+from train_station.models import (
+    ArchivedTicket,
+    FareRule,
+    Order,
+    Route,
+    Station,
+    Train,
+    TrainType,
+    Trip,
+)
+from train_station.tests.base_tests import BaseAuthenticatedTest
+
+TRIP_URL = reverse("train_station:trips-list")
+ORDER_URL = reverse("train_station:orders-list")
+
+
+class FareTest(BaseAuthenticatedTest):
+    """
+    A 500 km route: first class 10 + 0.2 / km, second class 5 + 0.1 / km.
+    """
+
+    def setUp(self):
+        super().setUp()
+        fare_table.clear()
+        kyiv = Station.objects.create(name="Kyiv", latitude=50.4, longitude=30.5)
+        lviv = Station.objects.create(name="Lviv", latitude=49.8, longitude=24.0)
+        self.route = Route.objects.create(source=kyiv, destination=lviv, distance=500)
+        self.train_type = TrainType.objects.create(name="Intercity")
+        self.train = Train.objects.create(
+            name="IC",
+            cargo_num=2,
+            places_in_cargo=10,
+            first_class_cargos=1,
+            train_type=self.train_type,
+        )
+        departure = timezone.make_aware(datetime(2030, 1, 1, 8))
+        self.trip = Trip.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=5),
+        )
+        self.first = FareRule.objects.create(
+            train_type=self.train_type,
+            seat_class=FareRule.FIRST,
+            base_fare=Decimal("10"),
+            per_km=Decimal("0.2"),
+        )
+        self.second = FareRule.objects.create(
+            train_type=self.train_type,
+            seat_class=FareRule.SECOND,
+            base_fare=Decimal("5"),
+            per_km=Decimal("0.1"),
+        )
+
+    def fares(self):
+        return fare_table.fares(self.route.id, self.train_type.id)
+
+    def test_trip_list_shows_fares(self):
+        res = self.client.get(TRIP_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"][0]["fares"], {"first": "110.00", "second": "55.00"}
+        )
+
+    def test_order_prices_tickets(self):
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"trip": self.trip.id, "cargo": 1, "seat": 1},
+                    {"trip": self.trip.id, "cargo": 2, "seat": 1},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["total"], "165.00")
+        self.assertEqual(
+            [ticket["price"] for ticket in res.data["tickets"]],
+            ["110.00", "55.00"],
+        )
+        self.assertEqual(Order.objects.get().total, Decimal("165.00"))
+
+        archive_chunk([self.trip.id])
+        self.assertEqual(
+            sorted(ArchivedTicket.objects.values_list("price", flat=True)),
+            [Decimal("55.00"), Decimal("110.00")],
+        )
+
+    def test_pricing_adds_no_queries(self):
+        fare_table.load()
+        trip = Trip.objects.select_related("train").get()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(ticket_price(trip, 2), Decimal("55.00"))
+
+    def test_route_change_reprices_its_row(self):
+        fare_table.load()
+
+        self.route.distance = 1000
+        with self.captureOnCommitCallbacks(execute=True):
+            self.route.save()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.fares(),
+                {
+                    FareRule.FIRST: Decimal("210.00"),
+                    FareRule.SECOND: Decimal("105.00"),
+                },
+            )
+
+    def test_rule_change_reprices_its_column(self):
+        fare_table.load()
+
+        self.first.base_fare = "20.50"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.save()
+            self.second.delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.fares(), {FareRule.FIRST: Decimal("120.50")})
+            self.assertEqual(
+                fare_table.price(self.route.id, self.train_type.id, FareRule.SECOND),
+                Decimal(0),
+            )
+
+    def test_deleted_route_is_dropped(self):
+        fare_table.load()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.route.delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.fares(), {})
+
+    def test_rolled_back_changes_keep_prices(self):
+        fare_table.load()
+
+        with self.assertRaises(DatabaseError):
+            with transaction.atomic():
+                self.route.distance = 1000
+                self.route.save()
+                self.first.delete()
+                raise DatabaseError
+
+        self.assertEqual(
+            self.fares(),
+            {FareRule.FIRST: Decimal("110.00"), FareRule.SECOND: Decimal("55.00")},
+        )
+
+    @override_settings(FARE_TABLE={"TIMEOUT": 0})
+    def test_table_is_rebuilt_after_timeout(self):
+        fare_table.load()
+        # Bulk updates bypass the signals.
+        Route.objects.filter(id=self.route.id).update(distance=100)
+
+        self.assertEqual(self.fares()[FareRule.SECOND], Decimal("15.00"))
@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from train_station.archiving import archive_chunk
+from train_station.forecasting import booking_curves, refresh_forecasts
+from train_station.models import (
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+    Trip,
+    TripForecast,
+)
+from train_station.tests.base_tests import BaseAdminTest
+
+FORECAST_URL = reverse("train_station:trip-forecast")
+NOW = timezone.make_aware(datetime(2030, 6, 1, 12))
+
+
+class ForecastingTest(BaseAdminTest):
+    """
+    Five departed Kyiv - Lviv trips sold 4 of 10 seats ten days before
+    departure and 4 more the day before, so 5 days before departure 40%
+    of the seats are still to be sold.
+    """
+
+    def setUp(self):
+        super().setUp()
+        kyiv = Station.objects.create(name="Kyiv", latitude=50.4, longitude=30.5)
+        lviv = Station.objects.create(name="Lviv", latitude=49.8, longitude=24.0)
+        odesa = Station.objects.create(name="Odesa", latitude=46.5, longitude=30.7)
+        self.route = Route.objects.create(source=kyiv, destination=lviv, distance=540)
+        self.new_route = Route.objects.create(
+            source=kyiv, destination=odesa, distance=475
+        )
+        self.train = Train.objects.create(
+            name="IC",
+            cargo_num=2,
+            places_in_cargo=5,
+            train_type=TrainType.objects.create(name="Fast"),
+        )
+        self.departed = [
+            self.create_trip(self.route, NOW - timedelta(days=days), {10: 4, 1: 4})
+            for days in range(1, 6)
+        ]
+
+    def create_trip(self, route, departure, sales):
+        """
+        ``sales`` maps days before departure to tickets sold that day.
+        """
+        trip = Trip.objects.create(
+            route=route,
+            train=self.train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=5),
+        )
+        seat = 0
+        for days, tickets in sales.items():
+            order = Order.objects.create(user=self.admin)
+            Order.objects.filter(pk=order.pk).update(
+                created_at=departure - timedelta(days=days)
+            )
+            for _ in range(tickets):
+                Ticket.objects.create(
+                    trip=trip, order=order, cargo=1 + seat // 5, seat=1 + seat % 5
+                )
+                seat += 1
+        return trip
+
+    def test_booking_curves(self):
+        archive_chunk([self.departed[0].id])
+
+        curves = booking_curves(NOW - timedelta(days=30), NOW, horizon=12)
+
+        self.assertEqual(curves.booked.shape, (5, 13))
+        self.assertEqual(
+            curves.booked[0].tolist(), [8, 8] + [4] * 9 + [0, 0]
+        )
+        self.assertEqual(curves.capacities.tolist(), [10] * 5)
+
+    def test_forecast_adds_route_pickup(self):
+        upcoming = self.create_trip(
+            self.route, NOW + timedelta(days=5), {6: 4}
+        )
+
+        result = refresh_forecasts(now=NOW)
+
+        self.assertEqual((result.history_trips, result.trips), (5, 1))
+        forecast = TripForecast.objects.get(trip=upcoming)
+        self.assertEqual((forecast.booked, forecast.capacity), (4, 10))
+        self.assertAlmostEqual(forecast.expected_load_factor, 0.8)
+        self.assertAlmostEqual(forecast.expected_tickets, 8)
+        self.assertFalse(forecast.sells_out)
+        self.assertEqual(forecast.history_trips, 5)
+
+    def test_forecast_is_capped_at_capacity(self):
+        upcoming = self.create_trip(
+            self.route, NOW + timedelta(days=5), {6: 7}
+        )
+
+        self.assertEqual(refresh_forecasts(now=NOW).sell_outs, 1)
+
+        forecast = TripForecast.objects.get(trip=upcoming)
+        self.assertEqual(forecast.expected_load_factor, 1.0)
+        self.assertTrue(forecast.sells_out)
+
+    def test_route_without_history_uses_all_routes(self):
+        self.create_trip(self.new_route, NOW - timedelta(days=2), {1: 10})
+        upcoming = self.create_trip(self.new_route, NOW + timedelta(days=20), {})
+
+        refresh_forecasts(now=NOW)
+
+        forecast = TripForecast.objects.get(trip=upcoming)
+        self.assertEqual(forecast.history_trips, 6)
+        # 20 days out: 4 of 5 Lviv trips' seats and all of the Odesa trip's.
+        self.assertAlmostEqual(
+            forecast.expected_load_factor, (5 * 0.8 + 1) / 6, places=4
+        )
+
+    def test_departed_forecasts_are_replaced(self):
+        self.create_trip(self.route, NOW + timedelta(days=1), {})
+        refresh_forecasts(now=NOW)
+
+        refresh_forecasts(now=NOW + timedelta(days=2))
+
+        self.assertFalse(TripForecast.objects.exists())
+
+    def test_command(self):
+        out = StringIO()
+
+        call_command("forecast_demand", stdout=out)
+
+        # The test trips all depart after today.
+        self.assertIn("Forecast 5 upcoming trips", out.getvalue())
+        self.assertEqual(TripForecast.objects.count(), 5)
+
+    def test_command_rejects_non_positive_options(self):
+        for option in ("--horizon", "--history-days", "--min-route-history"):
+            with self.assertRaisesMessage(CommandError, "must be at least 1"):
+                call_command("forecast_demand", option, "0", stdout=StringIO())
+
+        self.assertFalse(TripForecast.objects.exists())
+
+    def test_forecast_endpoint(self):
+        likely = self.create_trip(self.route, NOW + timedelta(days=5), {6: 4})
+        full = self.create_trip(self.route, NOW + timedelta(days=6), {7: 8})
+        refresh_forecasts(now=NOW)
+
+        res = self.client.get(FORECAST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["trip"] for row in res.data["results"]], [full.id, likely.id]
+        )
+        self.assertEqual(res.data["results"][0]["destination"], "Lviv")
+
+        res = self.client.get(FORECAST_URL, {"sells_out": "true"})
+        self.assertEqual([row["trip"] for row in res.data["results"]], [full.id])
+
+    def test_forecast_endpoint_is_for_staff(self):
+        self.admin.is_staff = False
+        self.admin.save()
+
+        res = self.client.get(FORECAST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,84 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F
+from django.test import TestCase
+
+from train_station.load_data import generate_load_data
+from train_station.models import Order, Route, Station, Ticket, Train, Trip
+
+
+class GenerateLoadDataTest(TestCase):
+    def test_network_sizes(self):
+        result = generate_load_data(
+            stations=5,
+            routes=8,
+            trains=3,
+            days=2,
+            load_factor=0.25,
+            users=4,
+            start=date(2030, 1, 1),
+        )
+
+        self.assertEqual(Station.objects.count(), 5)
+        self.assertEqual(Route.objects.count(), 8)
+        self.assertEqual(Train.objects.count(), 3)
+        self.assertEqual(result.counts["trips"], Trip.objects.count())
+        self.assertFalse(Route.objects.filter(source=F("destination")).exists())
+
+        for trip in Trip.objects.select_related("train").annotate(
+            sold=Count("tickets")
+        ):
+            self.assertEqual(trip.sold, round(trip.train.capacity * 0.25))
+            self.assertEqual(trip.departure_time.year, 2030)
+
+        self.assertEqual(result.counts["tickets"], Ticket.objects.count())
+        sizes = Order.objects.annotate(size=Count("tickets")).values_list(
+            "size", flat=True
+        )
+        self.assertTrue(all(1 <= size <= 4 for size in sizes))
+
+    def test_trains_do_not_overlap(self):
+        generate_load_data(stations=4, routes=6, trains=2, days=3, load_factor=0)
+
+        for train in Train.objects.all():
+            trips = list(train.trips.order_by("departure_time"))
+            for previous, trip in zip(trips, trips[1:]):
+                self.assertGreater(trip.departure_time, previous.arrival_time)
+
+    def test_same_seed_same_network(self):
+        def snapshot():
+            return list(
+                Trip.objects.order_by("id").values_list(
+                    "route__distance", "train__name", "departure_time"
+                )
+            )
+
+        generate_load_data(stations=4, routes=5, trains=2, days=2, seed=7)
+        first = snapshot()
+        Trip.objects.all().delete()
+        Train.objects.all().delete()
+
+        generate_load_data(stations=4, routes=5, trains=2, days=2, seed=7)
+        self.assertEqual(snapshot(), first)
+
+    def test_command(self):
+        out = StringIO()
+        call_command(
+            "generate_load_data",
+            "--stations=3",
+            "--routes=3",
+            "--trains=1",
+            "--days=1",
+            "--users=2",
+            stdout=out,
+        )
+
+        self.assertIn("3 stations, 3 routes, 1 trains", out.getvalue())
+
+    def test_command_rejects_trains_without_routes(self):
+        with self.assertRaisesMessage(CommandError, "At least one route"):
+            call_command("generate_load_data", "--routes=0", "--trains=2")
+        with self.assertRaisesMessage(CommandError, "cannot be negative"):
+            call_command("generate_load_data", "--routes=-1")
@@ -0,0 +1,112 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from train_station.models import Station, Route, Train, TrainType, Trip
+
+
+def write_csv(directory, name, content):
+    path = Path(directory) / name
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+class ImportNetworkCommandTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        Station.objects.create(name="Kyiv", latitude=50.4, longitude=30.5)
+
+    def call(self, **files):
+        options = {
+            name: write_csv(self.tmp_dir.name, f"{name}.csv", content)
+            for name, content in files.items()
+        }
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            "import_network",
+            batch_size=2,
+            stdout=stdout,
+            stderr=stderr,
+            **options,
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_full_network(self):
+        stdout, stderr = self.call(
+            stations=(
+                "name,latitude,longitude\n"
+                "Lviv,49.8,24.0\n"
+                "Odesa,46.5,30.7\n"
+                "Kyiv,50.4,30.5\n"
+            ),
+            routes=(
+                "source,destination,distance\n"
+                "Kyiv,Lviv,540\n"
+                "Kyiv,Odesa,475\n"
+            ),
+            trains=(
+                "name,cargo_num,places_in_cargo,train_type\n"
+                "Intercity,5,80,High-Speed\n"
+            ),
+            trips=(
+                "source,destination,train,departure_time,arrival_time\n"
+                "Kyiv,Lviv,Intercity,2025-01-01T08:00:00,2025-01-01T14:00:00\n"
+                "Kyiv,Odesa,Intercity,2025-01-02T08:00:00,2025-01-02T14:00:00\n"
+            ),
+        )
+
+        self.assertEqual(stderr, "")
+        self.assertEqual(Station.objects.count(), 3)
+        self.assertEqual(Station.objects.get(name="Odesa").search_name, "odesa")
+        self.assertEqual(Route.objects.count(), 2)
+        self.assertEqual(TrainType.objects.get().name, "High-Speed")
+        self.assertEqual(Train.objects.get().capacity, 400)
+        self.assertEqual(Trip.objects.count(), 2)
+        self.assertIn("Stations: 2 created, 1 skipped, 0 errors", stdout)
+        self.assertIn("rows/s", stdout)
+
+    def test_invalid_rows_are_reported_without_aborting(self):
+        stdout, stderr = self.call(
+            stations=(
+                "name,latitude,longitude\n"
+                "Lviv,49.8,24.0\n"
+                "Nowhere,120,24.0\n"
+                "Odesa,46.5,30.7\n"
+            ),
+            routes=(
+                "source,destination,distance\n"
+                "Kyiv,Lviv,540\n"
+                "Kyiv,Atlantis,100\n"
+                "Lviv,Lviv,0\n"
+            ),
+        )
+
+        self.assertEqual(
+            set(Station.objects.values_list("name", flat=True)),
+            {"Kyiv", "Lviv", "Odesa"},
+        )
+        self.assertEqual(Route.objects.count(), 1)
+        self.assertIn("stations.csv:3: latitude: Latitude must be in range", stderr)
+        self.assertIn("routes.csv:3: Station 'Atlantis' does not exist.", stderr)
+        self.assertIn("routes.csv:4: Source and destination cannot be the same.", stderr)
+        self.assertIn("Routes: 1 created, 0 skipped, 2 errors", stdout)
+
+    def test_taken_train_departure_is_skipped(self):
+        self.call(
+            stations="name,latitude,longitude\nLviv,49.8,24.0\n",
+            routes="source,destination,distance\nKyiv,Lviv,540\n",
+            trains="name,cargo_num,places_in_cargo,train_type\nIC,5,80,Fast\n",
+        )
+        trips = (
+            "source,destination,train,departure_time,arrival_time\n"
+            "Kyiv,Lviv,IC,2025-01-01T08:00:00,2025-01-01T14:00:00\n"
+        )
+        self.call(trips=trips)
+        stdout, _ = self.call(trips=trips)
+
+        self.assertEqual(Trip.objects.count(), 1)
+        self.assertIn("Trips: 0 created, 1 skipped", stdout)
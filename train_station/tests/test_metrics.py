@@ -0,0 +1,116 @@
+from unittest import mock
+
+from django.test import override_settings
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from train_station.models import Trip
+from train_station.tests.base_tests import BaseAuthenticatedTest
+from train_station.tests.test_view import SampleTrips
+from train_station.throttling import ScopedBucketThrottle
+from user.authentication import CachedJWTAuthentication, user_cache
+
+TRIP_URL = reverse("train_station:trips-list")
+ORDER_URL = reverse("train_station:orders-list")
+METRICS_URL = reverse("metrics")
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTest(BaseAuthenticatedTest, SampleTrips):
+    def setUp(self):
+        super().setUp()
+        SampleTrips.setUp(self)
+
+    def test_request_latency_and_queries_by_endpoint(self):
+        labels = {"method": "GET", "endpoint": "TripViewSet.list", "status": "200"}
+        requests = sample("http_request_duration_seconds_count", **labels)
+        queries = sample("db_queries_total", endpoint="TripViewSet.list")
+
+        self.client.get(TRIP_URL)
+
+        self.assertEqual(
+            sample("http_request_duration_seconds_count", **labels), requests + 1
+        )
+        self.assertGreater(
+            sample("db_queries_total", endpoint="TripViewSet.list"), queries
+        )
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(b'endpoint="TripViewSet.list"', res.content)
+        self.assertIn(b"http_requests_in_progress", res.content)
+
+    def test_booking_conflicts(self):
+        trip = Trip.objects.first()
+        ticket = {"trip": trip.id, "cargo": 1, "seat": 1}
+        self.client.post(ORDER_URL, {"tickets": [ticket]}, format="json")
+        conflicts = sample("booking_conflicts_total")
+
+        res = self.client.post(ORDER_URL, {"tickets": [ticket]}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(sample("booking_conflicts_total"), conflicts + 1)
+
+    def test_booking_conflicts_within_order(self):
+        trip = Trip.objects.first()
+        ticket = {"trip": trip.id, "cargo": 1, "seat": 1}
+        conflicts = sample("booking_conflicts_total")
+
+        self.client.post(ORDER_URL, {"tickets": [ticket, ticket]}, format="json")
+
+        self.assertEqual(sample("booking_conflicts_total"), conflicts + 1)
+
+    def test_throttle_rejections(self):
+        rejections = sample("throttle_rejections_total", scope="trips")
+        with mock.patch.dict(
+            ScopedBucketThrottle.THROTTLE_RATES, {"trips": "1/min"}
+        ):
+            self.client.get(TRIP_URL)
+            res = self.client.get(TRIP_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(
+            sample("throttle_rejections_total", scope="trips"), rejections + 1
+        )
+
+    def test_auth_user_cache_hits(self):
+        user_cache.clear()
+        token = AccessToken.for_user(self.user)
+        hits = sample("cache_requests_total", cache="auth_user", result="hit")
+        misses = sample("cache_requests_total", cache="auth_user", result="miss")
+
+        CachedJWTAuthentication().get_user(token)
+        CachedJWTAuthentication().get_user(token)
+
+        self.assertEqual(
+            sample("cache_requests_total", cache="auth_user", result="miss"),
+            misses + 1,
+        )
+        self.assertEqual(
+            sample("cache_requests_total", cache="auth_user", result="hit"),
+            hits + 1,
+        )
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_metrics_token(self):
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code, status.HTTP_403_FORBIDDEN
+        )
+        res = self.client.get(
+            METRICS_URL, HTTP_AUTHORIZATION="Bearer scrape-secret"
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN=None, METRICS_REQUIRE_TOKEN=True)
+    def test_required_token_is_missing(self):
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code, status.HTTP_404_NOT_FOUND
+        )
+
+        with self.settings(DEBUG=True):
+            res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
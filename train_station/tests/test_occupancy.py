@@ -0,0 +1,204 @@
+import subprocess
+import sys
+from datetime import date, datetime, timedelta
+from unittest import mock
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from train_station.archiving import archive_chunk
+from train_station.models import (
+    OccupancyChange,
+    OccupancySummary,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+    Trip,
+)
+from train_station.occupancy import rebuild_days, refresh_occupancy
+from train_station.tests.base_tests import BaseAdminTest
+
+ROUTES_URL = reverse("train_station:occupancy-routes")
+TRAIN_TYPES_URL = reverse("train_station:occupancy-train-types")
+HOURS_URL = reverse("train_station:occupancy-hours")
+DAY = date(2030, 5, 1)
+NEXT_DAY = date(2030, 5, 2)
+
+
+class OccupancyTest(BaseAdminTest):
+    def setUp(self):
+        super().setUp()
+        kyiv = Station.objects.create(name="Kyiv", latitude=50.4, longitude=30.5)
+        lviv = Station.objects.create(name="Lviv", latitude=49.8, longitude=24.0)
+        self.route = Route.objects.create(source=kyiv, destination=lviv, distance=540)
+        self.fast = TrainType.objects.create(name="Fast")
+        self.train = Train.objects.create(
+            name="IC", cargo_num=2, places_in_cargo=5, train_type=self.fast
+        )
+        self.order = Order.objects.create(user=self.admin)
+        self.morning = self.create_trip(DAY, 8, sold=5)
+        self.evening = self.create_trip(DAY, 18, sold=2)
+        self.next_day = self.create_trip(NEXT_DAY, 8, sold=10)
+
+    def create_trip(self, day, hour, sold):
+        departure = timezone.make_aware(datetime(day.year, day.month, day.day, hour))
+        trip = Trip.objects.create(
+            route=self.route,
+            train=self.train,
+            departure_time=departure,
+            arrival_time=departure.replace(hour=hour + 5),
+        )
+        Ticket.objects.bulk_create(
+            Ticket(trip=trip, order=self.order, cargo=1 + i // 5, seat=1 + i % 5)
+            for i in range(sold)
+        )
+        return trip
+
+    def summary(self, dimension, day, key):
+        return OccupancySummary.objects.get(dimension=dimension, day=day, key=key)
+
+    def test_summary_per_dimension(self):
+        result = refresh_occupancy()
+
+        self.assertEqual(result.days, 2)
+        self.assertEqual(result.rows, 2 + 2 + 3)
+        route_day = self.summary(OccupancySummary.ROUTE, DAY, self.route.id)
+        self.assertEqual((route_day.trips, route_day.seats, route_day.sold), (2, 20, 7))
+        self.assertAlmostEqual(route_day.load_factor, 0.35)
+        self.assertEqual(
+            self.summary(OccupancySummary.TRAIN_TYPE, NEXT_DAY, self.fast.id).sold,
+            10,
+        )
+        self.assertEqual(self.summary(OccupancySummary.HOUR, DAY, 18).sold, 2)
+
+    def test_only_days_with_new_tickets_are_recomputed(self):
+        refresh_occupancy()
+        self.assertEqual(refresh_occupancy().days, 0)
+
+        Ticket.objects.create(trip=self.evening, order=self.order, cargo=2, seat=5)
+        result = refresh_occupancy()
+
+        self.assertEqual(result.days, 1)
+        self.assertEqual(self.summary(OccupancySummary.HOUR, DAY, 18).sold, 3)
+        self.assertEqual(
+            self.summary(OccupancySummary.ROUTE, NEXT_DAY, self.route.id).sold, 10
+        )
+
+    def test_cancellations_are_recomputed(self):
+        refresh_occupancy()
+
+        self.next_day.tickets.first().delete()
+        result = refresh_occupancy()
+
+        self.assertEqual(result.days, 1)
+        self.assertEqual(
+            self.summary(OccupancySummary.ROUTE, NEXT_DAY, self.route.id).sold, 9
+        )
+
+    def test_rescheduled_trip_recomputes_both_days(self):
+        refresh_occupancy()
+
+        self.evening.departure_time += timedelta(days=1)
+        self.evening.arrival_time += timedelta(days=1)
+        self.evening.save()
+        result = refresh_occupancy()
+
+        self.assertEqual(result.days, 2)
+        self.assertEqual(self.summary(OccupancySummary.HOUR, NEXT_DAY, 18).sold, 2)
+        self.assertFalse(
+            OccupancySummary.objects.filter(
+                dimension=OccupancySummary.HOUR, day=DAY, key=18
+            ).exists()
+        )
+
+    def test_changes_committed_during_refresh_are_kept(self):
+        refresh_occupancy()
+        Ticket.objects.create(trip=self.evening, order=self.order, cargo=2, seat=5)
+
+        def cancel_during_rebuild(days, using):
+            # Committed after the changes were read, e.g. not yet on the
+            # replica.
+            self.next_day.tickets.first().delete()
+            return rebuild_days(days, using)
+
+        with mock.patch(
+            "train_station.occupancy.rebuild_days", side_effect=cancel_during_rebuild
+        ):
+            self.assertEqual(refresh_occupancy().days, 1)
+
+        self.assertEqual(
+            list(OccupancyChange.objects.values_list("day", flat=True)), [NEXT_DAY]
+        )
+        self.assertEqual(refresh_occupancy().days, 1)
+
+    def test_archived_trips_are_counted(self):
+        archive_chunk([self.morning.id])
+
+        refresh_occupancy(full=True)
+
+        self.assertEqual(
+            self.summary(OccupancySummary.ROUTE, DAY, self.route.id).sold, 7
+        )
+
+    def test_command(self):
+        out = StringIO()
+        refresh_occupancy()
+        call_command("refresh_occupancy", "--day", "2030-05-01", stdout=out)
+
+        self.assertIn("Recomputed 1 days", out.getvalue())
+
+    def test_reports(self):
+        refresh_occupancy()
+        dates = {"start": "2030-05-01", "end": "2030-05-02"}
+
+        res = self.client.get(ROUTES_URL, dates)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        [route] = res.data["results"]
+        self.assertEqual(route["label"], "Kyiv - Lviv")
+        self.assertEqual((route["days"], route["trips"], route["sold"]), (2, 3, 17))
+        self.assertAlmostEqual(route["load_factor"], 17 / 30, places=4)
+        self.assertEqual(route["peak_daily_load_factor"], 1.0)
+        self.assertAlmostEqual(route["mean_daily_load_factor"], (0.35 + 1) / 2)
+
+        res = self.client.get(TRAIN_TYPES_URL, dates)
+        self.assertEqual(res.data["results"][0]["label"], "Fast")
+
+        res = self.client.get(HOURS_URL, dates)
+        self.assertEqual(
+            [(hour["label"], hour["sold"]) for hour in res.data["results"]],
+            [("08:00", 15), ("18:00", 2)],
+        )
+
+    def test_reports_are_for_staff(self):
+        self.admin.is_staff = False
+        self.admin.save()
+
+        res = self.client.get(ROUTES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_invalid_range(self):
+        res = self.client.get(ROUTES_URL, {"start": "2030-05-02", "end": "2030-05-01"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class OccupancyImportTest(SimpleTestCase):
+    def test_urls_do_not_load_numpy(self):
+        code = (
+            "import sys, django; django.setup(); import core.urls; "
+            "print('numpy' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        self.assertEqual(result.stdout.strip(), "False")
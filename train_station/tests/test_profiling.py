@@ -0,0 +1,110 @@
+import json
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from train_station.models import Trip
+from train_station.tests.test_view import SampleTrips
+
+
+class ProfilingTest(APITestCase, SampleTrips):
+    def setUp(self):
+        SampleTrips.setUp(self)
+        profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(profile_dir.cleanup)
+        settings_override = override_settings(PROFILE_DIR=profile_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@mail.tt", password="adminpassword"
+        )
+        self.user = get_user_model().objects.create_user(
+            email="test@mail.tt", password="testpassword"
+        )
+        self.url = reverse(
+            "train_station:trips-detail", args=[Trip.objects.first().id]
+        )
+
+    def authenticate(self, user):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+
+    @override_settings(DEBUG=True)
+    def test_asgi_handler_is_not_adapted(self):
+        with self.assertNoLogs("django.request", "DEBUG"):
+            ASGIHandler()
+
+    async def test_async_view_profile(self):
+        url = reverse(
+            "train_station:async-trips-detail",
+            args=[(await Trip.objects.afirst()).id],
+        )
+        token = AccessToken.for_user(self.admin)
+        res = await AsyncClient().get(
+            url, {"profile": "download"}, headers={"authorization": f"Bearer {token}"}
+        )
+
+        report = json.loads(res.content)
+        self.assertTrue(report["async"])
+        self.assertGreater(report["query_count"], 0)
+
+    def test_staff_profile_is_stored(self):
+        self.authenticate(self.admin)
+        res = self.client.get(self.url, {"profile": 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("taken_places", res.json())
+        report_id = res["X-Profile-Report"]
+
+        report = self.client.get(
+            reverse("profile-report", args=[report_id])
+        ).json()
+        self.assertEqual(report["status"], 200)
+        self.assertEqual(
+            set(report["split_ms"]), {"view", "serializer", "render", "db"}
+        )
+        self.assertEqual(report["query_count"], len(report["queries"]))
+        self.assertTrue(
+            any("train_station" in query["origin"] for query in report["queries"])
+        )
+        self.assertTrue(report["functions"])
+
+        res = self.client.get(
+            reverse("profile-report", args=[report_id]), {"download": "prof"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("attachment", res["Content-Disposition"])
+
+    def test_profile_header_and_download(self):
+        self.authenticate(self.admin)
+        res = self.client.get(
+            self.url, {"profile": "download"}, HTTP_X_PROFILE="1"
+        )
+
+        self.assertIn("attachment", res["Content-Disposition"])
+        self.assertEqual(json.loads(res.content)["path"], f"{self.url}?profile=download")
+
+        res = self.client.get(self.url, HTTP_X_PROFILE="1")
+        self.assertIn("X-Profile-Report", res)
+
+    def test_not_profiled(self):
+        self.authenticate(self.admin)
+        self.assertNotIn("X-Profile-Report", self.client.get(self.url))
+
+        self.authenticate(self.user)
+        res = self.client.get(self.url, {"profile": 1})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Profile-Report", res)
+
+        report = reverse("profile-report", args=["00000000-0000-0000-0000-000000000000"])
+        self.assertEqual(
+            self.client.get(report).status_code, status.HTTP_403_FORBIDDEN
+        )
@@ -0,0 +1,164 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APITestCase
+
+from train_station.archiving import archive_chunk
+from train_station.fares import fare_table
+from train_station.models import (
+    Crew,
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+    Trip,
+)
+from train_station.tests.base_tests import QueryBudgetMixin
+
+
+class QueryBudgetTest(QueryBudgetMixin, APITestCase):
+    """
+    Every train_station endpoint issues a fixed number of queries, however
+    many rows it returns. Each budget is checked on a small network and
+    again after it has grown, with the per-process fare table built.
+    """
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@mail.tt", password="adminpassword"
+        )
+        self.client.force_authenticate(self.admin)
+        self.batch = 0
+        self.grow()
+        fare_table.load()
+
+    def grow(self, size=2):
+        """
+        Add ``size`` stations, routes, trains, crew members, trips with
+        tickets and orders, with one archived trip among them.
+        """
+        self.batch += 1
+        train_type = TrainType.objects.create(name=f"Type {self.batch}")
+        stations = [
+            Station.objects.create(
+                name=f"Station {self.batch}-{i}", latitude=i, longitude=i
+            )
+            for i in range(size + 1)
+        ]
+        routes = [
+            Route.objects.create(
+                source=stations[i], destination=stations[i + 1], distance=100
+            )
+            for i in range(size)
+        ]
+        trains = [
+            Train.objects.create(
+                name=f"Train {self.batch}-{i}",
+                cargo_num=2,
+                places_in_cargo=10,
+                train_type=train_type,
+            )
+            for i in range(size)
+        ]
+        crew = Crew.objects.bulk_create(
+            Crew(first_name="Crew", last_name=f"{self.batch}-{i}")
+            for i in range(size)
+        )
+
+        departure = timezone.make_aware(datetime(2030, 1, self.batch))
+        trips = []
+        for i in range(size + 1):
+            trip = Trip.objects.create(
+                route=routes[i % size],
+                train=trains[i % size],
+                departure_time=departure + timedelta(days=i * 2),
+                arrival_time=departure + timedelta(days=i * 2, hours=5),
+            )
+            trip.crew.set(crew)
+            trips.append(trip)
+
+        orders = [Order.objects.create(user=self.admin) for _ in range(size)]
+        Ticket.objects.bulk_create(
+            Ticket(trip=trip, order=order, cargo=1, seat=seat)
+            for trip in trips
+            for seat, order in enumerate(orders, start=1)
+        )
+        archive_chunk([trips[-1].id])
+        self.order = orders[0]
+        self.trip = trips[0]
+        self.route = routes[0]
+        self.train = trains[0]
+
+    def assertBudgetHolds(self, budget, url_name, detail=None, **params):
+        for size in (None, 10):
+            if size:
+                self.grow(size)
+            args = [getattr(self, detail).id] if detail else []
+            self.assertQueryBudget(
+                budget,
+                reverse(f"train_station:{url_name}", args=args),
+                data=params,
+            )
+
+    def test_crew_list(self):
+        self.assertBudgetHolds(1, "crews-list")
+
+    def test_station_list(self):
+        self.assertBudgetHolds(1, "stations-list", name="Station")
+
+    def test_route_list(self):
+        self.assertBudgetHolds(1, "routes-list", source="Station")
+
+    def test_route_detail(self):
+        self.assertBudgetHolds(1, "routes-detail", detail="route")
+
+    def test_train_list(self):
+        self.assertBudgetHolds(1, "trains-list")
+
+    def test_train_detail(self):
+        self.assertBudgetHolds(1, "trains-detail", detail="train")
+
+    def test_train_type_list(self):
+        self.assertBudgetHolds(1, "train-types-list")
+
+    def test_trip_list(self):
+        self.assertBudgetHolds(3, "trips-list", page_size=10)
+
+    def test_trip_list_filtered(self):
+        self.assertBudgetHolds(
+            3, "trips-list", departure_time="2030-01-01", page_size=10
+        )
+
+    def test_trip_detail(self):
+        self.assertBudgetHolds(3, "trips-detail", detail="trip")
+
+    def test_trip_detail_seat_map(self):
+        self.assertBudgetHolds(
+            3, "trips-detail", detail="trip", seat_map="bitmap"
+        )
+
+    def test_bulk_retrieve(self):
+        for budget, model, url_name in (
+            (1, Route, "routes-list"),
+            (1, Train, "trains-list"),
+            (3, Trip, "trips-list"),
+        ):
+            for size in (None, 10):
+                if size:
+                    self.grow(size)
+                ids = ",".join(
+                    str(pk) for pk in model.objects.values_list("id", flat=True)
+                )
+                self.assertQueryBudget(
+                    budget, reverse(f"train_station:{url_name}"), data={"ids": ids}
+                )
+
+    def test_order_list(self):
+        self.assertBudgetHolds(4, "orders-list", page_size=10)
+
+    def test_order_detail(self):
+        self.assertBudgetHolds(3, "orders-detail", detail="order")
@@ -0,0 +1,180 @@
+from collections import defaultdict
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from train_station.archiving import archive_chunk
+from train_station.models import Order, Ticket, Trip
+from train_station.serializers import (
+    OrderListSerializer,
+    OrderRetrieveSerializer,
+    TripListSerializer,
+    TripRetrieveSerializer,
+)
+from train_station.tests.base_tests import BaseAdminTest
+from train_station.tests.test_view import SampleTrips
+from train_station.views import OrderViewSet, TripViewSet
+
+STATION = {"id", "name"}
+CREW = {"id", "first_name", "last_name"}
+TRIP = {"id", "route_id", "train_id", "departure_time", "arrival_time"}
+TICKET = {"id", "cargo", "seat", "price", "order_id", "trip_id"}
+
+
+def loaded_columns(objects, columns=None, seen=None):
+    """
+    ``{model label: attnames}`` of the columns loaded for ``objects`` and
+    the related rows selected or prefetched with them.
+    """
+    if columns is None:
+        columns, seen = defaultdict(set), set()
+    for obj in objects:
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        deferred = obj.get_deferred_fields()
+        columns[obj._meta.label].update(
+            field.attname
+            for field in obj._meta.concrete_fields
+            if field.attname not in deferred
+        )
+        loaded_columns(obj._state.fields_cache.values(), columns, seen)
+        for related in getattr(obj, "_prefetched_objects_cache", {}).values():
+            loaded_columns(related, columns, seen)
+    return columns
+
+
+class QueryPlanTest(BaseAdminTest, SampleTrips):
+    """
+    Each planned action loads exactly the columns its serializer reads:
+    serializing issues no further query, and no other column is fetched.
+    """
+
+    def setUp(self):
+        super().setUp()
+        SampleTrips.setUp(self)
+        self.order = Order.objects.create(user=self.admin)
+        trip, archived_trip = Trip.objects.order_by("departure_time")
+        for seat in (1, 2):
+            Ticket.objects.create(trip=trip, order=self.order, cargo=1, seat=seat)
+            Ticket.objects.create(
+                trip=archived_trip, order=self.order, cargo=2, seat=seat
+            )
+        archive_chunk([archived_trip.id])
+        self.trip = trip
+
+    def get_queryset(self, viewset, action):
+        view = viewset(action=action)
+        view.request = Request(APIRequestFactory().get("/"))
+        view.request.user = self.admin
+        return view.get_queryset()
+
+    def assertPlanLoads(self, viewset, action, serializer_class, expected, **lookup):
+        objects = list(self.get_queryset(viewset, action).filter(**lookup))
+        self.assertTrue(objects)
+
+        with self.assertNumQueries(0):
+            serializer_class(objects, many=True).data
+
+        self.assertEqual(dict(loaded_columns(objects)), expected)
+
+    def test_trip_list(self):
+        self.assertPlanLoads(
+            TripViewSet,
+            "list",
+            TripListSerializer,
+            {
+                "train_station.Trip": TRIP,
+                "train_station.Route": {"id", "source_id", "destination_id"},
+                "train_station.Station": STATION,
+                "train_station.Train": {
+                    "id",
+                    "name",
+                    "cargo_num",
+                    "places_in_cargo",
+                    "train_type_id",
+                },
+                "train_station.Crew": CREW,
+            },
+        )
+
+    def test_trip_list_counts_tickets(self):
+        trip = self.get_queryset(TripViewSet, "list").get(id=self.trip.id)
+
+        self.assertEqual(trip.tickets_taken, 2)
+        self.assertEqual(
+            TripListSerializer(trip).data["tickets_available"],
+            trip.train.capacity - 2,
+        )
+
+    def test_trip_retrieve(self):
+        self.assertPlanLoads(
+            TripViewSet,
+            "retrieve",
+            TripRetrieveSerializer,
+            {
+                "train_station.Trip": TRIP,
+                "train_station.Route": {
+                    "id",
+                    "source_id",
+                    "destination_id",
+                    "distance",
+                },
+                "train_station.Station": STATION,
+                "train_station.Train": {
+                    "id",
+                    "name",
+                    "cargo_num",
+                    "places_in_cargo",
+                    "train_type_id",
+                },
+                "train_station.Crew": CREW,
+                "train_station.Ticket": {"id", "cargo", "seat", "trip_id"},
+            },
+            id=self.trip.id,
+        )
+
+    def test_order_list(self):
+        trip = {"id", "route_id", "departure_time", "arrival_time"}
+        self.assertPlanLoads(
+            OrderViewSet,
+            "list",
+            OrderListSerializer,
+            {
+                "train_station.Order": {"id", "created_at", "total"},
+                "train_station.Ticket": TICKET,
+                "train_station.ArchivedTicket": TICKET,
+                "train_station.Trip": trip,
+                "train_station.ArchivedTrip": trip,
+                "train_station.Route": {
+                    "id",
+                    "source_id",
+                    "destination_id",
+                    "distance",
+                },
+                "train_station.Station": STATION,
+            },
+        )
+
+    def test_order_retrieve(self):
+        self.assertPlanLoads(
+            OrderViewSet,
+            "retrieve",
+            OrderRetrieveSerializer,
+            {
+                "train_station.Order": {"id", "created_at", "user_id", "total"},
+                "train_station.Ticket": TICKET,
+                "train_station.ArchivedTicket": TICKET,
+                "train_station.Trip": TRIP,
+                "train_station.ArchivedTrip": TRIP,
+                "train_station.Route": {"id", "source_id", "destination_id"},
+                "train_station.Station": STATION,
+                "train_station.Train": {"id", "name"},
+            },
+            id=self.order.id,
+        )
+
+    def test_writes_load_full_rows(self):
+        trip = self.get_queryset(TripViewSet, "update").get(id=self.trip.id)
+
+        self.assertEqual(trip.get_deferred_fields(), set())
@@ -0,0 +1,58 @@
+import json
+
+from asgiref.sync import iscoroutinefunction
+from django.test import AsyncClient
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.middleware import RequestStatsMiddleware, request_stats
+from train_station.tests.base_tests import BaseAuthenticatedTest
+from train_station.tests.test_view import SampleTrips
+
+TRIP_URL = reverse("train_station:trips-list")
+ASYNC_TRIP_URL = reverse("train_station:async-trips-list")
+
+
+class RequestStatsMiddlewareTest(BaseAuthenticatedTest, SampleTrips):
+    def setUp(self):
+        super().setUp()
+        SampleTrips.setUp(self)
+        request_stats.clear()
+
+    def test_request_is_logged_and_aggregated(self):
+        with self.assertLogs("core.middleware", "INFO") as logs:
+            res = self.client.get(TRIP_URL)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["endpoint"], "TripViewSet.list")
+        self.assertEqual(line["status"], 200)
+        self.assertEqual(line["size"], len(res.content))
+        self.assertGreater(line["queries"], 0)
+        self.assertGreaterEqual(line["total_ms"], line["db_ms"])
+
+        self.client.get(f"{TRIP_URL}1/")
+        totals = request_stats.snapshot()
+        self.assertEqual(totals["TripViewSet.list"]["requests"], 1)
+        self.assertEqual(totals["TripViewSet.retrieve"]["requests"], 1)
+        self.assertEqual(
+            totals["TripViewSet.list"]["queries"], line["queries"]
+        )
+
+    def test_async_handler_chain_stays_async(self):
+        async def get_response(request):
+            pass
+
+        self.assertTrue(iscoroutinefunction(RequestStatsMiddleware(get_response)))
+
+    async def test_async_view_queries_are_counted(self):
+        token = AccessToken.for_user(self.user)
+        with self.assertLogs("core.middleware", "INFO") as logs:
+            res = await AsyncClient().get(
+                ASYNC_TRIP_URL, headers={"authorization": f"Bearer {token}"}
+            )
+
+        self.assertEqual(res.status_code, 200, res.content)
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["endpoint"], "AsyncTripListView")
+        # Run by sync_to_async in another thread than the middleware.
+        self.assertGreater(line["queries"], 0)
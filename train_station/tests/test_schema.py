@@ -0,0 +1,100 @@
+import gzip
+import json
+import tempfile
+from contextlib import redirect_stderr
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from core.schema import load_artifact
+
+SCHEMA_URL = reverse("schema")
+
+
+class SchemaViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        with redirect_stderr(StringIO()):
+            call_command("build_schema", output=cls.directory.name, stdout=StringIO())
+        cls.settings = override_settings(
+            DEBUG=False, SCHEMA_ARTIFACT_DIR=cls.directory.name
+        )
+        cls.settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings.disable()
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        load_artifact.cache_clear()
+
+    def test_serves_artifact_with_etag(self):
+        res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(b"openapi: 3", res.content)
+        self.assertIn(b"/train-station/trips/", res.content)
+        self.assertRegex(res["ETag"], r'^"[0-9a-f]{32}"$')
+        self.assertEqual(res["Vary"], "Accept, Accept-Encoding")
+
+        res = self.client.get(SCHEMA_URL, headers={"if-none-match": res["ETag"]})
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+
+    def test_json_format(self):
+        res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(
+            res["Content-Type"], "application/vnd.oai.openapi+json; charset=utf-8"
+        )
+        self.assertIn("/train-station/trips/", json.loads(res.content)["paths"])
+        self.assertNotEqual(res["ETag"], self.client.get(SCHEMA_URL)["ETag"])
+
+    def test_gzip_encoding(self):
+        plain = self.client.get(SCHEMA_URL)
+        res = self.client.get(SCHEMA_URL, headers={"accept-encoding": "gzip, br"})
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertLess(len(res.content), len(plain.content))
+        self.assertNotEqual(res["ETag"], plain["ETag"])
+
+        res = self.client.get(
+            SCHEMA_URL,
+            headers={"accept-encoding": "gzip", "if-none-match": plain["ETag"]},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_missing_artifact(self):
+        with override_settings(SCHEMA_ARTIFACT_DIR=self.directory.name + "-missing"):
+            with self.assertLogs("core.schema", "ERROR"):
+                res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_debug_generates_live_schema(self):
+        with override_settings(
+            DEBUG=True, SCHEMA_ARTIFACT_DIR=self.directory.name + "-missing"
+        ):
+            with redirect_stderr(StringIO()):
+                res = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(b"/train-station/trips/", res.content)
+        self.assertNotIn("ETag", res)
+
+    def test_documentation_pages(self):
+        for name in ("swagger-ui", "redoc"):
+            res = self.client.get(reverse(name))
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertIn(SCHEMA_URL.encode(), res.content)
@@ -0,0 +1,98 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from train_station.models import Route, Station, Train, TrainType, Trip
+from train_station.search_names import search_name
+from train_station.trip_search import trip_search_cache
+
+ROUTE_URL = reverse("train_station:routes-list")
+TRIP_URL = reverse("train_station:trips-list")
+
+
+class SearchNameTest(TestCase):
+    def test_spelling_variants_share_a_search_name(self):
+        self.assertEqual(search_name("Kyiv"), "kiv")
+        self.assertEqual(search_name("Kiev"), "kiv")
+        self.assertEqual(search_name("Київ"), "kiv")
+        self.assertEqual(search_name("Odessa"), search_name("Одеса"))
+        self.assertEqual(search_name("Zaporizhzhia"), search_name("Запоріжжя"))
+
+    def test_accents_case_and_punctuation(self):
+        self.assertEqual(search_name("Ivano-Frankivsk"), "ivano frankivsk")
+        self.assertEqual(search_name("  Kraków Główny "), "krakow glowni")
+        self.assertEqual(search_name("Кам'янець"), search_name("Kamianets"))
+
+    def test_save_sets_search_name(self):
+        station = Station.objects.create(name="Київ", latitude=50.4, longitude=30.5)
+        self.assertEqual(station.search_name, "kiv")
+
+        station.name = "Lviv"
+        station.save(update_fields=["name"])
+
+        station.refresh_from_db()
+        self.assertEqual(station.search_name, "lviv")
+
+
+class StationNameFilterTest(TestCase):
+    def setUp(self):
+        trip_search_cache.clear()
+        self.addCleanup(trip_search_cache.clear)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                email="test@mail.tt", password="testpassword"
+            )
+        )
+        kyiv = Station.objects.create(name="Київ", latitude=50.4, longitude=30.5)
+        lviv = Station.objects.create(name="Lviv", latitude=49.8, longitude=24.0)
+        odesa = Station.objects.create(name="Odesa", latitude=46.5, longitude=30.7)
+        self.kyiv_lviv = Route.objects.create(
+            source=kyiv, destination=lviv, distance=540
+        )
+        self.odesa_lviv = Route.objects.create(
+            source=odesa, destination=lviv, distance=790
+        )
+        train = Train.objects.create(
+            name="IC",
+            cargo_num=2,
+            places_in_cargo=5,
+            train_type=TrainType.objects.create(name="Fast"),
+        )
+        departure = timezone.make_aware(datetime(2030, 1, 1, 8))
+        self.trip = Trip.objects.create(
+            route=self.kyiv_lviv,
+            train=train,
+            departure_time=departure,
+            arrival_time=departure.replace(hour=14),
+        )
+
+    def test_routes_by_romanized_name(self):
+        response = self.client.get(ROUTE_URL, {"source": "Kiev"})
+
+        self.assertEqual([route["id"] for route in response.data], [self.kyiv_lviv.id])
+
+    def test_routes_by_name_prefix(self):
+        response = self.client.get(ROUTE_URL, {"source": "ode"})
+
+        self.assertEqual([route["id"] for route in response.data], [self.odesa_lviv.id])
+
+    def test_trips_by_spelling_variant(self):
+        for name in ("Kyiv", "KIEV", "Київ", "ky"):
+            response = self.client.get(
+                TRIP_URL, {"source_station": name, "destination_station": "Львів"}
+            )
+            self.assertEqual(
+                [trip["id"] for trip in response.data["results"]],
+                [self.trip.id],
+                name,
+            )
+
+    def test_unknown_station(self):
+        response = self.client.get(TRIP_URL, {"source_station": "Kharkiv"})
+
+        self.assertEqual(response.data["results"], [])
@@ -0,0 +1,119 @@
+import base64
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from train_station.models import Order, Route, Station, Ticket, Train, TrainType, Trip
+from train_station.seat_maps import encode_bitmap, encode_ranges
+from train_station.tests.base_tests import BaseAuthenticatedTest
+
+
+class EncodingTest(SimpleTestCase):
+    def test_bitmap(self):
+        bits = base64.b64decode(encode_bitmap([(1, 1), (1, 3), (2, 5)], 2, 5))
+
+        self.assertEqual(bits, bytes([0b10100000, 0b01000000]))
+
+    def test_bitmap_skips_seats_outside_the_train(self):
+        self.assertEqual(encode_bitmap([(3, 1), (1, 6)], 2, 5), "AAA=")
+
+    def test_ranges(self):
+        seats = [(1, 1), (1, 2), (1, 3), (1, 7), (3, 4), (3, 5)]
+
+        self.assertEqual(encode_ranges(seats), {"1": [[1, 3], [7, 7]], "3": [[4, 5]]})
+
+
+class TripSeatMapTest(BaseAuthenticatedTest):
+    def setUp(self):
+        super().setUp()
+        kyiv = Station.objects.create(name="Kyiv", latitude=50.4, longitude=30.5)
+        lviv = Station.objects.create(name="Lviv", latitude=49.8, longitude=24.0)
+        train = Train.objects.create(
+            name="IC",
+            cargo_num=2,
+            places_in_cargo=8,
+            train_type=TrainType.objects.create(name="Fast"),
+        )
+        departure = timezone.make_aware(datetime(2030, 1, 1, 8))
+        self.trips = [
+            Trip.objects.create(
+                route=Route.objects.create(source=kyiv, destination=lviv, distance=540),
+                train=train,
+                departure_time=departure + timedelta(days=day),
+                arrival_time=departure + timedelta(days=day, hours=5),
+            )
+            for day in range(2)
+        ]
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.bulk_create(
+            Ticket(trip=self.trips[0], order=order, cargo=cargo, seat=seat)
+            for cargo, seat in ((1, 1), (1, 2), (2, 8))
+        )
+
+    def get(self, trip, seat_map):
+        url = reverse("train_station:trips-detail", args=[trip.id])
+        return self.client.get(url, {"seat_map": seat_map})
+
+    def test_bitmap(self):
+        res = self.get(self.trips[0], "bitmap")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["tickets_available"], 13)
+        self.assertEqual(
+            res.data["taken_places"],
+            {
+                "cargo_num": 2,
+                "places_in_cargo": 8,
+                "bitmap": base64.b64encode(bytes([0b11000000, 0b00000001])).decode(),
+            },
+        )
+
+    def test_ranges(self):
+        res = self.get(self.trips[0], "ranges")
+
+        self.assertEqual(res.data["taken_places"], {"1": [[1, 2]], "2": [[8, 8]]})
+
+    def test_other_fields_match_the_list_encoding(self):
+        compact = self.get(self.trips[0], "ranges").data
+        listed = self.get(self.trips[0], "list").data
+
+        self.assertEqual(
+            listed["taken_places"],
+            [
+                {"cargo": 1, "seat": 1},
+                {"cargo": 1, "seat": 2},
+                {"cargo": 2, "seat": 8},
+            ],
+        )
+        compact.pop("taken_places")
+        listed.pop("taken_places")
+        self.assertEqual(compact, listed)
+
+    def test_no_ticket_instances(self):
+        with mock.patch.object(
+            Ticket, "__init__", side_effect=AssertionError("Ticket loaded")
+        ):
+            res = self.get(self.trips[0], "bitmap")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_bulk_retrieve(self):
+        res = self.client.get(
+            reverse("train_station:trips-list"),
+            {"ids": f"{self.trips[1].id},{self.trips[0].id}", "seat_map": "ranges"},
+        )
+
+        self.assertEqual(
+            [trip["taken_places"] for trip in res.data],
+            [{}, {"1": [[1, 2]], "2": [[8, 8]]}],
+        )
+        self.assertEqual([trip["tickets_available"] for trip in res.data], [16, 13])
+
+    def test_unknown_encoding(self):
+        res = self.get(self.trips[0], "png")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,69 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+
+from train_station.models import FixtureState, Order, Station, Ticket
+
+FIXTURE = Path(settings.BASE_DIR) / "data.json"
+
+
+class SeedDataCommandTest(TestCase):
+    def call(self, path, **options):
+        stdout = StringIO()
+        call_command("seed_data", str(path), stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_seed_applies_fixture(self):
+        records = json.loads(FIXTURE.read_text())
+        stdout = self.call(FIXTURE)
+
+        self.assertEqual(
+            Ticket.objects.count(),
+            sum(1 for r in records if r["model"] == "train_station.ticket"),
+        )
+        order = next(r for r in records if r["model"] == "train_station.order")
+        self.assertEqual(
+            Order.objects.get(pk=order["pk"]).created_at.isoformat(),
+            order["fields"]["created_at"].replace("Z", "+00:00"),
+        )
+        self.assertTrue(FixtureState.objects.filter(name="data.json").exists())
+        self.assertIn("data.json applied", stdout)
+
+    def test_unchanged_fixture_is_skipped(self):
+        self.call(FIXTURE)
+        with self.assertNumQueries(1):
+            stdout = self.call(FIXTURE)
+        self.assertIn("unchanged", stdout)
+
+    def test_only_changed_rows_are_written(self):
+        records = [
+            {
+                "model": "train_station.station",
+                "pk": 1,
+                "fields": {"name": "Kyiv", "latitude": 50.4, "longitude": 30.5},
+            },
+            {
+                "model": "train_station.station",
+                "pk": 2,
+                "fields": {"name": "Lviv", "latitude": 49.8, "longitude": 24.0},
+            },
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "stations.json"
+            path.write_text(json.dumps(records))
+            self.call(path)
+
+            records[1]["fields"]["name"] = "Lviv-Holovnyi"
+            path.write_text(json.dumps(records))
+            stdout = self.call(path)
+
+        self.assertIn(
+            "train_station.Station: 0 created, 1 updated, 1 unchanged", stdout
+        )
+        self.assertEqual(Station.objects.get(pk=2).name, "Lviv-Holovnyi")
+        self.assertEqual(Station.objects.get(pk=2).search_name, "lviv holovni")
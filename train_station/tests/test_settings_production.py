@@ -0,0 +1,17 @@
+from django.test import SimpleTestCase
+
+from core import settings_production
+
+
+class ProductionSettingsTest(SimpleTestCase):
+    def test_development_tools_are_left_out(self):
+        self.assertFalse(settings_production.DEBUG)
+        self.assertNotIn("debug_toolbar", settings_production.INSTALLED_APPS)
+        self.assertFalse(
+            any("debug_toolbar" in name for name in settings_production.MIDDLEWARE)
+        )
+        self.assertIn("train_station", settings_production.INSTALLED_APPS)
+        self.assertTrue(settings_production.METRICS_REQUIRE_TOKEN)
+        self.assertEqual(
+            settings_production.MIDDLEWARE[0], "core.middleware.RequestStatsMiddleware"
+        )
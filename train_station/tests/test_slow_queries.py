@@ -0,0 +1,80 @@
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from core.slow_queries import fingerprint, normalize_sql
+from train_station.models import SlowQuery
+from train_station.tests.base_tests import BaseAdminTest
+from train_station.tests.test_view import SampleTrips
+
+TRIP_URL = reverse("train_station:trips-list")
+REPORT_URL = reverse("slow-queries")
+
+
+class NormalizeSqlTest(SimpleTestCase):
+    def test_values_do_not_change_the_fingerprint(self):
+        first = normalize_sql(
+            "SELECT * FROM trip WHERE id IN (%s, %s) AND name LIKE '%kyiv%'"
+        )
+        second = normalize_sql(
+            "SELECT *  FROM trip\n WHERE id IN (%s) AND name LIKE 'it''s'"
+        )
+
+        self.assertEqual(first, "SELECT * FROM trip WHERE id IN (...) AND name LIKE ?")
+        self.assertEqual(fingerprint(first), fingerprint(second))
+
+    def test_identifiers_are_kept(self):
+        self.assertEqual(
+            normalize_sql('SELECT "T3"."id" FROM t LIMIT 21'),
+            'SELECT "T3"."id" FROM t LIMIT ?',
+        )
+
+
+@override_settings(SLOW_QUERY_LOG={"THRESHOLD_MS": 0, "EXPLAIN_ANALYZE": True})
+class SlowQueryLogTest(BaseAdminTest, SampleTrips):
+    def setUp(self):
+        super().setUp()
+        SampleTrips.setUp(self)
+
+    def test_slow_queries_are_explained_and_deduplicated(self):
+        with self.assertLogs("core.slow_queries", "WARNING"):
+            self.client.get(TRIP_URL, {"source_station": "source"})
+        slow_query = SlowQuery.objects.get(
+            endpoint="TripViewSet.list",
+            normalized_sql__contains='"search_name" LIKE',
+            normalized_sql__startswith="SELECT COUNT",
+        )
+        self.assertEqual(slow_query.count, 1)
+        self.assertIn("train_station_trip", slow_query.plan)
+        recorded = SlowQuery.objects.count()
+
+        self.client.get(TRIP_URL, {"source_station": "other"})
+
+        self.assertEqual(SlowQuery.objects.count(), recorded)
+        slow_query.refresh_from_db()
+        self.assertEqual(slow_query.count, 2)
+        self.assertGreaterEqual(slow_query.total_ms, slow_query.max_ms)
+
+    def test_report(self):
+        self.client.get(TRIP_URL, {"departure_time": "2024-12-30"})
+
+        res = self.client.get(REPORT_URL, {"order": "count", "limit": 5})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(res.data), 5)
+        counts = [row["count"] for row in res.data]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        self.assertIn("plan", res.data[0])
+
+    def test_report_rejects_invalid_params(self):
+        for params in ({"limit": -5}, {"limit": 0}, {"limit": "ten"}, {"order": "x"}):
+            res = self.client.get(REPORT_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_report_is_staff_only(self):
+        self.admin.is_staff = False
+        self.admin.save()
+
+        res = self.client.get(REPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+
+from train_station.models import ThrottleBucket
+from train_station.tests.base_tests import BaseAuthenticatedTest
+from train_station.throttling import DatabaseBucketStore, ScopedBucketThrottle
+
+TRIP_URL = reverse("train_station:trips-list")
+ORDER_URL = reverse("train_station:orders-list")
+
+
+class DatabaseBucketStoreTest(TestCase):
+    def setUp(self):
+        self.store = DatabaseBucketStore()
+        self.now = 1000.0
+        patcher = mock.patch(
+            "train_station.throttling.time.time", side_effect=lambda: self.now
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_up_to_capacity_then_wait(self):
+        for _ in range(3):
+            self.assertEqual(self.store.consume("key", 3, 1.0), 0)
+
+        self.assertAlmostEqual(self.store.consume("key", 3, 1.0), 1.0)
+        self.assertEqual(ThrottleBucket.objects.count(), 1)
+
+    def test_tokens_refill_up_to_capacity(self):
+        for _ in range(3):
+            self.store.consume("key", 3, 0.5)
+
+        self.now += 2
+        self.assertEqual(self.store.consume("key", 3, 0.5), 0)
+        self.assertAlmostEqual(self.store.consume("key", 3, 0.5), 2.0)
+
+        self.now += 3600
+        for _ in range(3):
+            self.assertEqual(self.store.consume("key", 3, 0.5), 0)
+        self.assertGreater(self.store.consume("key", 3, 0.5), 0)
+
+    def test_cost_above_capacity_is_never_allowed(self):
+        self.assertIsNone(self.store.consume("key", 3, 1.0, cost=4))
+
+    def test_prune_deletes_idle_buckets(self):
+        self.store.consume("old", 3, 1.0)
+        self.now += 100
+        self.store.consume("new", 3, 1.0)
+
+        self.assertEqual(self.store.prune(50), 1)
+        self.assertEqual(
+            list(ThrottleBucket.objects.values_list("key", flat=True)), ["new"]
+        )
+
+
+class ScopedBucketThrottleTest(BaseAuthenticatedTest):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(
+            ScopedBucketThrottle.THROTTLE_RATES, {"trips": "2/min", "orders": "1/min"}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_trip_browsing_has_its_own_bucket(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get(TRIP_URL).status_code, status.HTTP_200_OK)
+
+        res = self.client.get(TRIP_URL)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
+        self.assertEqual(self.client.get(ORDER_URL).status_code, status.HTTP_200_OK)
+
+    def test_order_creation_bucket(self):
+        self.client.post(ORDER_URL, {"tickets": []}, format="json")
+
+        res = self.client.post(ORDER_URL, {"tickets": []}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.client.get(ORDER_URL).status_code, status.HTTP_200_OK)
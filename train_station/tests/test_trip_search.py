@@ -0,0 +1,181 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from train_station.archiving import archive_chunk
+from train_station.fares import fare_table
+from train_station.models import (
+    Order,
+    Route,
+    Station,
+    ThrottleBucket,
+    Ticket,
+    Train,
+    TrainType,
+    Trip,
+)
+from train_station.trip_search import TripSearchCache, trip_search_cache
+
+TRIP_URL = reverse("train_station:trips-list")
+
+
+class TripSearchCacheTest(TransactionTestCase):
+    def setUp(self):
+        trip_search_cache.clear()
+        self.addCleanup(trip_search_cache.clear)
+        self.user = get_user_model().objects.create_user(
+            email="test@mail.tt", password="testpassword"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.kyiv = Station.objects.create(name="Kyiv", latitude=50.4, longitude=30.5)
+        lviv = Station.objects.create(name="Lviv", latitude=49.8, longitude=24.0)
+        odesa = Station.objects.create(name="Odesa", latitude=46.5, longitude=30.7)
+        self.kyiv_lviv = Route.objects.create(
+            source=self.kyiv, destination=lviv, distance=540
+        )
+        self.odesa_lviv = Route.objects.create(
+            source=odesa, destination=lviv, distance=790
+        )
+        self.train = Train.objects.create(
+            name="IC",
+            cargo_num=2,
+            places_in_cargo=5,
+            train_type=TrainType.objects.create(name="Fast"),
+        )
+        self.trip = self.create_trip(self.kyiv_lviv, day=0)
+        fare_table.load()
+
+    def create_trip(self, route, day):
+        departure = timezone.make_aware(datetime(2030, 1, 1 + day, 8))
+        return Trip.objects.create(
+            route=route,
+            train=self.train,
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=5),
+        )
+
+    def search(self, **params):
+        """
+        The results and the SELECTs made, throttle buckets and the
+        shared cache aside.
+        """
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(TRIP_URL, {"source_station": "kyiv", **params})
+        self.assertEqual(res.status_code, 200, res.content)
+        queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT")
+            and ThrottleBucket._meta.db_table not in query["sql"]
+            and settings.CACHES["shared"]["LOCATION"] not in query["sql"]
+        ]
+        return res.data, queries
+
+    def test_repeated_search_is_served_from_the_cache(self):
+        first, queries = self.search()
+        self.assertEqual(len(queries), 3)
+
+        again, queries = self.search(source_station="  KYIV ")
+
+        self.assertEqual(queries, [])
+        self.assertEqual(again, first)
+
+    def test_other_page_or_filters_are_separate(self):
+        self.search()
+
+        _, queries = self.search(departure_time="2030-01-01")
+
+        self.assertEqual(len(queries), 3)
+
+    def test_sale_updates_tickets_available_only(self):
+        first, _ = self.search()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(trip=self.trip, order=order, cargo=1, seat=1)
+
+        data, queries = self.search()
+
+        self.assertEqual(queries, [])
+        self.assertEqual(data["results"][0]["tickets_available"], 9)
+        self.assertEqual(first["results"][0]["tickets_available"], 10)
+
+        Ticket.objects.all().delete()
+        data, _ = self.search()
+        self.assertEqual(data["results"][0]["tickets_available"], 10)
+
+    def test_ticket_counts_are_bounded(self):
+        odesa_trip = self.create_trip(self.odesa_lviv, day=0)
+        with override_settings(
+            TRIP_SEARCH_CACHE={**settings.TRIP_SEARCH_CACHE, "MAX_TRIPS": 1}
+        ):
+            self.search()
+            self.search(source_station="odesa")
+            self.assertEqual(list(trip_search_cache._taken), [odesa_trip.id])
+
+            data, queries = self.search()
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(data["results"][0]["tickets_available"], 10)
+        self.assertEqual(list(trip_search_cache._taken), [self.trip.id])
+
+    def test_trip_on_the_searched_route_invalidates(self):
+        self.search()
+
+        self.create_trip(self.kyiv_lviv, day=1)
+        data, queries = self.search()
+
+        self.assertEqual(data["count"], 2)
+        self.assertEqual(len(queries), 3)
+
+    def test_trip_moved_away_from_the_searched_route_invalidates(self):
+        self.search()
+
+        self.trip.route = self.odesa_lviv
+        self.trip.save()
+        data, _ = self.search()
+
+        self.assertEqual(data["count"], 0)
+
+    def test_trip_on_another_route_keeps_the_search(self):
+        self.search()
+
+        self.create_trip(self.odesa_lviv, day=1)
+        _, queries = self.search()
+
+        self.assertEqual(queries, [])
+
+    def test_change_in_another_worker_invalidates(self):
+        self.search()
+        other_worker = TripSearchCache()
+
+        # Bulk updates bypass the signals of this worker.
+        Trip.objects.filter(id=self.trip.id).update(route=self.odesa_lviv)
+        other_worker.invalidate_route("Kyiv", "Lviv")
+        data, _ = self.search()
+
+        self.assertEqual(data["count"], 0)
+
+    def test_station_rename_clears(self):
+        self.search()
+
+        self.kyiv.name = "Boryspil"
+        self.kyiv.save()
+        data, _ = self.search()
+
+        self.assertEqual(data["count"], 0)
+
+    def test_archiving_clears(self):
+        self.search()
+
+        archive_chunk([self.trip.id])
+        data, _ = self.search()
+
+        self.assertEqual(data["count"], 0)
@@ -19,7 +19,7 @@ from train_station.serializers import (
     TrainListSerializer,
     TripListSerializer,
     CrewListSerializer,
-
+    TripRetrieveSerializer,
 )
 from train_station.tests.base_tests import (
     BaseAuthenticatedTest,
@@ -197,6 +197,12 @@ class AuthenticatedTrainTest(BaseAuthenticatedTest):
         self.assertEqual(res.data, serializer.data)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
 
+    def test_trains_bulk_retrieve(self):
+        res = self.client.get(TRAIN_URL, {"ids": f"{self.train.id},{self.train.id}"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, [TrainListSerializer(self.train).data])
+
 
 class AdminTrainTest(BaseAdminTest):
     def setUp(self):
@@ -323,6 +329,32 @@ class AuthenticatedTripTest(BaseAuthenticatedTest, SampleTrips):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data["tickets_available"], 12)
 
+    def test_trip_bulk_retrieve(self):
+        first, second = Trip.objects.order_by("id")
+        res = self.client.get(
+            TRIP_URL, {"ids": f"{second.id},{second.id + 100},{first.id}"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [
+                TripRetrieveSerializer(second).data,
+                TripRetrieveSerializer(first).data,
+            ],
+        )
+
+    def test_trip_bulk_retrieve_invalid_ids(self):
+        for ids in ("1,two", "1,0", "-1", "99999999999999999999999", ""):
+            res = self.client.get(TRIP_URL, {"ids": ids})
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, ids)
+
+    def test_trip_bulk_retrieve_limit(self):
+        ids = ",".join(str(pk) for pk in range(1, 52))
+        res = self.client.get(TRIP_URL, {"ids": ids})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class AdminTripTest(BaseAdminTest, SampleTrips):
     def setUp(self):
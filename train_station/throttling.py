@@ -0,0 +1,232 @@
+import time
+from functools import cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Least
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    SimpleRateThrottle,
+    UserRateThrottle,
+)
+
+from core.metrics import THROTTLE_REJECTIONS
+from train_station.models import ThrottleBucket
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class DatabaseBucketStore:
+    """
+    Buckets in the ``ThrottleBucket`` table.
+
+    A request is granted by a single conditional UPDATE that refills and
+    takes tokens, so concurrent workers cannot spend the same token.
+    """
+
+    def __init__(self, using="default"):
+        self.using = using
+
+    def consume(self, key, capacity, rate, cost=1):
+        """
+        Take ``cost`` tokens from the bucket ``key``. Returns 0 when they
+        were taken, otherwise the seconds until enough have refilled.
+        """
+        now = time.time()
+        refilled = Least(
+            Value(float(capacity)),
+            F("tokens") + Greatest(Value(0.0), Value(now) - F("updated_at")) * rate,
+        )
+        buckets = ThrottleBucket.objects.using(self.using).filter(key=key)
+        if buckets.alias(refilled=refilled).filter(refilled__gte=cost).update(
+            tokens=refilled - cost, updated_at=now
+        ):
+            return 0
+
+        bucket = buckets.first()
+        if bucket is None:
+            if cost > capacity:
+                return None
+            try:
+                with transaction.atomic(using=self.using):
+                    ThrottleBucket.objects.using(self.using).create(
+                        key=key, tokens=capacity - cost, updated_at=now
+                    )
+                return 0
+            except IntegrityError:
+                # Another worker created the bucket first.
+                return self.consume(key, capacity, rate, cost)
+
+        tokens = min(capacity, bucket.tokens + max(0.0, now - bucket.updated_at) * rate)
+        return (cost - tokens) / rate
+
+    def prune(self, idle_for):
+        """
+        Delete buckets untouched for ``idle_for`` seconds; once refilled
+        they are equivalent to a missing bucket.
+        """
+        deleted, _ = (
+            ThrottleBucket.objects.using(self.using)
+            .filter(updated_at__lt=time.time() - idle_for)
+            .delete()
+        )
+        return deleted
+
+
+class RedisBucketStore:
+    """
+    Buckets in Redis hashes, refilled and consumed by one Lua script.
+    """
+
+    script = """
+        local capacity = tonumber(ARGV[1])
+        local rate = tonumber(ARGV[2])
+        local now = tonumber(ARGV[3])
+        local cost = tonumber(ARGV[4])
+        local state = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+        local tokens = tonumber(state[1]) or capacity
+        local updated_at = tonumber(state[2]) or now
+        tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+        local wait = 0
+        if tokens >= cost then
+            tokens = tokens - cost
+        else
+            wait = (cost - tokens) / rate
+        end
+        redis.call("HSET", KEYS[1], "tokens", tokens, "updated_at", now)
+        redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+        return tostring(wait)
+    """
+
+    def __init__(self, url):
+        if redis is None:
+            raise ImproperlyConfigured(
+                "THROTTLE_REDIS_URL is set but the redis package is not installed."
+            )
+        self.client = redis.Redis.from_url(url)
+        self.consume_script = self.client.register_script(self.script)
+
+    def consume(self, key, capacity, rate, cost=1):
+        if cost > capacity:
+            return None
+        wait = float(
+            self.consume_script(keys=[key], args=[capacity, rate, time.time(), cost])
+        )
+        return wait
+
+    def prune(self, idle_for):
+        # Keys expire on their own once the bucket is full again.
+        return 0
+
+
+@cache
+def get_bucket_store():
+    if settings.THROTTLE_REDIS_URL:
+        return RedisBucketStore(settings.THROTTLE_REDIS_URL)
+    return DatabaseBucketStore()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket version of ``SimpleRateThrottle``.
+
+    A rate of ``"100/min"`` is a bucket of 100 tokens refilled at 100 per
+    minute, so bursts up to the full rate are allowed while the average
+    stays within it. The state per key is two numbers kept in a store
+    shared by all workers (see ``get_bucket_store``).
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.waiting = get_bucket_store().consume(
+            self.key,
+            self.num_requests,
+            self.num_requests / self.duration,
+            self.get_cost(request, view),
+        )
+        if self.waiting != 0:
+            THROTTLE_REJECTIONS.labels(self.scope).inc()
+            return False
+        return True
+
+    def get_cost(self, request, view):
+        """
+        Tokens taken by the request, one unless the view counts them with
+        ``get_throttle_cost(request)``.
+        """
+        get_throttle_cost = getattr(view, "get_throttle_cost", None)
+        return get_throttle_cost(request) if get_throttle_cost else 1
+
+    def wait(self):
+        return self.waiting
+
+
+class BatchedRequestMixin:
+    """
+    Skip the operations of a batch, which is charged for all of them
+    (see ``train_station.batch``).
+    """
+
+    def allow_request(self, request, view):
+        if getattr(request, "batched", False):
+            return True
+        return super().allow_request(request, view)
+
+
+class AnonBucketThrottle(
+    BatchedRequestMixin, AnonRateThrottle, TokenBucketThrottle
+):
+    pass
+
+
+class UserBucketThrottle(
+    BatchedRequestMixin, UserRateThrottle, TokenBucketThrottle
+):
+    pass
+
+
+class ScopedBucketThrottle(TokenBucketThrottle):
+    """
+    Separate bucket per endpoint class.
+
+    Views name their bucket with ``throttle_scope``, or per action with
+    ``throttle_scopes``, e.g. ``{"create": "orders"}``; the rate is
+    ``DEFAULT_THROTTLE_RATES[scope]``. Views without a scope are not limited.
+    """
+
+    def __init__(self):
+        # The rate depends on the view, see allow_request.
+        pass
+
+    def get_scope(self, view):
+        scopes = getattr(view, "throttle_scopes", {})
+        action = getattr(view, "action", None)
+        return scopes.get(action, getattr(view, "throttle_scope", None))
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(view)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+
+        return self.cache_format % {"scope": self.scope, "ident": ident}
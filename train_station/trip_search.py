@@ -0,0 +1,231 @@
+"""
+Cache of trip search results.
+
+``trip_search_cache`` keeps the serialized pages of ``GET /trips/`` per
+process, keyed by the normalized filters (station names as
+``search_name``, dates parsed) and the page, so a repeated search is a
+dict lookup.
+Saving or deleting a trip drops only the searches whose station filters
+match the trip's route; changes to stations, routes, trains, crews and
+fare rules, and bulk writes, drop every search (see
+``train_station.signals``). Either also bumps a generation counter in
+the ``TRIP_SEARCH_CACHE["SHARED_CACHE"]`` cache, which is part of every
+key, so other workers stop serving any of their pages on the next
+lookup.
+Entries expire after ``TRIP_SEARCH_CACHE["TIMEOUT"]`` seconds.
+
+Ticket sales do not touch the entries. ``tickets_available`` is laid
+over each cached page from per-trip counts of tickets taken, updated in
+place by sales and cancellations in this process and reloaded, with one
+query for the page, after ``TRIP_SEARCH_CACHE["OVERLAY_TIMEOUT"]``
+seconds to pick up sales in other workers. Counts of trips no cached
+page has shown for a while, such as departed ones, are dropped past
+``TRIP_SEARCH_CACHE["MAX_TRIPS"]``.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+
+from core.metrics import record_cache_lookup
+from train_station.models import Ticket
+from train_station.search_names import search_name
+
+STATION_FILTERS = ("source_station", "destination_station")
+GENERATION_KEY = "trip_search:generation"
+
+
+def shared_cache():
+    return caches[settings.TRIP_SEARCH_CACHE["SHARED_CACHE"]]
+
+
+def generation():
+    return shared_cache().get(GENERATION_KEY, 0)
+
+
+def bump_generation():
+    """
+    Make every worker's cached searches stale and return the new
+    generation.
+    """
+    cache = shared_cache()
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        if cache.add(GENERATION_KEY, 1, timeout=None):
+            return 1
+        return cache.incr(GENERATION_KEY)
+
+
+def search_key(request, filterset):
+    """
+    Cache key of a valid ``TripFilter``: its cleaned filters, the page,
+    the host the pagination links point to and the shared generation.
+    """
+    filters = tuple(
+        (name, search_name(value) if name in STATION_FILTERS else value)
+        for name, value in sorted(filterset.form.cleaned_data.items())
+        if value not in (None, "")
+    )
+    params = request.query_params
+    return (
+        request.build_absolute_uri("/"),
+        filters,
+        params.get("page", "1"),
+        params.get("page_size", ""),
+        generation(),
+    )
+
+
+def matches(key, source, destination):
+    """
+    Whether a trip from ``source`` to ``destination`` (station names)
+    is among the results of the search ``key``, as far as the station
+    filters go.
+    """
+    filters = dict(key[1])
+    return search_name(source).startswith(
+        filters.get("source_station", "")
+    ) and search_name(destination).startswith(
+        filters.get("destination_station", "")
+    )
+
+
+class SearchEntry:
+    def __init__(self, data, capacities, expires_at):
+        self.data = data
+        # {trip id: seats}, the overlay gives the tickets taken.
+        self.capacities = capacities
+        self.expires_at = expires_at
+
+
+class TripSearchCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # {trip id: (loaded at, tickets taken)}, least recently used first.
+        self._taken = OrderedDict()
+
+    def get(self, key):
+        """
+        The response data cached for ``key`` with current
+        ``tickets_available``, or ``None``.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        record_cache_lookup("trip_search", entry is not None)
+        if entry is None:
+            return None
+
+        taken = self.tickets_taken(entry.capacities)
+        return {
+            **entry.data,
+            "results": [
+                {
+                    **trip,
+                    "tickets_available": entry.capacities[trip["id"]]
+                    - taken[trip["id"]],
+                }
+                for trip in entry.data["results"]
+            ],
+        }
+
+    def set(self, key, data, trips):
+        """
+        Cache the page ``data`` serialized from ``trips``, which carry the
+        ``tickets_taken`` annotation.
+        """
+        config = settings.TRIP_SEARCH_CACHE
+        now = time.monotonic()
+        entry = SearchEntry(
+            data,
+            {trip.id: trip.train.capacity for trip in trips},
+            now + config["TIMEOUT"],
+        )
+        with self._lock:
+            for trip in trips:
+                self._store_taken(trip.id, now, trip.tickets_taken)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > config["MAX_SIZE"]:
+                self._entries.popitem(last=False)
+
+    def tickets_taken(self, trip_ids):
+        """
+        ``{trip id: tickets taken}``, loading expired counts in one query.
+        """
+        now = time.monotonic()
+        loaded_since = now - settings.TRIP_SEARCH_CACHE["OVERLAY_TIMEOUT"]
+        with self._lock:
+            taken = {}
+            for trip_id in trip_ids:
+                if trip_id in self._taken:
+                    self._taken.move_to_end(trip_id)
+                    loaded_at, tickets = self._taken[trip_id]
+                    if loaded_at >= loaded_since:
+                        taken[trip_id] = tickets
+        missing = [trip_id for trip_id in trip_ids if trip_id not in taken]
+        if missing:
+            loaded = dict.fromkeys(missing, 0)
+            loaded.update(
+                Ticket.objects.filter(trip_id__in=missing)
+                .order_by()
+                .values("trip_id")
+                .annotate(tickets=Count("id"))
+                .values_list("trip_id", "tickets")
+            )
+            with self._lock:
+                for trip_id, tickets in loaded.items():
+                    self._store_taken(trip_id, now, tickets)
+            taken.update(loaded)
+        return taken
+
+    def _store_taken(self, trip_id, loaded_at, tickets):
+        # Called with the lock held.
+        self._taken[trip_id] = (loaded_at, tickets)
+        self._taken.move_to_end(trip_id)
+        while len(self._taken) > settings.TRIP_SEARCH_CACHE["MAX_TRIPS"]:
+            self._taken.popitem(last=False)
+
+    def update_taken(self, trip_id, change):
+        """
+        Apply ``change`` tickets sold (or released, when negative) on a
+        trip whose count is cached.
+        """
+        with self._lock:
+            if trip_id in self._taken:
+                loaded_at, tickets = self._taken[trip_id]
+                self._taken[trip_id] = (loaded_at, tickets + change)
+
+    def invalidate_route(self, source, destination):
+        """
+        Drop the searches that may list trips from ``source`` to
+        ``destination`` (station names).
+        """
+        current = bump_generation()
+        with self._lock:
+            # The other searches of the generation just left stay valid
+            # here, move them to the new one.
+            self._entries = OrderedDict(
+                (key[:-1] + (current,), entry)
+                for key, entry in self._entries.items()
+                if key[-1] == current - 1 and not matches(key, source, destination)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._taken.clear()
+        bump_generation()
+
+
+trip_search_cache = TripSearchCache()
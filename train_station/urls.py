@@ -1,6 +1,18 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from train_station.analytics_views import (
+    OccupancyReportView,
+    TripForecastListView,
+)
+from train_station.async_views import (
+    AsyncTripListView,
+    AsyncTripDetailView,
+    AsyncTripAvailabilityStreamView,
+    AsyncStationListView,
+    AsyncOrderListView,
+)
+from train_station.models import OccupancySummary
 from train_station.views import (
     CrewViewSet,
     StationViewSet,
@@ -9,6 +21,8 @@ from train_station.views import (
     OrderViewSet,
     TripViewSet,
     TrainTypeViewSet,
+    ChangeFeedView,
+    BatchView,
 )
 
 router = routers.DefaultRouter()
@@ -21,6 +35,49 @@ router.register("orders", OrderViewSet, basename="orders")
 router.register("trips", TripViewSet, basename="trips")
 router.register("train-types", TrainTypeViewSet, basename="train-types")
 
-urlpatterns = [path("", include(router.urls))]
+async_urlpatterns = [
+    path("trips/", AsyncTripListView.as_view(), name="async-trips-list"),
+    path(
+        "trips/<int:pk>/",
+        AsyncTripDetailView.as_view(),
+        name="async-trips-detail",
+    ),
+    path(
+        "stations/", AsyncStationListView.as_view(), name="async-stations-list"
+    ),
+    path("orders/", AsyncOrderListView.as_view(), name="async-orders-list"),
+]
+
+analytics_urlpatterns = [
+    path(
+        "occupancy/routes/",
+        OccupancyReportView.as_view(dimension=OccupancySummary.ROUTE),
+        name="occupancy-routes",
+    ),
+    path(
+        "occupancy/train-types/",
+        OccupancyReportView.as_view(dimension=OccupancySummary.TRAIN_TYPE),
+        name="occupancy-train-types",
+    ),
+    path(
+        "occupancy/hours/",
+        OccupancyReportView.as_view(dimension=OccupancySummary.HOUR),
+        name="occupancy-hours",
+    ),
+    path("forecast/", TripForecastListView.as_view(), name="trip-forecast"),
+]
+
+urlpatterns = [
+    path("", include(router.urls)),
+    path(
+        "trips/<int:pk>/availability/stream/",
+        AsyncTripAvailabilityStreamView.as_view(),
+        name="trips-availability-stream",
+    ),
+    path("changes/", ChangeFeedView.as_view(), name="changes"),
+    path("batch/", BatchView.as_view(), name="batch"),
+    path("async/", include(async_urlpatterns)),
+    path("analytics/", include(analytics_urlpatterns)),
+]
 
 app_name = "train_station"
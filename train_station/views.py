@@ -1,9 +1,17 @@
+from django.conf import settings
+from django.db import transaction
 from django_filters import rest_framework as filters
 from rest_framework import viewsets, mixins
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 
+from train_station.batch import run_atomic_batch, run_batch
+from train_station.change_feed import changes_since
+
 from train_station.filters import (
     StationFilter,
     RouteFilter,
@@ -18,7 +26,21 @@ from train_station.models import (
     Trip,
     Crew
 )
+from train_station.mixins import (
+    BulkRetrieveMixin,
+    QueryPlanMixin,
+    ReplicaReadMixin,
+)
 from train_station.permissions import IsAdminOrIfAuthenticatedReadOnly
+from train_station import seat_maps
+from train_station.trip_search import search_key, trip_search_cache
+from train_station.query_plans import (
+    ORDER_LIST,
+    ORDER_RETRIEVE,
+    TRIP_LIST,
+    TRIP_RETRIEVE,
+    TRIP_SEAT_MAP,
+)
 from train_station.serializers import (
     CrewSerializer,
     StationSerializer,
@@ -34,6 +56,9 @@ from train_station.serializers import (
     CrewListSerializer,
     OrderRetrieveSerializer,
     TripRetrieveSerializer,
+    TripSeatMapSerializer,
+    ChangeFeedParamsSerializer,
+    BatchSerializer,
 )
 
 
@@ -44,6 +69,7 @@ class TripOrderViewPagination(PageNumberPagination):
 
 
 class CrewViewSet(
+    ReplicaReadMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
@@ -58,6 +84,7 @@ class CrewViewSet(
 
 
 class StationViewSet(
+    ReplicaReadMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
@@ -69,7 +96,9 @@ class StationViewSet(
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
 
-class RouteViewSet(viewsets.ModelViewSet):
+class RouteViewSet(
+    BulkRetrieveMixin, ReplicaReadMixin, viewsets.ModelViewSet
+):
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = RouteFilter
     queryset = Route.objects.all().select_related("source", "destination")
@@ -82,7 +111,9 @@ class RouteViewSet(viewsets.ModelViewSet):
         return serializer_class
 
 
-class TrainViewSet(viewsets.ModelViewSet):
+class TrainViewSet(
+    BulkRetrieveMixin, ReplicaReadMixin, viewsets.ModelViewSet
+):
     queryset = Train.objects.all().select_related("train_type")
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
@@ -93,14 +124,15 @@ class TrainViewSet(viewsets.ModelViewSet):
         return serializer_class
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(QueryPlanMixin, ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = Order.objects.all()
     pagination_class = TripOrderViewPagination
     permission_classes = (IsAuthenticated,)
+    throttle_scopes = {"create": "orders"}
+    query_plans = {"list": ORDER_LIST, "retrieve": ORDER_RETRIEVE}
 
     def get_queryset(self):
-        queryset = Order.objects.prefetch_related(
-            "tickets__trip__route__source"
-        )
+        queryset = super().get_queryset()
         if self.request.user.is_staff:
             return queryset
         return queryset.filter(user=self.request.user)
@@ -117,28 +149,81 @@ class OrderViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class TripViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Trip.objects.all()
-        .select_related(
-            "route__source", "route__destination", "train"
-        )
-        .prefetch_related("crew", "tickets")
-    )
+class TripViewSet(
+    BulkRetrieveMixin,
+    QueryPlanMixin,
+    ReplicaReadMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = Trip.objects.all()
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = TripFilter
     pagination_class = TripOrderViewPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    throttle_scope = "trips"
+    query_plans = {"list": TRIP_LIST, "retrieve": TRIP_RETRIEVE}
+
+    def list(self, request, *args, **kwargs):
+        """
+        Searches are served from ``trip_search_cache`` when repeated,
+        except inside a transaction (e.g. an atomic batch), whose
+        uncommitted writes the cache must neither hide nor keep.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        filterset = TripFilter(request.query_params, queryset=Trip.objects.none())
+        if (
+            "ids" in request.query_params
+            or transaction.get_connection(queryset.db).in_atomic_block
+            or not filterset.is_valid()
+        ):
+            return super().list(request, *args, **kwargs)
+
+        key = search_key(request, filterset)
+        data = trip_search_cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        trip_search_cache.set(key, response.data, page)
+        return response
+
+    def get_seat_map(self):
+        """
+        Encoding of the sold seats in the detail, ``?seat_map=`` one of
+        ``seat_maps.ENCODINGS``.
+        """
+        seat_map = self.request.query_params.get("seat_map", seat_maps.LIST)
+        if seat_map not in seat_maps.ENCODINGS:
+            raise ValidationError(
+                {"seat_map": f"Expected one of {', '.join(seat_maps.ENCODINGS)}."}
+            )
+        return seat_map
+
+    def get_query_plan(self):
+        if self.action == "retrieve" and self.get_seat_map() != seat_maps.LIST:
+            return TRIP_SEAT_MAP
+        return super().get_query_plan()
 
     def get_serializer_class(self):
         if self.action == "list":
             return TripListSerializer
         if self.action == "retrieve":
+            if self.get_seat_map() != seat_maps.LIST:
+                return TripSeatMapSerializer
             return TripRetrieveSerializer
         return TripSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == "retrieve":
+            context["seat_map"] = self.get_seat_map()
+        return context
+
 
 class TrainTypeViewSet(
+    ReplicaReadMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet
@@ -146,3 +231,60 @@ class TrainTypeViewSet(
     queryset = TrainType.objects
     serializer_class = TrainTypeSerializer
     permission_classes = (IsAdminUser,)
+
+
+class ChangeFeedView(APIView):
+    """
+    Stations, routes, trains and trips inserted, updated or deleted after
+    ``?since=<seq>``, in order. Pass the returned ``next`` as ``since``
+    to continue while ``has_more`` is true. Read from the primary, where
+    ``since`` was taken.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        params = ChangeFeedParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        since = params.validated_data["since"]
+
+        changes, has_more = changes_since(since, params.validated_data["limit"])
+        return Response(
+            {
+                "since": since,
+                "next": changes[-1]["seq"] if changes else since,
+                "has_more": has_more,
+                "results": changes,
+            }
+        )
+
+
+class BatchView(APIView):
+    """
+    Run up to ``BATCH["MAX_OPERATIONS"]`` API calls in one request, e.g.
+    the trip, route, train and order behind one screen. Each result has
+    the status and body the call would have had on its own.
+    """
+    permission_classes = (IsAuthenticated,)
+    # Operations cannot be batches themselves.
+    batchable = False
+
+    def get_throttle_cost(self, request):
+        """
+        One token per operation, taken once for the whole batch.
+        """
+        data = request.data
+        operations = data.get("operations") if isinstance(data, dict) else None
+        if not isinstance(operations, list):
+            return 1
+        return min(max(len(operations), 1), settings.BATCH["MAX_OPERATIONS"])
+
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data["operations"]
+
+        if serializer.validated_data["atomic"]:
+            results = run_atomic_batch(request, operations)
+        else:
+            results = run_batch(request, operations)
+        return Response({"results": [result.as_dict() for result in results]})
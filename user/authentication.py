@@ -0,0 +1,110 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from core.metrics import record_cache_lookup
+
+STATELESS_CLAIMS = ("email", "is_staff", "is_superuser")
+
+
+class UserCache:
+    """
+    Per-process LRU cache of authenticated users with a short TTL.
+
+    Saving or deleting a user invalidates the entry in this process
+    (see ``user.signals``); other workers pick up the change when their
+    entry expires.
+    """
+
+    def __init__(self):
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._users[user_id]
+                return None
+            self._users.move_to_end(user_id)
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        config = settings.AUTH_USER_CACHE
+        user_id = str(user_id)
+        with self._lock:
+            self._users[user_id] = (time.monotonic() + config["TIMEOUT"], user)
+            self._users.move_to_end(user_id)
+            while len(self._users) > config["MAX_SIZE"]:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that skips the per-request user lookup.
+
+    Users are served from ``user_cache`` for ``AUTH_USER_CACHE["TIMEOUT"]``
+    seconds. With ``AUTH_USER_CACHE["STATELESS"]`` the user is built from
+    the signed token claims without touching the database, so changes
+    such as revoked staff status apply when the access token expires.
+    """
+
+    def get_user(self, validated_token):
+        if settings.AUTH_USER_CACHE["STATELESS"]:
+            return self.get_stateless_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return super().get_user(validated_token)
+
+        user = user_cache.get(user_id)
+        record_cache_lookup("auth_user", user is not None)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, copy.copy(user))
+        return user
+
+    def get_stateless_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+        if any(claim not in validated_token for claim in STATELESS_CLAIMS):
+            # Tokens issued before the claims were added.
+            return super().get_user(validated_token)
+
+        user_model = get_user_model()
+        id_field = user_model._meta.get_field(api_settings.USER_ID_FIELD)
+        return user_model(
+            **{
+                id_field.attname: id_field.to_python(
+                    validated_token[api_settings.USER_ID_CLAIM]
+                )
+            },
+            **{claim: validated_token[claim] for claim in STATELESS_CLAIMS},
+            is_active=True,
+        )
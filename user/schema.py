@@ -0,0 +1,11 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """
+    Document ``CachedJWTAuthentication`` as the same bearer token scheme
+    as simplejwt's ``JWTAuthentication``.
+    """
+
+    target_class = "user.authentication.CachedJWTAuthentication"
+    name = "cachedJwtAuth"
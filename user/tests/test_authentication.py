@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import CachedJWTAuthentication, user_cache
+from user.serializers import TokenObtainPairWithClaimsSerializer
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """Test the cached JWT authentication class"""
+
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="testpass", is_staff=True
+        )
+        token = TokenObtainPairWithClaimsSerializer.get_token(self.user)
+        self.request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {token.access_token}"
+        )
+        self.authentication = CachedJWTAuthentication()
+
+    def test_token_contains_claims(self):
+        res = self.client.post(
+            TOKEN_URL, {"email": "test@test.com", "password": "testpass"}
+        )
+        token = AccessToken(res.data["access"])
+        self.assertEqual(token["email"], "test@test.com")
+        self.assertTrue(token["is_staff"])
+
+    def test_user_is_cached(self):
+        with self.assertNumQueries(1):
+            self.authentication.authenticate(self.request)
+        with self.assertNumQueries(0):
+            user, _ = self.authentication.authenticate(self.request)
+        self.assertEqual(user, self.user)
+
+    def test_save_invalidates_cached_user(self):
+        self.authentication.authenticate(self.request)
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate(self.request)
+
+    @override_settings(
+        AUTH_USER_CACHE={**settings.AUTH_USER_CACHE, "STATELESS": True}
+    )
+    def test_stateless_mode_trusts_claims(self):
+        with self.assertNumQueries(0):
+            user, _ = self.authentication.authenticate(self.request)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.email, self.user.email)
+        self.assertTrue(user.is_staff)